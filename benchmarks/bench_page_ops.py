@@ -0,0 +1,291 @@
+# 页面对象基准测试 - 统计各操作耗时分位数和 Playwright 调用次数，并与基线对比
+#
+# 用法（在项目根目录执行）:
+#   python benchmarks/bench_page_ops.py --mock --iterations 5            # 使用本地模拟路由器
+#   python benchmarks/bench_page_ops.py --iterations 3 --ops navigate list search
+#   python benchmarks/bench_page_ops.py --mock --save-baseline           # 把本次结果保存为基线
+# delete_all 会清空设备上的全部VLAN，连接真实设备时需加 --allow-destructive 才会执行。
+# 任一操作 p50 或 p95 比基线慢超过 --threshold（默认20%）时退出码为 1。
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.call_profiler import ProfiledProxy
+from utils.cycle_results import percentile
+from utils.yaml_reader import YamlReader
+
+DEFAULT_BASELINE = project_root / "benchmarks" / "baseline.json"
+DEFAULT_OUTPUT_DIR = project_root / "reports" / "benchmarks"
+
+# 基准测试使用的 VLAN ID 区间，避免与用例数据冲突
+BENCH_VLAN_START = 3900
+# delete_all 每次执行前预置的VLAN数量
+BENCH_DELETE_ALL_ROWS = 20
+
+
+def bench_ip(vlan_id) -> str:
+    """基准测试VLAN使用的IP地址（按VLAN ID唯一）"""
+    vlan_id = int(vlan_id)
+    return f"10.{vlan_id // 256}.{vlan_id % 256}.1"
+
+
+class CallCounter:
+    """Playwright 调用计数，作为 ProfiledProxy 的记录端（只计次数，不计时）"""
+
+    def __init__(self):
+        self.count = 0
+        self.by_name = {}
+
+    def enter(self, name: str, category: str):
+        self.count += 1
+        self.by_name[name] = self.by_name.get(name, 0) + 1
+        return None
+
+    def exit(self, frame):
+        pass
+
+    def reset(self):
+        self.count = 0
+        self.by_name = {}
+
+
+class PageOpsBenchmark:
+    """在已登录的浏览器页面上重复执行页面对象操作并计时"""
+
+    OPERATIONS = ('navigate', 'list', 'add', 'edit', 'search', 'export', 'import', 'delete_all', 'group_add')
+    # 会清空设备数据的操作，只在模拟路由器或显式允许时执行
+    DESTRUCTIVE_OPERATIONS = ('delete_all',)
+
+    def __init__(self, page, counter: CallCounter):
+        from pages.vlan_page import VlanPage
+        from pages.sta_group_page import StaGroupPage
+        self.counter = counter
+        self.vlan_page = VlanPage(page)
+        self.sta_group_page = StaGroupPage(page)
+        self.export_file = None
+        self._next_vlan_id = BENCH_VLAN_START
+
+    # ------------------------------------------------------------------
+    # 操作：准备(可选) + 执行，执行部分计时
+    # ------------------------------------------------------------------
+    def _new_vlan_id(self) -> str:
+        self._next_vlan_id += 1
+        return str(self._next_vlan_id)
+
+    def op_navigate(self):
+        return self.vlan_page.navigate_to_vlan_page()
+
+    def op_list(self):
+        return self.vlan_page.get_vlan_list() is not None
+
+    def op_add(self):
+        vlan_id = self._new_vlan_id()
+        return self.vlan_page.add_vlan(vlan_id, f"vlan{vlan_id}", bench_ip(vlan_id), "benchmark")
+
+    def prepare_edit(self):
+        vlan_id = self._new_vlan_id()
+        client = self.vlan_page.api_client()
+        client.add_vlan(vlan_id, f"vlan{vlan_id}", bench_ip(vlan_id))
+        client.close()
+        return vlan_id
+
+    def op_edit(self, vlan_id):
+        return self.vlan_page.edit_vlan(vlan_id, {'vlan_name': f"vlan{vlan_id}_edited"})
+
+    def op_search(self):
+        return self.vlan_page.search_vlan(str(BENCH_VLAN_START + 1))
+
+    def op_export(self):
+        self.export_file = self.vlan_page.export_vlan("csv")
+        return bool(self.export_file)
+
+    def prepare_import(self):
+        if not self.export_file:
+            self.export_file = self.vlan_page.export_vlan("csv")
+        return self.export_file
+
+    def op_import(self, file_path):
+        return self.vlan_page.import_vlan(file_path, "csv", merge=True)
+
+    def prepare_delete_all(self):
+        # 每次都在基准测试ID区间内预置数据，保证删除的行数一致
+        client = self.vlan_page.api_client()
+        for _ in range(BENCH_DELETE_ALL_ROWS):
+            vlan_id = self._new_vlan_id()
+            client.add_vlan(vlan_id, f"vlan{vlan_id}", bench_ip(vlan_id))
+        client.close()
+
+    def op_delete_all(self):
+        return self.vlan_page.delete_all_vlans()
+
+    def prepare_group_add(self):
+        # 分组接口名称未经抓包确认，清理走页面上的全部删除
+        ip_group = self.sta_group_page.ip_group
+        if ip_group.navigate_to_group_page():
+            ip_group.delete_all_groups()
+
+    def op_group_add(self):
+        group_name = f"bench{self._new_vlan_id()}"
+        return self.sta_group_page.ip_group.add_group(group_name, "192.168.250.1")
+
+    # ------------------------------------------------------------------
+    def run(self, operations, iterations: int):
+        results = {}
+        for name in operations:
+            samples, calls, failures = [], [], 0
+            prepare = getattr(self, f"prepare_{name}", None)
+            operation = getattr(self, f"op_{name}")
+            for i in range(iterations):
+                args = ()
+                if prepare is not None:
+                    prepared = prepare()
+                    args = (prepared,) if prepared is not None else ()
+                self.counter.reset()
+                start = time.perf_counter()
+                try:
+                    ok = operation(*args)
+                except Exception as e:
+                    print(f"  {name} 第{i + 1}次执行异常: {e}")
+                    ok = False
+                samples.append(time.perf_counter() - start)
+                calls.append(self.counter.count)
+                failures += 0 if ok else 1
+            results[name] = summarize(samples, calls, failures)
+            print(format_result(name, results[name]))
+        return results
+
+
+def summarize(samples, calls, failures) -> dict:
+    return {
+        'iterations': len(samples),
+        'failures': failures,
+        'p50_ms': round(percentile(samples, 50) * 1000, 1),
+        'p95_ms': round(percentile(samples, 95) * 1000, 1),
+        'max_ms': round(max(samples) * 1000, 1) if samples else 0.0,
+        'mean_ms': round(sum(samples) / len(samples) * 1000, 1) if samples else 0.0,
+        'playwright_calls': round(sum(calls) / len(calls), 1) if calls else 0,
+    }
+
+
+def format_result(name: str, result: dict) -> str:
+    return (f"  {name:<12} p50={result['p50_ms']:>8.1f}ms  p95={result['p95_ms']:>8.1f}ms  "
+            f"max={result['max_ms']:>8.1f}ms  调用={result['playwright_calls']:>6}  "
+            f"失败={result['failures']}/{result['iterations']}")
+
+
+def compare_with_baseline(results: dict, baseline: dict, threshold: float):
+    """返回回归列表：[(操作, 指标, 基线值, 当前值, 变化比例)]"""
+    regressions = []
+    for name, current in results.items():
+        base = (baseline.get('operations') or {}).get(name)
+        if not base:
+            continue
+        for metric in ('p50_ms', 'p95_ms'):
+            if base.get(metric, 0) <= 0:
+                continue
+            change = (current[metric] - base[metric]) / base[metric]
+            if change > threshold:
+                regressions.append((name, metric, base[metric], current[metric], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="页面对象操作基准测试")
+    parser.add_argument("--iterations", type=int, default=5, help="每个操作重复执行次数")
+    parser.add_argument("--ops", nargs="+", choices=PageOpsBenchmark.OPERATIONS,
+                        default=list(PageOpsBenchmark.OPERATIONS), help="要测试的操作")
+    parser.add_argument("--mock", action="store_true", help="启动本地模拟路由器代替真实设备")
+    parser.add_argument("--mock-latency-ms", type=float, default=0, help="模拟路由器的接口延迟(毫秒)")
+    parser.add_argument("--allow-destructive", action="store_true",
+                        help="允许在真实设备上执行 delete_all（会删除全部VLAN）")
+    parser.add_argument("--headed", action="store_true", help="显示浏览器窗口")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="基线文件路径")
+    parser.add_argument("--threshold", type=float, default=0.2, help="允许的回归比例，0.2 表示慢20%%")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果保存为基线")
+    parser.add_argument("--output-dir", default=str(DEFAULT_OUTPUT_DIR), help="结果文件目录")
+    args = parser.parse_args()
+
+    operations = list(args.ops)
+    if not args.mock and not args.allow_destructive:
+        skipped = [name for name in operations if name in PageOpsBenchmark.DESTRUCTIVE_OPERATIONS]
+        if skipped:
+            print(f"⚠️ 跳过 {', '.join(skipped)}：会删除设备上的全部VLAN，需使用 --mock 或 --allow-destructive")
+            operations = [name for name in operations if name not in skipped]
+
+    from playwright.sync_api import sync_playwright
+    from pages.login_page import LoginPage
+
+    router_cfg = (YamlReader().read_yaml("config/test_config.yaml") or {}).get('router', {})
+    mock_router = None
+    host = router_cfg.get('ip', '10.66.0.40')
+    if args.mock:
+        from utils.mock_router import MockRouter
+        mock_router = MockRouter(latency_ms=args.mock_latency_ms,
+                                 username=router_cfg.get('username', 'admin'),
+                                 password=router_cfg.get('password', 'admin123')).start()
+        host = mock_router.host
+    print(f"基准测试目标: {host}{' (模拟路由器)' if mock_router else ''}，每个操作 {args.iterations} 次")
+
+    counter = CallCounter()
+    try:
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=not args.headed)
+            page = browser.new_context(accept_downloads=True).new_page()
+            login_page = LoginPage(page)
+            login_page.login_url = f"http://{host}/login#/login"
+            if not login_page.login(router_cfg.get('username', 'admin'), router_cfg.get('password', 'admin123')):
+                print("❌ 登录失败，无法执行基准测试")
+                return 2
+            results = PageOpsBenchmark(ProfiledProxy(page, counter, "Page"), counter).run(operations, args.iterations)
+            browser.close()
+    finally:
+        if mock_router is not None:
+            mock_router.stop()
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'target': 'mock' if mock_router else host,
+        'iterations': args.iterations,
+        'operations': results,
+    }
+    out_dir = Path(args.output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_file = out_dir / f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📊 结果已保存: {out_file}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"✅ 基线已更新: {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print("⚠️ 未找到基线文件，使用 --save-baseline 生成")
+        return 0
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('target') != report['target']:
+        print(f"⚠️ 基线目标({baseline.get('target')})与本次({report['target']})不同，对比结果仅供参考")
+
+    regressions = compare_with_baseline(results, baseline, args.threshold)
+    if regressions:
+        print(f"❌ 发现 {len(regressions)} 项性能回归（阈值 {args.threshold:.0%}）:")
+        for name, metric, base, current, change in regressions:
+            print(f"  {name}.{metric}: {base}ms -> {current}ms (+{change:.0%})")
+        return 1
+    print(f"✅ 无性能回归（阈值 {args.threshold:.0%}）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
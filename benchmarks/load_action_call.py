@@ -0,0 +1,519 @@
+# 接口压测 - N 个虚拟用户并发回放 /Action/call 的 VLAN 操作组合，统计吞吐量、耗时分位数和 Result 码分布
+#
+# 用法（在项目根目录执行）:
+#   python benchmarks/load_action_call.py --mock --users 10 --duration 30
+#   python benchmarks/load_action_call.py --users 20 --duration 120 --mix show=5,add=2,edit=2,del=2,up=1,down=1
+#   python benchmarks/load_action_call.py --users 8 --session separate       # 每个虚拟用户独立登录
+# 请求体以 api_logs/vlan 中录制的 add/edit/del/show 请求为模板；up/down 与 del 相同，只带行 id。
+# 压测数据使用 --vlan-start 起的 VLAN ID 区间和备注 "loadtest"，结束后自动清理。
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.cycle_results import percentile
+from utils.router_api import RESULT_SUCCESS_CODES, RESULT_ALREADY_EXISTS, vlan_mac
+from utils.yaml_reader import YamlReader
+
+DEFAULT_OUTPUT_DIR = project_root / "reports" / "benchmarks"
+PAYLOAD_DIR = project_root / "api_logs" / "vlan"
+
+ACTIONS = ('show', 'add', 'edit', 'del', 'up', 'down')
+DEFAULT_MIX = "show=5,add=2,edit=2,del=2,up=1,down=1"
+
+# 压测VLAN的备注，清理时按此查找
+LOAD_MARKER = "loadtest"
+
+# 录制文件中没有对应请求时使用的模板
+FALLBACK_PAYLOADS = {
+    'show': {"TYPE": "total,data", "limit": "0,20", "ORDER_BY": "", "ORDER": ""},
+    'add': {"vlan_id": "", "vlan_name": "", "ip_addr": "", "mac": "", "ip_mask": "", "interface": "lan1",
+            "netmask": "255.255.255.0", "comment": "", "enabled": "yes"},
+    'edit': {"vlan_id": "", "vlan_name": "", "mac": "", "ip_addr": "", "netmask": "255.255.255.0",
+             "ip_mask": "", "interface": "lan1", "id": "", "enabled": "yes", "comment": ""},
+    'del': {"id": ""},
+}
+
+
+def parse_mix(text: str) -> dict:
+    """解析 "show=5,add=2,..." 形式的操作权重"""
+    mix = {}
+    for item in (text or "").split(","):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in ACTIONS:
+            raise ValueError(f"不支持的操作: {name}（可选: {', '.join(ACTIONS)}）")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError(f"操作权重无效: {text}")
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def load_payload_templates(payload_dir=PAYLOAD_DIR) -> dict:
+    """从录制的接口日志中取各 action 的 param 作为模板
+
+    show 优先使用不带 KEYWORDS 的列表请求（与翻页加载一致）。
+    """
+    templates = {}
+    for path in sorted(Path(payload_dir).glob("*.json")):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                body = json.loads(json.load(f).get("request_body") or "{}")
+        except (OSError, ValueError, AttributeError):
+            continue
+        action, param = body.get("action"), body.get("param")
+        if body.get("func_name") != "vlan" or action not in FALLBACK_PAYLOADS or not isinstance(param, dict):
+            continue
+        if action == 'show' and 'show' in templates and "KEYWORDS" in param:
+            continue
+        if action not in templates or (action == 'show' and "KEYWORDS" in templates['show']):
+            templates[action] = param
+    for action, param in FALLBACK_PAYLOADS.items():
+        templates.setdefault(action, param)
+    return templates
+
+
+class AsyncCallClient:
+    """基于 asyncio 流的 /Action/call 客户端，每个实例持有一条 keep-alive 连接
+
+    返回 (HTTP状态码, 响应JSON或None)；服务端要求关闭连接时下次调用自动重连。
+    """
+
+    def __init__(self, host: str, cookies: dict, timeout: float = 10):
+        self.host = host
+        address, _, port = host.partition(":")
+        self.address = address
+        self.port = int(port or 80)
+        self.timeout = timeout
+        self.cookie_header = "; ".join(f"{k}={v}" for k, v in (cookies or {}).items())
+        self._reader = None
+        self._writer = None
+
+    async def _connect(self):
+        if self._writer is None or self._writer.is_closing():
+            self._reader, self._writer = await asyncio.open_connection(self.address, self.port)
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (OSError, ConnectionError):
+                pass
+            self._writer = None
+
+    async def call(self, func_name: str, action: str, param: dict):
+        try:
+            return await asyncio.wait_for(self._call(func_name, action, param), self.timeout)
+        except BaseException:
+            # 超时或连接异常后连接状态未知，丢弃
+            await self.close()
+            raise
+
+    async def _call(self, func_name: str, action: str, param: dict):
+        await self._connect()
+        body = json.dumps({"func_name": func_name, "action": action, "param": param}).encode("utf-8")
+        headers = [
+            "POST /Action/call HTTP/1.1",
+            f"Host: {self.host}",
+            "Accept: application/json, text/plain, */*",
+            "Content-Type: application/json;charset=UTF-8",
+            f"Referer: http://{self.host}/",
+            f"Cookie: {self.cookie_header}",
+            f"Content-Length: {len(body)}",
+            "Connection: keep-alive",
+        ]
+        self._writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError("连接已被服务端关闭")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self._reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self._reader.readline()
+                    break
+                chunks.append(await self._reader.readexactly(size))
+                await self._reader.readline()
+            raw = b"".join(chunks)
+        elif "content-length" in response_headers:
+            raw = await self._reader.readexactly(int(response_headers["content-length"]))
+        else:
+            raw = await self._reader.read()
+            response_headers["connection"] = "close"
+        if response_headers.get("connection", "").lower() == "close" or status_line.startswith(b"HTTP/1.0"):
+            await self.close()
+
+        try:
+            data = json.loads(raw.decode("utf-8"))
+        except ValueError:
+            data = None
+        return status, data
+
+
+class LoadStats:
+    """各操作的耗时样本和结果码计数"""
+
+    def __init__(self):
+        self.samples = {}
+        self.codes = {}
+        self.errors = Counter()
+        self.started = None
+        self.finished = None
+
+    @staticmethod
+    def outcome(status, data) -> str:
+        """结果码分类：Result 数值、HTTP 状态、非JSON（会话失效时返回登录页）"""
+        if status != 200:
+            return f"HTTP {status}"
+        if not isinstance(data, dict):
+            return "非JSON"
+        return str(data.get("Result"))
+
+    def record(self, action: str, latency_ms: float, code: str, ok: bool):
+        self.samples.setdefault(action, []).append(latency_ms)
+        self.codes.setdefault(action, Counter())[code] += 1
+        if not ok:
+            self.errors[action] += 1
+
+    def summary(self) -> dict:
+        elapsed = max((self.finished or time.perf_counter()) - (self.started or 0), 1e-9)
+        actions = {}
+        all_samples, all_codes = [], Counter()
+        for action, samples in self.samples.items():
+            all_samples.extend(samples)
+            all_codes.update(self.codes[action])
+            actions[action] = dict(self._latency(samples, elapsed), errors=self.errors[action],
+                                   result_codes=dict(self.codes[action].most_common()))
+        total_errors = sum(self.errors.values())
+        return {
+            'elapsed_s': round(elapsed, 2),
+            'requests': len(all_samples),
+            'errors': total_errors,
+            'error_rate': round(total_errors / len(all_samples) * 100, 2) if all_samples else 0.0,
+            'overall': self._latency(all_samples, elapsed),
+            'actions': actions,
+            'result_codes': dict(all_codes.most_common()),
+        }
+
+    @staticmethod
+    def _latency(samples, elapsed: float) -> dict:
+        return {
+            'count': len(samples),
+            'throughput_rps': round(len(samples) / elapsed, 2),
+            'p50_ms': round(percentile(samples, 50), 1),
+            'p90_ms': round(percentile(samples, 90), 1),
+            'p95_ms': round(percentile(samples, 95), 1),
+            'p99_ms': round(percentile(samples, 99), 1),
+            'max_ms': round(max(samples), 1) if samples else 0.0,
+            'mean_ms': round(sum(samples) / len(samples), 1) if samples else 0.0,
+        }
+
+
+class LoadGenerator:
+    """按权重随机选择操作，N 个虚拟用户在同一事件循环中并发发送请求
+
+    虚拟用户共享一个已存在行的池（行 id -> 当前字段）：add 成功后按返回的 RowId 入池，
+    del 从池中取出，edit/up/down 作用于池中空闲的行；池为空时这些操作改为 add。
+    """
+
+    def __init__(self, host: str, cookie_factory, mix: dict, users: int = 10, duration: float = 60,
+                 total_requests: int = None, vlan_start: int = 3600, vlan_count: int = 400, pool_size: int = 20,
+                 ramp_up: float = 0, think_ms: float = 0, timeout: float = 10, templates: dict = None, seed=None):
+        self.host = host
+        self.cookie_factory = cookie_factory
+        self.mix = mix
+        self.users = users
+        self.duration = duration
+        self.total_requests = total_requests
+        self.vlan_start = vlan_start
+        self.vlan_count = vlan_count
+        self.pool_size = min(pool_size, vlan_count)
+        self.ramp_up = ramp_up
+        self.think_ms = think_ms
+        self.timeout = timeout
+        self.templates = templates or load_payload_templates()
+        self.random = random.Random(seed)
+        self.stats = LoadStats()
+
+        self.pool = {}
+        self.busy = set()
+        self._used_vlan_ids = set()
+        self._next_vlan_offset = 0
+        self._issued = 0
+        self._deadline = None
+
+    # ------------------------------------------------------------------
+    # 请求参数
+    # ------------------------------------------------------------------
+    def _new_vlan_id(self):
+        for _ in range(self.vlan_count):
+            vlan_id = self.vlan_start + self._next_vlan_offset % self.vlan_count
+            self._next_vlan_offset += 1
+            if vlan_id not in self._used_vlan_ids:
+                self._used_vlan_ids.add(vlan_id)
+                return vlan_id
+        return None
+
+    def _add_param(self, vlan_id: int) -> dict:
+        param = dict(self.templates['add'])
+        param.update({
+            "vlan_id": str(vlan_id),
+            "vlan_name": f"load{vlan_id}",
+            "ip_addr": f"10.{vlan_id // 256}.{vlan_id % 256}.1",
+            "mac": vlan_mac(vlan_id),
+            "comment": LOAD_MARKER,
+        })
+        return param
+
+    def _edit_param(self, row_id, row: dict) -> dict:
+        param = {k: v for k, v in self.templates['edit'].items() if k not in ("ip_mask", "ip_addr_int")}
+        param.update({k: row[k] for k in param if k in row})
+        param.update({"id": row_id, "comment": f"{LOAD_MARKER} {int(time.time() * 1000) % 100000}"})
+        return param
+
+    def _pick_row(self):
+        idle = [row_id for row_id in self.pool if row_id not in self.busy]
+        return self.random.choice(idle) if idle else None
+
+    def _plan(self, action: str):
+        """返回 (实际执行的action, param, 完成回调)"""
+        if action == 'show':
+            return 'show', dict(self.templates['show']), None
+
+        row_id = None if action == 'add' else self._pick_row()
+        if row_id is None:
+            vlan_id = self._new_vlan_id()
+            if vlan_id is None:
+                return 'show', dict(self.templates['show']), None
+            param = self._add_param(vlan_id)
+
+            def added(ok, data):
+                if ok and isinstance(data, dict) and data.get("RowId") is not None:
+                    self.pool[data["RowId"]] = param
+                elif not ok:
+                    self._used_vlan_ids.discard(vlan_id)
+            return 'add', param, added
+
+        self.busy.add(row_id)
+        row = self.pool[row_id]
+        if action == 'edit':
+            param = self._edit_param(row_id, row)
+        else:
+            param = dict(self.templates['del'], id=str(row_id))
+
+        def done(ok, data):
+            self.busy.discard(row_id)
+            if ok and action == 'del':
+                removed = self.pool.pop(row_id, None)
+                if removed:
+                    self._used_vlan_ids.discard(int(removed["vlan_id"]))
+            elif ok and action == 'edit':
+                row.update({k: v for k, v in param.items() if k != "id"})
+        return action, param, done
+
+    # ------------------------------------------------------------------
+    # 执行
+    # ------------------------------------------------------------------
+    def _should_stop(self) -> bool:
+        if self.total_requests is not None:
+            return self._issued >= self.total_requests
+        return time.perf_counter() >= self._deadline
+
+    async def _request(self, client: AsyncCallClient, action: str, param: dict, measure: bool = True):
+        start = time.perf_counter()
+        try:
+            status, data = await client.call("vlan", action, param)
+            code = LoadStats.outcome(status, data)
+        except asyncio.TimeoutError:
+            data, code = None, "超时"
+        except (OSError, ConnectionError, ValueError, IndexError, asyncio.IncompleteReadError) as e:
+            data, code = None, f"连接错误:{type(e).__name__}"
+        latency_ms = (time.perf_counter() - start) * 1000
+        ok = code in {str(c) for c in RESULT_SUCCESS_CODES} or (action == 'add' and code == str(RESULT_ALREADY_EXISTS))
+        if measure:
+            self.stats.record(action, latency_ms, code, ok)
+        return ok, data
+
+    async def _virtual_user(self, index: int, client: AsyncCallClient):
+        if self.ramp_up and self.users > 1:
+            await asyncio.sleep(self.ramp_up * index / self.users)
+        names, weights = list(self.mix), list(self.mix.values())
+        try:
+            while not self._should_stop():
+                self._issued += 1
+                action, param, callback = self._plan(self.random.choices(names, weights)[0])
+                ok, data = await self._request(client, action, param)
+                if callback is not None:
+                    callback(ok, data)
+                if self.think_ms:
+                    await asyncio.sleep(self.think_ms / 1000)
+        finally:
+            await client.close()
+
+    async def _prepare(self, client: AsyncCallClient):
+        """压测前清理残留数据并预置 pool_size 条VLAN（不计入统计）"""
+        await self._cleanup(client)
+        for _ in range(self.pool_size):
+            action, param, callback = self._plan('add')
+            ok, data = await self._request(client, action, param, measure=False)
+            callback(ok, data)
+        if len(self.pool) < self.pool_size:
+            print(f"⚠️ 预置VLAN {len(self.pool)}/{self.pool_size} 条（可能未返回 RowId）")
+
+    async def _cleanup(self, client: AsyncCallClient):
+        """按备注查找压测VLAN并删除"""
+        row_ids, offset = [], 0
+        while True:
+            param = dict(self.templates['show'], limit=f"{offset},500", FINDS="comment", KEYWORDS=LOAD_MARKER)
+            ok, data = await self._request(client, 'show', param, measure=False)
+            page = ((data or {}).get("Data") or {}) if ok else {}
+            rows = page.get("data") or []
+            row_ids.extend(row["id"] for row in rows
+                           if self.vlan_start <= int(row.get("vlan_id") or 0) < self.vlan_start + self.vlan_count)
+            offset += 500
+            if not rows or offset >= int(page.get("total") or 0):
+                break
+        for i in range(0, len(row_ids), 100):
+            await self._request(client, 'del', {"id": ",".join(str(r) for r in row_ids[i:i + 100])}, measure=False)
+        self.pool.clear()
+        self.busy.clear()
+        self._used_vlan_ids.clear()
+
+    async def run_async(self) -> dict:
+        setup_client = AsyncCallClient(self.host, self.cookie_factory(0), self.timeout)
+        clients = [AsyncCallClient(self.host, self.cookie_factory(i), self.timeout) for i in range(self.users)]
+        try:
+            await self._prepare(setup_client)
+            self.stats.started = time.perf_counter()
+            self._deadline = self.stats.started + self.duration
+            await asyncio.gather(*(self._virtual_user(i, client) for i, client in enumerate(clients)))
+            self.stats.finished = time.perf_counter()
+        finally:
+            await self._cleanup(setup_client)
+            await setup_client.close()
+        return self.stats.summary()
+
+    def run(self) -> dict:
+        return asyncio.run(self.run_async())
+
+
+def format_summary(summary: dict) -> str:
+    overall = summary['overall']
+    lines = [f"共 {summary['requests']} 次请求，用时 {summary['elapsed_s']}s，吞吐量 {overall['throughput_rps']} 次/秒，"
+             f"失败 {summary['errors']} 次 ({summary['error_rate']}%)"]
+    for name, result in [('总计', overall)] + sorted(summary['actions'].items()):
+        lines.append(f"  {name:<6} {result['count']:>7}次 {result['throughput_rps']:>8.2f}/s  "
+                     f"p50={result['p50_ms']:>7.1f}ms p95={result['p95_ms']:>7.1f}ms "
+                     f"p99={result['p99_ms']:>7.1f}ms max={result['max_ms']:>7.1f}ms")
+    lines.append("Result码分布: " + ", ".join(f"{code}×{count}" for code, count in summary['result_codes'].items()))
+    for name, result in sorted(summary['actions'].items()):
+        if result['errors']:
+            codes = ", ".join(f"{code}×{count}" for code, count in result['result_codes'].items())
+            lines.append(f"  {name}: {codes}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/Action/call 接口压测")
+    parser.add_argument("--users", type=int, default=10, help="并发虚拟用户数")
+    parser.add_argument("--duration", type=float, default=60, help="持续时长(秒)")
+    parser.add_argument("--requests", type=int, help="总请求数（指定后忽略 --duration）")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"操作权重，默认 {DEFAULT_MIX}")
+    parser.add_argument("--session", choices=("shared", "separate"), default="shared",
+                        help="shared: 所有虚拟用户共用一个登录会话; separate: 每个虚拟用户独立登录")
+    parser.add_argument("--pool", type=int, default=20, help="压测前预置的VLAN条数")
+    parser.add_argument("--vlan-start", type=int, default=3600, help="压测VLAN ID起始值")
+    parser.add_argument("--vlan-count", type=int, default=400, help="压测VLAN ID区间大小")
+    parser.add_argument("--ramp-up", type=float, default=0, help="虚拟用户逐个启动的总时长(秒)")
+    parser.add_argument("--think-ms", type=float, default=0, help="每个虚拟用户两次请求间的等待(毫秒)")
+    parser.add_argument("--timeout", type=float, default=10, help="单次请求超时(秒)")
+    parser.add_argument("--seed", type=int, help="随机种子，便于复现同一操作序列")
+    parser.add_argument("--mock", action="store_true", help="启动本地模拟路由器代替真实设备")
+    parser.add_argument("--mock-latency-ms", type=float, default=0, help="模拟路由器的接口延迟(毫秒)")
+    parser.add_argument("--output-dir", default=str(DEFAULT_OUTPUT_DIR), help="结果文件目录")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    router_cfg = (YamlReader().read_yaml("config/test_config.yaml") or {}).get('router', {})
+    username, password = router_cfg.get('username', 'admin'), router_cfg.get('password', 'admin123')
+    mock_router = None
+    if args.mock:
+        from utils.mock_router import MockRouter
+        mock_router = MockRouter(latency_ms=args.mock_latency_ms, username=username, password=password).start()
+        host = mock_router.host
+        shared = mock_router.login_cookies()
+        fresh_login = mock_router.login_cookies
+    else:
+        from utils.session_store import SessionStore
+        host = router_cfg.get('ip', '10.66.0.40')
+        store = SessionStore(host)
+        shared = store.login_cookies(username, password)
+        fresh_login = lambda: store.login_cookies(username, password, fresh=True)
+
+    if args.session == "separate":
+        print(f"🔑 为 {args.users} 个虚拟用户分别登录...")
+        sessions = [shared] + [fresh_login() for _ in range(args.users - 1)]
+        cookie_factory = lambda i: sessions[i % len(sessions)]
+    else:
+        cookie_factory = lambda i: shared
+
+    scope = f"{args.requests} 次请求" if args.requests else f"{args.duration:g} 秒"
+    print(f"压测目标: {host}{' (模拟路由器)' if mock_router else ''}，{args.users} 个虚拟用户"
+          f"（{'独立' if args.session == 'separate' else '共享'}会话），{scope}，操作权重 {mix}")
+    try:
+        generator = LoadGenerator(host, cookie_factory, mix, users=args.users, duration=args.duration,
+                                  total_requests=args.requests, vlan_start=args.vlan_start,
+                                  vlan_count=args.vlan_count, pool_size=args.pool, ramp_up=args.ramp_up,
+                                  think_ms=args.think_ms, timeout=args.timeout, seed=args.seed)
+        summary = generator.run()
+    finally:
+        if mock_router is not None:
+            mock_router.stop()
+    print(format_summary(summary))
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'target': 'mock' if mock_router else host,
+        'users': args.users,
+        'session': args.session,
+        'mix': mix,
+        'summary': summary,
+    }
+    out_dir = Path(args.output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_file = out_dir / f"load_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📊 结果已保存: {out_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,6 +22,7 @@ from utils.yaml_reader import YamlReader
 from utils.test_runner import TestRunner
 from utils.report_generator import ReportGenerator
 from utils.wechat_notifier import WechatNotifier
+from utils.log_batcher import LogBatcher
 
 class TestExecutionThread(QThread):
     """测试执行线程"""
@@ -32,24 +33,26 @@ class TestExecutionThread(QThread):
     result_update = Signal(dict)   # 结果更新
     finished_signal = Signal(bool, str, dict)  # 完成信号
     
-    def __init__(self, test_config):
+    def __init__(self, test_config, log_callback=None):
         super().__init__()
         self.test_config = test_config
         self.logger = Logger().get_logger()
         self.test_runner = TestRunner()
         self._is_running = True
+        # 日志直接在本线程写入批量缓冲，不逐行经过信号投递到界面线程
+        self.log_callback = log_callback or self.log_update.emit
         
     def run(self):
         """执行测试"""
         try:
             self.progress_update.emit("🚀 开始执行测试...")
-            self.log_update.emit(f"测试配置: {json.dumps(self.test_config, ensure_ascii=False, indent=2)}")
+            self.log_callback(f"测试配置: {json.dumps(self.test_config, ensure_ascii=False, indent=2)}")
             
             # 执行测试
             results = self.test_runner.run_tests(
                 test_config=self.test_config,
                 progress_callback=self.progress_update.emit,
-                log_callback=self.log_update.emit,
+                log_callback=self.log_callback,
                 result_callback=self.result_update.emit
             )
             
@@ -72,12 +75,16 @@ class TestExecutionThread(QThread):
 class MainWindow(QMainWindow):
     """主窗口类"""
     
+    LOG_MAX_LINES = 5000        # 日志面板最多保留的行数，更早的日志可从文件加载
+    LOG_FLUSH_INTERVAL = 150    # 日志批量刷新间隔(毫秒)
+    
     def __init__(self):
         super().__init__()
         self.logger = Logger().get_logger()
         self.yaml_reader = YamlReader()
         self.test_thread = None
         self.test_results = {}
+        self.log_batcher = LogBatcher(max_lines=self.LOG_MAX_LINES)
         
         self.init_ui()
         self.load_config()
@@ -286,6 +293,11 @@ class MainWindow(QMainWindow):
         self.clear_button.clicked.connect(self.clear_logs)
         button_layout.addWidget(self.clear_button)
         
+        self.full_log_button = QPushButton("📄 完整日志")
+        self.full_log_button.setToolTip(f"日志面板只保留最近 {self.LOG_MAX_LINES} 行，点击从日志文件加载本次运行的完整日志")
+        self.full_log_button.clicked.connect(self.load_full_log)
+        button_layout.addWidget(self.full_log_button)
+        
         layout.addLayout(button_layout)
         layout.addStretch()
         
@@ -303,6 +315,8 @@ class MainWindow(QMainWindow):
         self.log_text = QTextEdit()
         self.log_text.setReadOnly(True)
         self.log_text.setFont(QFont("Consolas", 9))
+        # 超过上限的最早日志行由文档自动丢弃
+        self.log_text.document().setMaximumBlockCount(self.LOG_MAX_LINES)
         self.log_text.setStyleSheet("""
             QTextEdit {
                 background-color: #1e1e1e;
@@ -341,6 +355,11 @@ class MainWindow(QMainWindow):
         self.timer.timeout.connect(self.update_time)
         self.timer.start(1000)  # 每秒更新一次
         
+        # 日志批量刷新定时器
+        self.log_timer = QTimer()
+        self.log_timer.timeout.connect(self.flush_logs)
+        self.log_timer.start(self.LOG_FLUSH_INTERVAL)
+        
     def update_time(self):
         """更新时间显示"""
         current_time = QDateTime.currentDateTime().toString("yyyy-MM-dd hh:mm:ss")
@@ -388,7 +407,10 @@ class MainWindow(QMainWindow):
     def save_config(self):
         """保存配置"""
         try:
-            config = {
+            # 保留GUI不管理的配置节点（waits、api、parallel 等）及并行数
+            config = self.yaml_reader.read_yaml("config/test_config.yaml") or {}
+            existing_settings = config.get('test_settings', {})
+            config.update({
                 'router': {
                     'ip': self.ip_input.text(),
                     'username': self.username_input.text(),
@@ -407,8 +429,9 @@ class MainWindow(QMainWindow):
                 'test_settings': {
                     'screenshot_on_failure': self.screenshot_checkbox.isChecked(),
                     'video_on_failure': self.video_checkbox.isChecked(),
-                    'parallel_workers': 1,
-                    'retry_failed': 1
+                    'parallel_workers': existing_settings.get('parallel_workers', 1),
+                    'retry_failed': existing_settings.get('retry_failed', 1),
+                    'run_mode': existing_settings.get('run_mode', 'in_process')
                 },
                 'report': {
                     'title': '路由器自动化测试报告',
@@ -416,7 +439,7 @@ class MainWindow(QMainWindow):
                     'include_screenshots': True,
                     'include_logs': True
                 }
-            }
+            })
             
             success = self.yaml_reader.write_yaml("config/test_config.yaml", config)
             
@@ -478,6 +501,8 @@ class MainWindow(QMainWindow):
             
             # 清空之前的结果
             self.clear_results()
+            # 恢复日志面板行数上限（查看完整日志时会临时取消）
+            self.log_text.document().setMaximumBlockCount(self.LOG_MAX_LINES)
             
             # 获取测试配置
             test_config = self.get_test_config()
@@ -488,7 +513,7 @@ class MainWindow(QMainWindow):
             self.log_message(f"📋 测试配置: {test_config['test_function']}, 循环 {test_config['cycles']} 次")
             
             # 启动测试线程
-            self.test_thread = TestExecutionThread(test_config)
+            self.test_thread = TestExecutionThread(test_config, log_callback=self.log_batcher.push)
             self.test_thread.progress_update.connect(self.update_progress)
             self.test_thread.log_update.connect(self.log_message)
             self.test_thread.result_update.connect(self.update_result)
@@ -608,19 +633,29 @@ class MainWindow(QMainWindow):
                 pass
     
     def log_message(self, message: str):
-        """记录日志消息"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        formatted_message = f"[{timestamp}] {message}"
-        
-        self.log_text.append(formatted_message)
+        """记录日志消息（写入批量缓冲，由 flush_logs 定时刷新到界面）"""
+        self.log_batcher.push(message)
+    
+    def flush_logs(self):
+        """将缓冲中的日志一次性追加到日志面板"""
+        lines = self.log_batcher.drain()
+        if not lines:
+            return
+        self.log_text.append("\n".join(lines))
         
         # 自动滚动到底部
         cursor = self.log_text.textCursor()
         cursor.movePosition(QTextCursor.End)
         self.log_text.setTextCursor(cursor)
-        
-        # 确保界面更新
-        self.log_text.repaint()
+    
+    def load_full_log(self):
+        """从日志文件加载本次运行的完整日志（不受面板行数上限限制）"""
+        self.flush_logs()
+        lines = self.log_batcher.load_full_log()
+        self.log_text.document().setMaximumBlockCount(0)
+        self.log_text.setPlainText("\n".join(lines))
+        self.log_text.moveCursor(QTextCursor.End)
+        self.status_bar.showMessage(f"已加载完整日志 {len(lines)} 行: {self.log_batcher.spool_file}")
     
     def update_result(self, result: dict):
         """更新测试结果"""
@@ -732,7 +767,9 @@ class MainWindow(QMainWindow):
     
     def clear_logs(self):
         """清空日志"""
+        self.log_batcher.clear()
         self.log_text.clear()
+        self.log_text.document().setMaximumBlockCount(self.LOG_MAX_LINES)
         self.result_table.setRowCount(0)
         self.stats_text.clear()
         self.log_message("🗑️ 日志已清空")
@@ -781,8 +818,10 @@ class MainWindow(QMainWindow):
             if reply == QMessageBox.Yes:
                 self.test_thread.stop()
                 self.test_thread.wait(3000)
+                self.log_batcher.close()
                 event.accept()
             else:
                 event.ignore()
         else:
+            self.log_batcher.close()
             event.accept()
\ No newline at end of file
@@ -1,14 +1,328 @@
 # 基础页面类
 from playwright.sync_api import Page, expect
+from contextlib import contextmanager
+from utils.call_profiler import CallProfiler
+from utils.log_context import log_context
 from utils.logger import Logger
+from utils.router_api import RESULT_SUCCESS_CODES
 from utils.screenshot_helper import ScreenshotHelper
+from utils.wait_stats import WaitStats
+from utils.yaml_reader import YamlReader
+import json
 import time
 
+# DOM静默检测脚本：首次调用时安装 MutationObserver，记录最后一次变更时间
+_DOM_QUIET_JS = """
+(quietMs) => {
+    const w = window;
+    if (!w.__routerDomWatch) {
+        w.__routerDomWatch = { last: performance.now() };
+        new MutationObserver(() => { w.__routerDomWatch.last = performance.now(); })
+            .observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+    }
+    return performance.now() - w.__routerDomWatch.last >= quietMs;
+}
+"""
+
+# 表格批量读取脚本：一次 evaluate 取回表头和全部行文本，避免逐个单元格的IPC往返
+# 指定 keys 时只返回关键列（keyColumn<0 表示任意列）文本在 keys 中的行
+_READ_TABLE_JS = """
+({ selectors, innerText, keys, keyColumn }) => {
+    const text = (el) => ((innerText ? el.innerText : el.textContent) || "").trim();
+    const wanted = keys ? new Set(keys) : null;
+    const matches = (cells) => !wanted ||
+        (keyColumn < 0 ? cells.some((cell) => wanted.has(cell)) : wanted.has(cells[keyColumn]));
+    for (const selector of selectors) {
+        const rows = Array.from(document.querySelectorAll(selector));
+        if (!rows.length) continue;
+        const table = rows[0].closest("table");
+        const headers = table ? Array.from(table.querySelectorAll("thead th")).map(text) : [];
+        return {
+            selector,
+            headers,
+            rows: rows.map((row) => ({
+                visible: !!(row.offsetWidth || row.offsetHeight || row.getClientRects().length),
+                cells: Array.from(row.querySelectorAll("td")).map(text),
+            })).filter((row) => matches(row.cells)),
+        };
+    }
+    return { selector: null, headers: [], rows: [] };
+}
+"""
+
+# 常见表格行选择器，按顺序尝试
+DEFAULT_TABLE_ROW_SELECTORS = [
+    "table tbody tr",
+    ".vlan-table tbody tr",
+    ".ant-table tbody tr",
+    ".el-table tbody tr",
+    "[class*='table'] tbody tr"
+]
+
+# 等待层默认配置，可在 config/test_config.yaml 的 waits 节点覆盖
+DEFAULT_WAIT_SETTINGS = {
+    'mode': 'event',          # event: 条件等待; legacy: 保持原固定sleep
+    'dom_quiet_ms': 300,      # DOM 无变化持续多久视为渲染完成
+    'api_timeout': 10000,     # 等待 /Action/call 响应的上限(ms)
+    'toast_timeout': 3000,    # 等待提示消息的上限(ms)
+    'report_savings': True,   # 是否输出每个用例节省的等待时间
+}
+
 class BasePage:
+    _wait_settings = None
+    # 导航状态：路由名 -> 首次通过菜单进入后记录的页面地址（进程内共享，之后可直接跳转）
+    _route_urls = {}
+    # 导航计数：skipped 已在目标页面 / direct 按地址直达 / menu 菜单点击 / failed 失败
+    navigation_stats = {'skipped': 0, 'direct': 0, 'menu': 0, 'failed': 0}
+
     def __init__(self, page: Page):
-        self.page = page
+        # 开启调用剖析时为记录调用的包装对象
+        self.page = CallProfiler().wrap(page)
         self.logger = Logger().get_logger()
-        self.screenshot = ScreenshotHelper(page)
+        self.screenshot = ScreenshotHelper(self.page)
+
+    @classmethod
+    def wait_settings(cls):
+        """读取等待层配置（进程内只读取一次）"""
+        if cls._wait_settings is None:
+            cfg = YamlReader().read_yaml("config/test_config.yaml") or {}
+            settings = dict(DEFAULT_WAIT_SETTINGS)
+            settings.update(cfg.get('waits') or {})
+            BasePage._wait_settings = settings
+        return cls._wait_settings
+
+    def settle(self, seconds: float, kind: str = "settle"):
+        """替代固定 time.sleep：等待页面DOM静默，最长不超过 seconds 秒"""
+        settings = self.wait_settings()
+        start = time.time()
+        if settings.get('mode') == 'legacy':
+            time.sleep(seconds)
+        else:
+            try:
+                self.wait_for_dom_quiet(
+                    quiet_ms=min(settings['dom_quiet_ms'], int(seconds * 500)),
+                    timeout=int(seconds * 1000)
+                )
+            except Exception:
+                # 超过上限仍在变化，按原固定等待处理
+                pass
+        WaitStats().record(seconds, time.time() - start, kind)
+
+    # ------------------------------------------------------------------
+    # 导航状态跟踪
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _route_url(url: str) -> str:
+        """去掉查询参数后的页面地址（编辑页等带参数的地址不视为列表页）"""
+        return (url or "").split("?")[0]
+
+    def is_on_route(self, route: str, marker: str, url_hint: str = None) -> bool:
+        """当前是否已在目标页面：地址匹配且页面标志元素可见"""
+        current = self._route_url(self.page.url)
+        known = self._route_urls.get(route)
+        if known:
+            if current != known:
+                return False
+        elif not url_hint or url_hint not in current:
+            return False
+        try:
+            return self.page.locator(marker).first.is_visible()
+        except Exception:
+            return False
+
+    def ensure_route(self, route: str, marker: str, navigate_by_menu, url_hint: str = None,
+                     budget: float = 0.0) -> bool:
+        """确保位于目标页面
+
+        已在目标页面时直接返回；已知页面地址时直接跳转并等待标志元素出现；
+        否则调用 navigate_by_menu() 走菜单点击，并记住进入后的地址。
+        budget 为原菜单导航的固定等待秒数，跳过/直达时计入等待统计的节省时间。
+        """
+        stats = BasePage.navigation_stats
+        start = time.time()
+        if self.is_on_route(route, marker, url_hint):
+            stats['skipped'] += 1
+            WaitStats().record(budget, time.time() - start, "navigate")
+            self.logger.debug(f"已在{route}页面，跳过导航（累计跳过 {stats['skipped']} 次）")
+            return True
+
+        url = self._route_urls.get(route)
+        if url:
+            try:
+                self.page.goto(url)
+                self.page.wait_for_selector(marker, state="visible", timeout=self.wait_settings()['api_timeout'])
+                self.settle(1, "navigate")
+                stats['direct'] += 1
+                WaitStats().record(budget, time.time() - start, "navigate")
+                self.logger.info(f"按地址直接进入{route}页面: {url}")
+                return True
+            except Exception as e:
+                self.logger.warning(f"按地址直接进入{route}页面失败，改用菜单导航: {e}")
+
+        if not navigate_by_menu():
+            stats['failed'] += 1
+            return False
+        stats['menu'] += 1
+        BasePage._route_urls[route] = self._route_url(self.page.url)
+        return True
+
+    def wait_for_dom_quiet(self, quiet_ms: int = None, timeout: int = None):
+        """等待DOM在 quiet_ms 毫秒内没有任何变更"""
+        settings = self.wait_settings()
+        quiet_ms = settings['dom_quiet_ms'] if quiet_ms is None else quiet_ms
+        timeout = settings['api_timeout'] if timeout is None else timeout
+        self.page.wait_for_function(_DOM_QUIET_JS, arg=quiet_ms, timeout=timeout)
+        return True
+
+    def wait_for_table_render(self, selector: str = "table tbody", timeout: int = None):
+        """等待表格出现并完成重新渲染"""
+        timeout = self.wait_settings()['api_timeout'] if timeout is None else timeout
+        start = time.time()
+        try:
+            self.page.wait_for_selector(selector, state="attached", timeout=timeout)
+            remaining = max(int(timeout - (time.time() - start) * 1000), 1)
+            return self.wait_for_dom_quiet(timeout=remaining)
+        except Exception as e:
+            self.logger.warning(f"等待表格渲染超时 {selector}: {e}")
+            return False
+
+    def read_table(self, columns=None, selectors=None, visible_only: bool = False,
+                   min_cells: int = 1, inner_text: bool = False, keys=None, key_column: int = 0):
+        """一次 page.evaluate 读取整张表格
+
+        Args:
+            columns: 列名列表，按列顺序映射为字典；为None时返回每行的单元格文本列表
+            selectors: 行选择器列表，使用第一个有匹配行的选择器
+            visible_only: 只保留可见行（搜索过滤后隐藏的行会被跳过）
+            min_cells: 单元格数少于该值的行被忽略（空数据提示行等）
+            inner_text: 使用 innerText（保留换行），默认 textContent
+            keys: 只返回第 key_column 列文本在 keys 中的行（在页面内过滤），-1 表示任意列
+        Returns:
+            list: 行记录列表
+        """
+        result = self.page.evaluate(
+            _READ_TABLE_JS,
+            {'selectors': selectors or DEFAULT_TABLE_ROW_SELECTORS, 'innerText': inner_text,
+             'keys': [str(k) for k in keys] if keys is not None else None, 'keyColumn': key_column}
+        )
+        records = []
+        for row in result['rows']:
+            cells = row['cells']
+            if len(cells) < min_cells or (visible_only and not row['visible']):
+                continue
+            if columns is None:
+                records.append(cells)
+            else:
+                records.append({name: cells[i] if i < len(cells) else "" for i, name in enumerate(columns)})
+        return records
+
+    def read_table_headers(self, selectors=None):
+        """读取表格表头文本"""
+        result = self.page.evaluate(
+            _READ_TABLE_JS,
+            {'selectors': selectors or DEFAULT_TABLE_ROW_SELECTORS, 'innerText': False, 'keys': None, 'keyColumn': 0}
+        )
+        return result['headers']
+
+    @staticmethod
+    def _match_api_call(response, func_name: str = None, action: str = None):
+        """判断响应是否为指定 func_name/action 的 /Action/call 调用，func_name 为 None 时不限接口"""
+        try:
+            request = response.request
+            if request.method.upper() != "POST" or "/action/call" not in request.url.lower():
+                return False
+            body = request.post_data or ""
+            if func_name is not None and f'"{func_name}"' not in body:
+                return False
+            payload = json.loads(body)
+            if func_name is not None and payload.get("func_name") != func_name:
+                return False
+            if action is None:
+                return True
+            return str(payload.get("action", "")).lower() == action.lower()
+        except Exception:
+            return False
+
+    @contextmanager
+    def expect_api_call(self, func_name: str, action: str = None, timeout: int = None):
+        """等待指定 /Action/call 响应的上下文管理器，块内日志带 action 字段，响应后记录耗时
+
+        用法:
+            with self.expect_api_call("vlan", "add") as resp_info:
+                self.click_by_role("button", "保存")
+            response = resp_info.value
+        """
+        timeout = self.wait_settings()['api_timeout'] if timeout is None else timeout
+        name = f"{func_name or '*'}.{action or '*'}"
+        with log_context(action=name):
+            start = time.perf_counter()
+            with self.page.expect_response(
+                lambda r: self._match_api_call(r, func_name, action), timeout=timeout
+            ) as resp_info:
+                yield resp_info
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.logger.debug(f"[API] 等到 {name} 响应，耗时 {elapsed_ms:.0f}ms", extra={'duration_ms': elapsed_ms})
+
+    def click_and_wait_api(self, click, func_name: str, action: str = None, timeout: int = None,
+                           description: str = "操作", fallback=None) -> bool:
+        """执行会修改数据的点击（保存/删除/确认/启停），等待对应 /Action/call 响应并检查 Result
+
+        settle() 只等DOM静默，接口仍在处理时也会返回；修改类操作以接口响应作为完成信号。
+        click 为无参可调用对象，返回 False 或抛出异常视为点击失败，此时不再等待响应。
+        func_name 为 None 时匹配任意接口的该 action（接口名称未经抓包确认时使用）；
+        已点击但未等到响应时，若提供 fallback（无参，返回bool，如表格校验）则以其结果为准。
+        """
+        expected = f"{func_name or '*'}.{action or '*'}"
+        with log_context(action=expected):
+            clicked = False
+            start = time.perf_counter()
+            try:
+                with self.expect_api_call(func_name, action, timeout) as resp_info:
+                    if click() is False:
+                        raise RuntimeError("点击失败")
+                    clicked = True
+                response = resp_info.value
+            except Exception as e:
+                if clicked and fallback is not None:
+                    self.logger.warning(f"{description}未等到接口 {expected} 响应，改为页面校验: {e}")
+                    return bool(fallback())
+                self.logger.error(f"{description}失败，未等到接口 {expected} 响应: {e}")
+                return False
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            try:
+                data = response.json()
+            except Exception:
+                data = None
+            called = self._api_call_name(response) or expected
+            with log_context(action=called):
+                if not isinstance(data, dict) or data.get("Result") not in RESULT_SUCCESS_CODES:
+                    self.logger.error(f"{description}接口返回失败 {called}: {data}", extra={'duration_ms': elapsed_ms})
+                    return False
+                self.logger.info(f"{description}接口返回成功 ({called})，耗时 {elapsed_ms:.0f}ms",
+                                 extra={'duration_ms': elapsed_ms})
+            return True
+
+    @staticmethod
+    def _api_call_name(response):
+        """响应对应的 func_name.action（解析失败返回None）"""
+        try:
+            payload = json.loads(response.request.post_data or "")
+            return f"{payload.get('func_name')}.{payload.get('action')}"
+        except Exception:
+            return None
+
+    def wait_for_api_response(self, func_name: str, action: str = None, timeout: int = None):
+        """等待下一条指定的 /Action/call 响应，返回响应对象，超时返回None"""
+        timeout = self.wait_settings()['api_timeout'] if timeout is None else timeout
+        try:
+            return self.page.wait_for_event(
+                "response",
+                predicate=lambda r: self._match_api_call(r, func_name, action),
+                timeout=timeout
+            )
+        except Exception as e:
+            self.logger.warning(f"等待接口响应超时 func_name={func_name}, action={action}: {e}")
+            return None
         
     def navigate_to(self, url: str):
         """导航到指定URL"""
@@ -38,7 +352,7 @@ class BasePage:
             if element:
                 element.click()
                 self.logger.info(f"成功点击元素: {selector}")
-                time.sleep(0.5)
+                self.settle(0.5, "click")
                 return True
             return False
         except Exception as e:
@@ -55,7 +369,7 @@ class BasePage:
                 element = self.page.get_by_role(role)
             element.click()
             self.logger.info(f"成功点击元素 role={role}, name={name}")
-            time.sleep(0.5)
+            self.settle(0.5, "click")
             return True
         except Exception as e:
             self.logger.error(f"点击元素失败 role={role}, name={name}: {e}")
@@ -110,23 +424,22 @@ class BasePage:
             self.logger.error(f"检查元素可见性失败 {selector}: {e}")
             return False
             
-    def wait_for_toast_message(self, timeout: int = 5000):
-        """等待提示消息"""
+    def wait_for_toast_message(self, timeout: int = None):
+        """等待提示消息（所有候选选择器合并为一次等待）"""
         toast_selectors = [
             ".toast", ".message", ".alert", 
             ".notification", ".tips", "[class*='toast']",
             ".ant-message", ".el-message"
         ]
-        
-        for selector in toast_selectors:
-            try:
-                element = self.page.wait_for_selector(selector, timeout=timeout)
-                if element:
-                    message = element.text_content()
-                    self.logger.info(f"收到提示消息: {message}")
-                    return message
-            except:
-                continue
+        timeout = self.wait_settings()['toast_timeout'] if timeout is None else timeout
+        try:
+            element = self.page.wait_for_selector(", ".join(toast_selectors), timeout=timeout)
+            if element:
+                message = element.text_content()
+                self.logger.info(f"收到提示消息: {message}")
+                return message
+        except:
+            pass
         return None
         
     def click_link_by_text(self, text: str):
@@ -134,7 +447,7 @@ class BasePage:
         try:
             self.page.get_by_role("link", name=text).click()
             self.logger.info(f"成功点击链接: {text}")
-            time.sleep(0.5)
+            self.settle(0.5, "click")
             return True
         except Exception as e:
             self.logger.error(f"点击链接失败 {text}: {e}")
@@ -146,7 +459,7 @@ class BasePage:
         try:
             self.page.locator("a").filter(has_text=text).click()
             self.logger.info(f"成功点击文本元素: {text}")
-            time.sleep(0.5)
+            self.settle(0.5, "click")
             return True
         except Exception as e:
             self.logger.error(f"点击文本元素失败 {text}: {e}")
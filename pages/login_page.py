@@ -1,7 +1,6 @@
 # 登录页面类
 from pages.base_page import BasePage
 from playwright.sync_api import Page
-import time
 from utils.yaml_reader import YamlReader
 
 class LoginPage(BasePage):
@@ -28,7 +27,7 @@ class LoginPage(BasePage):
                 return False
                 
             # 等待页面加载
-            time.sleep(2)
+            self.settle(2)
                 
             # 输入用户名
             if not self.input_text_by_role(self.username_role[0], self.username_role[1], username):
@@ -43,7 +42,7 @@ class LoginPage(BasePage):
                 return False
                 
             # 等待页面跳转
-            time.sleep(3)
+            self.settle(3)
             self.page.wait_for_load_state("networkidle", timeout=10000)
             
             # 检查是否登录成功
@@ -65,7 +64,7 @@ class LoginPage(BasePage):
         """检查是否登录成功"""
         try:
             # 等待页面加载
-            time.sleep(2)
+            self.settle(2)
             
             # 检查URL变化
             current_url = self.page.url
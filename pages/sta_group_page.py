@@ -2,16 +2,29 @@ import re
 
 from pages.base_page import BasePage
 from playwright.sync_api import Page
-import time
+from utils.table_state import TableState
 from pathlib import Path
 import json
 
+# 分组表格列：分组名称 | 地址列表（每行一个地址，可带备注）
+GROUP_TABLE_COLUMNS = ['name', 'addrs']
+
 
 def normalize_mac(mac_str):
     """将MAC地址转换为统一格式"""
     clean_mac = ''.join(filter(str.isalnum, mac_str)).upper()
     return ':'.join(clean_mac[i:i + 2] for i in range(0, 12, 2))
 
+
+def extract_pure_addresses(text):
+    """从地址列表文本中提取纯地址部分，忽略备注"""
+    pure_addresses = []
+    for line in (text or "").replace("\u00A0", " ").split('\n'):
+        if line.strip():
+            parts = line.strip().split(maxsplit=1)
+            pure_addresses.append(parts[0])
+    return pure_addresses
+
 class StaGroupPage(BasePage):
     def __init__(self, page: Page):
         super().__init__(page)
@@ -41,7 +54,7 @@ class StaGroupPage(BasePage):
                 return False
 
             self.page.wait_for_selector(f"text={self.ip_group_link}", state="visible", timeout=5000)
-            time.sleep(0.5)
+            self.settle(0.5)
             return True
         except Exception as e:
             self.logger.error(f"导航到终端分组设置失败: {str(e)}")
@@ -72,6 +85,9 @@ class BaseGroup(BasePage):
         self.group_link = f"{group_type.upper()}分组"
         self._is_group_page_loaded = False
 
+        # 表格期望状态：增删改成功后记录，verify_group_state() 只校验受影响的分组
+        self.group_state = TableState(key='name', normalizers={'addrs': self._normalize_addrs})
+
         # 操作按钮
         self.add_link = '添加'
         self.delete_link = '删除'
@@ -103,11 +119,15 @@ class BaseGroup(BasePage):
 
 
     def navigate_to_group_page(self) -> bool:
-        """通用导航方法"""
-        if self.page.url and f"/{self.group_type}-group" in self.page.url:
-            self._is_group_page_loaded = True
-            return True
-
+        """通用导航方法（已在该分组页面时跳过，已知地址时直接跳转）"""
+        self._is_group_page_loaded = self.ensure_route(
+            f"{self.group_type}-group", self.search, self._navigate_to_group_page_by_menu,
+            url_hint=f"/{self.group_type}-group", budget=1.5
+        )
+        return self._is_group_page_loaded
+
+    def _navigate_to_group_page_by_menu(self) -> bool:
+        """通过 网络设置 > 终端分组设置 > X分组 菜单进入分组页面"""
         try:
             if not StaGroupPage(self.page).navigate_to_sta_group_setting():
                 return False
@@ -116,7 +136,6 @@ class BaseGroup(BasePage):
                 return False
 
             self.page.wait_for_url(f"**/{self.group_type}-group*", timeout=10000)
-            self._is_group_page_loaded = True
             return True
         except Exception as e:
             self.logger.error(f"导航到{self.group_type.upper()}分组页面失败: {str(e)}")
@@ -139,7 +158,7 @@ class BaseGroup(BasePage):
             if not self.click_link_by_text(self.add_link):
                 self.logger.error("添加按钮点击失败")
                 return False
-            time.sleep(1)
+            self.settle(1)
 
             # 输入分组名称
             if not self.input_text(self.group_name_input, name):
@@ -151,11 +170,14 @@ class BaseGroup(BasePage):
                 self.logger.error(f"{self.group_type.upper()}列表输入失败")
                 return False
 
-            # 点击保存
-            if not self.click_by_role(*self.save_button_role):
-                self.logger.error("保存按钮点击失败")
+            # 点击保存，以 add 接口响应作为完成信号
+            if not self.click_and_wait_api(lambda: self.click_by_role(*self.save_button_role), None, "add",
+                                           description=f"保存{self.group_type.upper()}分组",
+                                           fallback=lambda: self._group_in_table(name)):
+                self.logger.error("保存分组失败")
                 return False
 
+            self.group_state.expect_add({'name': name, 'addrs': addr_list})
             return True
 
         except Exception as e:
@@ -169,34 +191,26 @@ class BaseGroup(BasePage):
 
             # 等待页面刷新完成
             self.page.wait_for_load_state("networkidle")
-            time.sleep(1)
-
-            # 分组行定位
-            group_row = self.page.query_selector(f"tr:has(td:has-text('{group_name}'))")
-            if not group_row:
-                group_row = self.page.query_selector(f"tr:has(td:text-matches('{group_name}'))")
-                if not group_row:
+            self.settle(1)
+
+            # 优先在页面内按分组名精确过滤，只取回目标行；找不到时再整表读取做包含匹配
+            rows = self.read_table(selectors=["table tbody tr"], inner_text=True, keys=[group_name], key_column=-1)
+            group_row = rows[0] if rows else None
+            if group_row is None:
+                rows = self.read_table(selectors=["table tbody tr"], inner_text=True)
+                group_row = next((cells for cells in rows if any(group_name in c for c in cells)), None)
+                if group_row is None:
                     self.logger.error(f"未找到分组行: {group_name}")
                     return False
 
-            # 获取实际地址列表
-            addr_cell = group_row.query_selector("td:nth-child(2)")
-            if not addr_cell:
+            # 获取实际地址列表（第2列）
+            if len(group_row) < 2:
                 self.logger.error("找不到地址列表单元格")
                 return False
 
-            actual_addrs_text = addr_cell.inner_text().replace("\u00A0", " ").strip()
+            actual_addrs_text = group_row[1].replace("\u00A0", " ").strip()
             self.logger.debug(f"实际地址内容: {actual_addrs_text}")
 
-            def extract_pure_addresses(text):
-                """从文本中提取纯地址部分，忽略备注"""
-                pure_addresses = []
-                for line in text.split('\n'):
-                    if line.strip():
-                        parts = line.strip().split(maxsplit=1)
-                        pure_addresses.append(parts[0])
-                return pure_addresses
-
             # 处理期望地址（同样忽略备注）
             expected_pure_addrs = extract_pure_addresses(expected_addrs)
             actual_pure_addrs = extract_pure_addresses(actual_addrs_text)
@@ -257,6 +271,82 @@ class BaseGroup(BasePage):
             self.logger.error(f"验证过程中发生异常: {str(e)}")
             return False
 
+    # ------------------------------------------------------------------
+    # 表格状态模型：记录已知变更，只校验受影响的分组
+    # ------------------------------------------------------------------
+    def _normalize_addrs(self, text):
+        """地址列表比较前标准化：去备注，MAC统一格式，IPv6转小写，忽略顺序"""
+        addrs = extract_pure_addresses(text)
+        if self.group_type == "mac":
+            addrs = [normalize_mac(addr) for addr in addrs]
+        elif self.group_type == "ipv6":
+            addrs = [addr.lower() for addr in addrs]
+        return tuple(sorted(set(addrs)))
+
+    def _group_in_table(self, name: str) -> bool:
+        """按名称搜索后查看表格中是否有该分组（未捕获到接口响应时的完成判定）"""
+        if not self.search_group(name):
+            return False
+        self.wait_for_table_render()
+        return bool(self.read_group_rows(keys=[name]))
+
+    def _group_table_empty(self) -> bool:
+        """分组表格是否已无数据（全部删除未捕获到接口响应时的完成判定）"""
+        if not self.navigate_to_group_page():
+            return False
+        self.wait_for_table_render()
+        return not self.read_group_rows()
+
+    def read_group_rows(self, keys=None):
+        """一次性读取分组表格行；指定 keys 时只返回这些分组名的行"""
+        rows = self.read_table(columns=GROUP_TABLE_COLUMNS, selectors=["table tbody tr"], min_cells=2,
+                               inner_text=True, keys=keys)
+        return [row for row in rows if row['name']]
+
+    def snapshot_group_table(self) -> TableState:
+        """整表读取当前页作为基准（全部删除的校验需要知道删除前有哪些分组）"""
+        if not self.navigate_to_group_page():
+            return None
+        self.wait_for_table_render()
+        self.group_state.snapshot(self.read_group_rows())
+        self.logger.info(f"{self.group_type.upper()}分组表格快照完成，共 {len(self.group_state.rows)} 条")
+        return self.group_state
+
+    def verify_group_state(self, search: bool = False) -> bool:
+        """校验已记录的增删改
+
+        Args:
+            search: False 时在当前列表中一次读取所有受影响的行；
+                    True 时逐个按名称搜索后读取（变更行可能不在当前页时使用）
+        """
+        state = self.group_state
+        if not state.pending:
+            self.logger.info(f"{self.group_type.upper()}分组无待校验的变更")
+            return True
+        try:
+            keys = sorted(state.pending)
+            if search:
+                actual = []
+                for key in keys:
+                    if not self.search_group(key):
+                        return False
+                    actual.extend(self.read_group_rows(keys=[key]))
+            else:
+                self.page.wait_for_load_state("networkidle")
+                self.settle(1)
+                actual = self.read_group_rows(keys=keys)
+
+            diff = state.diff(actual)
+            if state.is_clean(diff):
+                self.logger.info(f"✅ {self.group_type.upper()}分组状态校验通过，变更行 {len(keys)} 条")
+                state.commit()
+                return True
+            self.logger.error(f"❌ {self.group_type.upper()}分组状态校验失败:\n{state.format_diff(diff)}")
+            return False
+        except Exception as e:
+            self.logger.error(f"校验{self.group_type.upper()}分组状态出错: {e}")
+            return False
+
     def get_duplicate_error(self):
         """获取重复名称的错误提示文本"""
         try:
@@ -294,7 +384,7 @@ class BaseGroup(BasePage):
 
             self.input_text(self.search, name)
             self.page.click(self.search_button)
-            time.sleep(1)
+            self.settle(1)
             return True
         except Exception as e:
             self.logger.error(f"搜索分组异常: {str(e)}")
@@ -331,7 +421,7 @@ class BaseGroup(BasePage):
                 return False
 
             self.search_group(original_name)
-            time.sleep(1)
+            self.settle(1)
 
             group_row = self.page.query_selector(f"tr:has(td:has-text('{original_name}'))")
             if not group_row:
@@ -341,19 +431,23 @@ class BaseGroup(BasePage):
             if not edit_btn:
                 return False
             edit_btn.click()
-            time.sleep(1)
+            self.settle(1)
 
             self.page.fill(self.group_name_input, "")
             self.page.fill(self.group_list_input, "")
             self.page.fill(self.group_name_input, new_name)
             self.page.fill(self.group_list_input, new_addr_list)
 
-            self.click_by_role(*self.save_button_role)
-            time.sleep(1)
+            # 点击保存，以 edit 接口响应作为完成信号
+            if not self.click_and_wait_api(lambda: self.click_by_role(*self.save_button_role), None, "edit",
+                                           description=f"保存{self.group_type.upper()}分组编辑",
+                                           fallback=lambda: self._group_in_table(new_name)):
+                return False
+            self.group_state.expect_edit(original_name, {'name': new_name, 'addrs': new_addr_list})
 
             if not self.click_text_filter(self.group_link):
                 return False
-            time.sleep(1)
+            self.settle(1)
             return True
 
         except Exception as e:
@@ -368,7 +462,7 @@ class BaseGroup(BasePage):
                 return False
 
             self.search_group(name)
-            time.sleep(1)
+            self.settle(1)
 
             group_row = self.page.query_selector(f"tr:has(td:has-text('{name}'))")
             if not group_row:
@@ -378,11 +472,14 @@ class BaseGroup(BasePage):
             if not delete_btn:
                 return False
             delete_btn.click()
-            time.sleep(1)
+            self.settle(1)
 
-            if not self.click_by_role(*self.confirm_button_role):
+            # 确认删除，以 del 接口响应作为完成信号
+            if not self.click_and_wait_api(lambda: self.click_by_role(*self.confirm_button_role), None, "del",
+                                           description=f"删除分组{name}",
+                                           fallback=lambda: not self._group_in_table(name)):
                 return False
-            time.sleep(2)
+            self.group_state.expect_delete(name)
             return True
 
         except Exception as e:
@@ -396,16 +493,19 @@ class BaseGroup(BasePage):
                 return False
 
             self.click_element(self.select_all_checkbox)
-            time.sleep(1)
+            self.settle(1)
 
             if not self.click_link_by_text(self.delete_link):
                 return False
 
-            if not self.click_by_role(*self.confirm_button_role):
+            # 确认删除，以 del 接口响应作为完成信号
+            if not self.click_and_wait_api(lambda: self.click_by_role(*self.confirm_button_role), None, "del",
+                                           description=f"全部删除{self.group_type.upper()}分组",
+                                           fallback=self._group_table_empty):
                 return False
-            time.sleep(2)
+            self.group_state.expect_clear()
             return True
 
         except Exception as e:
             self.logger.error(f"全部删除过程中发生异常: {str(e)}")
-            return False
\ No newline at end of file
+            return False
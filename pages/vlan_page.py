@@ -4,9 +4,29 @@ from playwright.sync_api import Page
 import time
 from utils.yaml_reader import YamlReader
 from utils.constants import DOWNLOAD_DIR
+from utils.router_api import RESULT_SUCCESS_CODES, RouterApiClient
+from utils.bulk_provisioner import BulkProvisioner
+from utils.api_recorder import ApiCaptureRecorder, peek_call
+from utils.table_state import TableState
 from pathlib import Path
 import json
 
+# VLAN表格列：vlanID | vlan名称 | MAC | IP | 子网掩码 | 线路 | 备注 | 状态 | 操作
+VLAN_TABLE_COLUMNS = ['id', 'name', 'mac', 'ip', 'subnet_mask', 'line', 'comment', 'status']
+
+# 编辑数据字段 -> 表格列
+_EDIT_FIELD_COLUMNS = {'vlan_name': 'name', 'ip_addr': 'ip', 'subnet_mask': 'subnet_mask',
+                       'line': 'line', 'comment': 'comment'}
+
+# 判断表格所有数据行的状态列是否都等于指定文本
+_ALL_ROWS_STATUS_JS = """
+([status, column]) => {
+    const rows = Array.from(document.querySelectorAll("table tbody tr"))
+        .filter((row) => row.querySelectorAll("td").length > column);
+    return rows.length > 0 && rows.every((row) => row.querySelectorAll("td")[column].textContent.trim() === status);
+}
+"""
+
 class VlanPage(BasePage):
     def __init__(self, page: Page):
         super().__init__(page)
@@ -31,6 +51,14 @@ class VlanPage(BasePage):
         
         # API日志去重记录 - 只保存每种类型的第一个
         self._saved_api_types = set()
+
+        # 表格期望状态（snapshot_vlan_table() 后开始记录增删改，verify_vlan_state() 只校验受影响的行）
+        self.vlan_state = None
+
+        # 最近一次页面搜索的 show 接口响应（verify_search_results 优先使用）
+        self.last_search_term = None
+        self.last_search_rows = None
+        self.last_search_total = 0
         
     def reset_api_save_state(self):
         """重置API保存状态，用于新的测试会话"""
@@ -45,116 +73,88 @@ class VlanPage(BasePage):
             filter_actions: 需要过滤的action列表，如['up', 'down']，None表示捕获所有
         """
         matched_calls: list = []
+        recorder = ApiCaptureRecorder()
         
         def _hook(req):
-            # 调试：记录所有POST请求
-            if req.method.lower() == "post":
-                self.logger.debug(f"[调试] POST请求: {req.url}")
-                if req.post_data:
-                    self.logger.debug(f"[调试] 请求体: {req.post_data[:200]}...")  # 只显示前200个字符
-            
-            # 只处理 POST /Action/call
-            if req.method.lower() != "post" or "/action/call" not in req.url.lower():
+            # 只处理 POST /Action/call，先用正则取 func_name/action，不关心的请求不做任何解析
+            if req.method.upper() != "POST":
                 return
+            call = peek_call(req.url, req.post_data)
+            if not call or call[0] != "vlan":
+                return
+            action_val = call[1]  # add / show / edit / up / down / export / import ...
 
-            body = (req.post_data or "").lower()
-            self.logger.debug(f"[调试] Action/call请求体: {body}")
-            
-            # func_name=vlan
-            if "\"func_name\":\"vlan\"" in body:
-                # 解析 action 字段 (add / show / edit / up / down / EXPORT / IMPORT ...)
-                action_val = "unknown"
-                import re
-                # 支持大小写字母、数字、下划线
-                m = re.search(r'"action"\s*:\s*"([A-Za-z0-9_]+)"', body)
-                if m:
-                    action_val = m.group(1).lower()  # 统一转为小写
-
-                # 如果设置了过滤器，只处理指定的action
-                if filter_actions and action_val not in filter_actions:
-                    return
+            # 如果设置了过滤器，只处理指定的action
+            if filter_actions and action_val not in filter_actions:
+                return
 
-                # 获取响应（如果可用）
-                try:
-                    resp_obj = req.response()
-                except:
-                    resp_obj = None
+            # 获取响应（如果可用）
+            try:
+                resp_obj = req.response()
+            except Exception:
+                resp_obj = None
 
-                matched_calls.append({
-                    "action": action_val,
-                    "req": req,
-                    "resp": resp_obj
-                })
-                
-                # 输出调试信息（只有在没有过滤器或符合过滤条件时才输出）
-                if not filter_actions or action_val in filter_actions:
-                    self.logger.info(f"🎯 [全局监听] 捕获到VLAN API: action={action_val}")
-                    self.logger.info(f"🎯 [全局监听] 请求体: {req.post_data}")
-                    try:
-                        if resp_obj:
-                            resp_data = resp_obj.json()
-                            self.logger.info(f"🎯 [全局监听] 响应: {resp_data}")
-                        else:
-                            self.logger.info(f"🎯 [全局监听] 响应未就绪")
-                    except:
-                        if resp_obj:
-                            self.logger.info(f"🎯 [全局监听] 响应状态: {resp_obj.status}")
-                        else:
-                            self.logger.info(f"🎯 [全局监听] 响应解析失败")
-                
-                
-                # 保存API记录 - 支持所有VLAN操作，但只保存每种类型的第一个
-                try:
-                    from utils.api_recorder import save_api_call
-                    
-                    if resp_obj:
-                        # 根据action类型生成去重键
-                        if action_val == "add":
-                            # 对于add操作，只保存第一个（比如vlan36）
-                            dedup_key = "add_vlan_first"
-                            filename = "add_vlan_36"  # 固定保存为vlan36的格式
-                        elif action_val == "show":
-                            # 对于show操作，根据operation_name判断类型
-                            if "search" in operation_name:
-                                dedup_key = "show_vlan_search_first"
-                                filename = "show_vlan_search_sample"
-                            else:
-                                dedup_key = f"show_vlan_{operation_name}"
-                                filename = f"show_vlan_{operation_name}"
-                        elif action_val == "edit":
-                            dedup_key = "edit_vlan_first"
-                            filename = f"edit_vlan_{operation_name}"
-                        elif action_val == "up":
-                            dedup_key = "enable_vlan_first"
-                            filename = f"enable_vlan_{operation_name}"
-                        elif action_val == "down":
-                            dedup_key = "disable_vlan_first"
-                            filename = f"disable_vlan_{operation_name}"
-                        elif action_val == "export":
-                            dedup_key = "export_vlan_first"
-                            filename = f"export_vlan_{operation_name}"
-                        elif action_val == "import":
-                            dedup_key = "import_vlan_first"
-                            filename = f"import_vlan_{operation_name}"
-                        elif action_val == "del":
-                            dedup_key = "delete_vlan_first"
-                            filename = f"delete_vlan_{operation_name}"
-                        else:
-                            dedup_key = f"{action_val}_vlan_first"
-                            filename = f"{action_val}_vlan_{operation_name}"
-                        
-                        # 检查是否已经保存过该类型的API
-                        if dedup_key not in self._saved_api_types:
-                            self._saved_api_types.add(dedup_key)
-                            json_path, curl_path = save_api_call(filename, req, resp_obj, use_timestamp=False)
-                            self.logger.info(f"[API-{action_val.upper()}] JSON: {json_path}")
-                            self.logger.info(f"[API-{action_val.upper()}] CURL: {curl_path}")
-                        else:
-                            self.logger.debug(f"[API-{action_val.upper()}] 已保存过该类型，跳过: {dedup_key}")
+            matched_calls.append({
+                "action": action_val,
+                "req": req,
+                "resp": resp_obj
+            })
+            self.logger.info(f"🎯 [全局监听] 捕获到VLAN API: action={action_val}")
+
+            if not resp_obj:
+                self.logger.warning(f"响应未就绪，无法保存API记录: {action_val}")
+                return
+
+            # 追加到本次运行的抓包归档（后台线程写入）
+            recorder.capture(req, resp_obj, "vlan", action_val, operation=operation_name)
+            
+            # 保存API样例 - 支持所有VLAN操作，但只保存每种类型的第一个
+            try:
+                # 根据action类型生成去重键
+                if action_val == "add":
+                    # 对于add操作，只保存第一个（比如vlan36）
+                    dedup_key = "add_vlan_first"
+                    filename = "add_vlan_36"  # 固定保存为vlan36的格式
+                elif action_val == "show":
+                    # 对于show操作，根据operation_name判断类型
+                    if "search" in operation_name:
+                        dedup_key = "show_vlan_search_first"
+                        filename = "show_vlan_search_sample"
                     else:
-                        self.logger.warning(f"响应未就绪，无法保存API记录: {action_val}")
-                except Exception as e:
-                    self.logger.warning(f"保存 API 记录失败: {e}")
+                        dedup_key = f"show_vlan_{operation_name}"
+                        filename = f"show_vlan_{operation_name}"
+                elif action_val == "edit":
+                    dedup_key = "edit_vlan_first"
+                    filename = f"edit_vlan_{operation_name}"
+                elif action_val == "up":
+                    dedup_key = "enable_vlan_first"
+                    filename = f"enable_vlan_{operation_name}"
+                elif action_val == "down":
+                    dedup_key = "disable_vlan_first"
+                    filename = f"disable_vlan_{operation_name}"
+                elif action_val == "export":
+                    dedup_key = "export_vlan_first"
+                    filename = f"export_vlan_{operation_name}"
+                elif action_val == "import":
+                    dedup_key = "import_vlan_first"
+                    filename = f"import_vlan_{operation_name}"
+                elif action_val == "del":
+                    dedup_key = "delete_vlan_first"
+                    filename = f"delete_vlan_{operation_name}"
+                else:
+                    dedup_key = f"{action_val}_vlan_first"
+                    filename = f"{action_val}_vlan_{operation_name}"
+                
+                # 检查是否已经保存过该类型的API
+                if dedup_key not in self._saved_api_types:
+                    self._saved_api_types.add(dedup_key)
+                    json_path, curl_path = recorder.save_sample(filename, req, resp_obj)
+                    self.logger.info(f"[API-{action_val.upper()}] JSON: {json_path}")
+                    self.logger.info(f"[API-{action_val.upper()}] CURL: {curl_path}")
+                else:
+                    self.logger.debug(f"[API-{action_val.upper()}] 已保存过该类型，跳过: {dedup_key}")
+            except Exception as e:
+                self.logger.warning(f"保存 API 记录失败: {e}")
         
         return _hook, matched_calls
         
@@ -168,12 +168,16 @@ class VlanPage(BasePage):
             self.logger.warning(f"清理API监听器失败: {e}")
         
     def navigate_to_vlan_page(self):
-        """导航到VLAN设置页面"""
+        """导航到VLAN设置页面（已在该页面时跳过，已知地址时直接跳转）"""
+        return self.ensure_route("vlan", self.search_input, self._navigate_to_vlan_page_by_menu, budget=6)
+
+    def _navigate_to_vlan_page_by_menu(self):
+        """通过 网络设置 > VLAN设置 菜单进入VLAN页面"""
         try:
             self.logger.info("导航到VLAN设置页面")
             
             # 等待页面加载
-            time.sleep(2)
+            self.settle(2)
             
             # 点击网络设置菜单
             if not self.click_text_filter(self.network_settings_text):
@@ -181,7 +185,7 @@ class VlanPage(BasePage):
                 return False
                 
             # 等待子菜单展开
-            time.sleep(1)
+            self.settle(1)
                 
             # 点击VLAN设置链接
             if not self.click_link_by_text(self.vlan_settings_link):
@@ -189,7 +193,7 @@ class VlanPage(BasePage):
                 return False
                 
             # 等待页面加载
-            time.sleep(3)
+            self.settle(3)
             self.page.wait_for_load_state("networkidle", timeout=10000)
             self.logger.info("成功导航到VLAN设置页面")
             return True
@@ -214,7 +218,7 @@ class VlanPage(BasePage):
                 return False
                 
             # 等待表单加载
-            time.sleep(2)
+            self.settle(2)
             
             # 填写VLAN ID
             if not self.input_text(self.vlan_id_input, vlan_id):
@@ -236,136 +240,75 @@ class VlanPage(BasePage):
                 if not self.input_text(self.comment_input, comment):
                     self.logger.warning("无法输入备注，但继续执行")
                 
-            # *** -------------- 改用全局监听捕获 VLAN 新增接口 -------------- ***
-            # 1) 注册一次性监听
-            matched_calls: list = []  # 保存多个接口（add、show）
+            # 监听 vlan 接口（add、show）用于抓包记录；完成信号以 add 接口响应为准
+            matched_calls: list = []
+
+            recorder = ApiCaptureRecorder()
 
             def _hook(req):
-                # 只处理 POST /Action/call
-                if req.method.lower() != "post" or "/action/call" not in req.url.lower():
+                # 只处理 POST /Action/call 中 func_name=vlan 的请求
+                if req.method.upper() != "POST":
                     return
-
-                body = (req.post_data or "").lower()
-                # func_name=vlan
-                if "\"func_name\":\"vlan\"" in body:
-                    # 解析 action 字段 (add / show / edit ...)
-                    action_val = "unknown"
-                    import re
-                    m = re.search(r'"action"\s*:\s*"(\w+)"', body)
-                    if m:
-                        action_val = m.group(1)
-
-                    matched_calls.append({
-                        "action": action_val,
-                        "req": req,
-                        "resp": req.response()
-                    })
+                call = peek_call(req.url, req.post_data)
+                if not call or call[0] != "vlan":
+                    return
+                action_val = call[1]  # add / show / edit ...
+                resp_obj = req.response()
+                matched_calls.append({
+                    "action": action_val,
+                    "req": req,
+                    "resp": resp_obj
+                })
+                if resp_obj:
+                    recorder.capture(req, resp_obj, "vlan", action_val, operation="add_vlan")
 
             self.page.on("requestfinished", _hook)
-
-            # 2) 点击保存按钮
-            if not self.click_by_role(self.save_button_role[0], self.save_button_role[1]):
-                self.logger.error("无法点击保存按钮")
+            try:
+                # 点击保存并等待 add 接口响应
+                api_success = self.click_and_wait_api(
+                    lambda: self.click_by_role(self.save_button_role[0], self.save_button_role[1]),
+                    "vlan", "add", description="保存VLAN"
+                )
+                # 等待列表重新渲染（show 刷新）
+                if api_success:
+                    self.wait_for_table_render()
+            finally:
                 self.page.remove_listener("requestfinished", _hook)  # type: ignore
-                return False
 
-            # 3) 等待结果（最多 5s，每 0.1s 轮询）
-            for _ in range(60):  # 最长 6 秒
-                # 若已经捕获到 add 和 show 则提前结束
-                actions = [c["action"] for c in matched_calls]
-                if "add" in actions and "show" in actions:
-                    break
-                self.page.wait_for_timeout(100)
+            self._save_add_samples(recorder, matched_calls, vlan_id)
 
-            # 4) 解绑监听
-            self.page.remove_listener("requestfinished", _hook)  # type: ignore
-
-            # 提取 add/show 调用
-            add_call = next((c for c in matched_calls if c["action"] == "add"), None)
-            show_call = next((c for c in matched_calls if c["action"] == "show"), None)
-
-            if add_call:
-                req_obj = add_call["req"]
-                resp_obj = add_call["resp"]
-                try:
-                    resp_json = resp_obj.json()
-                except Exception:
-                    resp_json = None
-
-                self.logger.info(f"后台接口返回成功: {resp_json}")
-                try:
-                    self.logger.info(f"[API-REQ-Header] {json.dumps(dict(req_obj.headers), ensure_ascii=False)}")
-                    self.logger.info(f"[API-REQ-Body] {req_obj.post_data}")
-                    self.logger.info(f"[API-RESP-Header] {json.dumps(dict(resp_obj.headers), ensure_ascii=False)}")
-                except Exception:
-                    pass
-
-                # 保存文件 (add) - 使用去重机制
-                try:
-                    from utils.api_recorder import save_api_call
-                    # 检查是否已经保存过添加操作的API
-                    dedup_key = "add_vlan_first"
-                    if dedup_key not in self._saved_api_types:
-                        self._saved_api_types.add(dedup_key)
-                        json_path, curl_path = save_api_call("add_vlan_36", req_obj, resp_obj, use_timestamp=False)
-                        self.logger.info(f"[API] 已保存至: {json_path}")
-                        self.logger.info(f"[CURL] 已保存至: {curl_path}")
-                    else:
-                        self.logger.debug(f"[API] 已保存过添加操作，跳过: {vlan_id}")
-                except Exception as e:
-                    self.logger.warning(f"保存 API 记录失败: {e}")
-
-                api_success = True
-
-                # 如果存在 show 接口，同样记录一次（可选）
-                if show_call:
-                    s_req = show_call["req"]; s_resp = show_call["resp"]
-                    try:
-                        self.logger.info(f"后台列表刷新接口返回: {s_resp.json()}")
-                        self.logger.info(f"[API-REQ-Body-SHOW] {s_req.post_data}")
-                    except Exception:
-                        pass
-
-                    try:
-                        from utils.api_recorder import save_api_call
-                        # 检查是否已经保存过show操作的API（统一只保存第一个）
-                        dedup_key = "show_vlan_after_add_first"
-                        if dedup_key not in self._saved_api_types:
-                            self._saved_api_types.add(dedup_key)
-                            json_path, curl_path = save_api_call("show_vlan_after_add_36", s_req, s_resp, use_timestamp=False)
-                            self.logger.info(f"[API-SHOW] 已保存至: {json_path}")
-                        else:
-                            self.logger.debug(f"[API-SHOW] 已保存过show操作，跳过: {vlan_id}")
-                    except Exception:
-                        pass
-
-            else:
-                self.logger.error("未捕获到 VLAN 新增接口")
-                api_success = False
-            
-
-            # 等待保存结果
-            time.sleep(3)
-            self.page.wait_for_load_state("networkidle", timeout=10000)
-
-            # 检查是否保存成功 (UI Toast)
-            message = self.wait_for_toast_message()
-            if api_success:
-                # API 已确认成功，忽略 Toast
-                self.logger.info(f"VLAN 添加成功(接口校验): {vlan_name}")
-                return True
-            elif message and ("成功" in message or "保存" in message):
-                self.logger.info(f"VLAN 添加成功(Toast): {vlan_name}")
-                return True
-            else:
-                self.logger.error(f"VLAN 添加失败: 未捕获成功提示且接口校验失败")
+            if not api_success:
+                self.logger.error(f"VLAN 添加失败: {vlan_name}")
                 return False
+
+            self.logger.info(f"VLAN 添加成功(接口校验): {vlan_name}")
+            self._track_vlan_add(vlan_id, vlan_name, ip_addr, comment)
+            return True
                 
         except Exception as e:
             self.logger.error(f"添加VLAN出错: {e}")
             self.screenshot.take_screenshot("vlan_add_error")
             return False
             
+    def _save_add_samples(self, recorder, matched_calls: list, vlan_id):
+        """保存首次添加操作的 add / show 接口样本（去重，只保存一次）"""
+        for action, dedup_key, filename in (("add", "add_vlan_first", "add_vlan_36"),
+                                            ("show", "show_vlan_after_add_first", "show_vlan_after_add_36")):
+            call = next((c for c in matched_calls if c["action"] == action), None)
+            if not call or not call["resp"]:
+                continue
+            try:
+                self.logger.info(f"[API-REQ-Body-{action.upper()}] {call['req'].post_data}")
+                if dedup_key not in self._saved_api_types:
+                    self._saved_api_types.add(dedup_key)
+                    json_path, curl_path = recorder.save_sample(filename, call["req"], call["resp"])
+                    self.logger.info(f"[API-{action.upper()}] 已保存至: {json_path}")
+                    self.logger.info(f"[CURL] 已保存至: {curl_path}")
+                else:
+                    self.logger.debug(f"[API-{action.upper()}] 已保存过该操作，跳过: {vlan_id}")
+            except Exception as e:
+                self.logger.warning(f"保存 API 记录失败: {e}")
+
     def add_vlan_with_partial_fields(self, vlan_id: str | None = None, vlan_name: str | None = None, ip_addr: str | None = None, comment: str | None = None):
         """支持部分字段为空的添加VLAN方法（用于异常校验）"""
         try:
@@ -375,7 +318,7 @@ class VlanPage(BasePage):
             if not self.click_link_by_text(self.add_link):
                 self.logger.error("无法找到添加按钮")
                 return False
-            time.sleep(2)
+            self.settle(2)
             # VLAN ID
             if vlan_id is not None:
                 self.input_text(self.vlan_id_input, vlan_id)
@@ -390,7 +333,7 @@ class VlanPage(BasePage):
                 self.input_text(self.comment_input, comment)
             # 点击保存
             self.click_by_role(self.save_button_role[0], self.save_button_role[1])
-            time.sleep(1)
+            self.settle(1)
             return True
         except Exception as e:
             self.logger.error(f"异常场景添加VLAN出错: {e}")
@@ -452,44 +395,11 @@ class VlanPage(BasePage):
                 return []
                 
             # 等待表格加载
-            time.sleep(2)
+            self.settle(2)
             self.page.wait_for_load_state("networkidle", timeout=5000)
             
-            # 查找VLAN表格
-            table_selectors = [
-                "table tbody tr",
-                ".vlan-table tbody tr", 
-                ".ant-table tbody tr",
-                ".el-table tbody tr",
-                "[class*='table'] tbody tr"
-            ]
+            vlans = self.read_vlan_rows(min_cells=4)
             
-            vlans = []
-            for selector in table_selectors:
-                try:
-                    rows = self.page.query_selector_all(selector)
-                    if rows:
-                        for row in rows:
-                            cells = row.query_selector_all("td")
-                            if len(cells) >= 4:  # 确保有足够的列
-                                # 根据表格结构：vlanID | vlan名称 | MAC | IP | 子网掩码 | 线路 | 备注 | 状态 | 操作
-                                vlan_data = {
-                                    'id': (cells[0].text_content() or "").strip() if len(cells) > 0 else "",
-                                    'name': (cells[1].text_content() or "").strip() if len(cells) > 1 else "",
-                                    'mac': (cells[2].text_content() or "").strip() if len(cells) > 2 else "",
-                                    'ip': (cells[3].text_content() or "").strip() if len(cells) > 3 else "",
-                                    'subnet_mask': (cells[4].text_content() or "").strip() if len(cells) > 4 else "",
-                                    'line': (cells[5].text_content() or "").strip() if len(cells) > 5 else "",
-                                    'comment': (cells[6].text_content() or "").strip() if len(cells) > 6 else "",
-                                    'status': (cells[7].text_content() or "").strip() if len(cells) > 7 else ""
-                                }
-                                # 过滤掉空行
-                                if vlan_data['id'] or vlan_data['name']:
-                                    vlans.append(vlan_data)
-                        break
-                except:
-                    continue
-                    
             self.logger.info(f"获取到VLAN列表，共 {len(vlans)} 条记录")
             
             # 调试输出：显示解析的数据结构
@@ -503,6 +413,74 @@ class VlanPage(BasePage):
             self.logger.error(f"获取VLAN列表失败: {e}")
             return []
             
+    def read_vlan_rows(self, min_cells: int = 4, visible_only: bool = False, keys=None):
+        """一次性读取VLAN表格行，过滤掉空行；指定 keys 时只返回这些 VLAN ID 的行"""
+        rows = self.read_table(columns=VLAN_TABLE_COLUMNS, min_cells=min_cells, visible_only=visible_only, keys=keys)
+        return [row for row in rows if row['id'] or row['name']]
+
+    # ------------------------------------------------------------------
+    # 表格状态模型：快照一次，之后只校验发生变更的行
+    # ------------------------------------------------------------------
+    def snapshot_vlan_table(self) -> TableState:
+        """整表读取一次作为基准，之后的增删改记录到 self.vlan_state"""
+        if not self.navigate_to_vlan_page():
+            return None
+        self.wait_for_table_render()
+        self.vlan_state = TableState(self.read_vlan_rows(min_cells=4), key='id')
+        self.logger.info(f"VLAN表格快照完成，共 {len(self.vlan_state.rows)} 条")
+        return self.vlan_state
+
+    def _track_vlan_add(self, vlan_id, vlan_name, ip_addr, comment=""):
+        if self.vlan_state is not None:
+            self.vlan_state.expect_add({'id': str(vlan_id), 'name': vlan_name, 'ip': ip_addr, 'comment': comment or ""})
+
+    def _track_vlan_edit(self, vlan_id, edit_data: dict):
+        if self.vlan_state is not None:
+            self.vlan_state.expect_edit(vlan_id, self.edit_columns(edit_data))
+
+    def _track_vlan_delete(self, vlan_id):
+        if self.vlan_state is not None:
+            self.vlan_state.expect_delete(vlan_id)
+
+    @staticmethod
+    def edit_columns(edit_data: dict) -> dict:
+        """把编辑数据的字段名转换成表格列名"""
+        return {column: edit_data[field] for field, column in _EDIT_FIELD_COLUMNS.items() if field in edit_data}
+
+    def verify_vlan_state(self, source: str = "table") -> bool:
+        """校验快照以来所有变更行
+
+        Args:
+            source: "table" 从页面表格读取（只读取受影响的行），"api" 通过 show 接口逐个查询
+        """
+        state = self.vlan_state
+        if state is None:
+            self.logger.error("未创建VLAN表格快照，请先调用 snapshot_vlan_table()")
+            return False
+        if not state.pending:
+            self.logger.info("VLAN表格无待校验的变更")
+            return True
+        try:
+            keys = sorted(state.pending)
+            if source == "api":
+                actual = [row for key in keys for row in self.get_vlan_list_via_api(keywords=key) if row['id'] == key]
+            else:
+                if not self.navigate_to_vlan_page():
+                    return False
+                self.wait_for_table_render()
+                actual = self.read_vlan_rows(min_cells=4, keys=keys)
+
+            diff = state.diff(actual)
+            if state.is_clean(diff):
+                self.logger.info(f"✅ VLAN表格状态校验通过，变更行 {len(keys)} 条")
+                state.commit()
+                return True
+            self.logger.error(f"❌ VLAN表格状态校验失败:\n{state.format_diff(diff)}")
+            return False
+        except Exception as e:
+            self.logger.error(f"校验VLAN表格状态出错: {e}")
+            return False
+            
     def delete_vlan(self, vlan_id: str):
         """删除VLAN"""
         try:
@@ -520,35 +498,36 @@ class VlanPage(BasePage):
                 f"text=删除"
             ]
             
+            confirm_selectors = [
+                "button:has-text('确认')",
+                "button:has-text('确定')", 
+                ".ant-btn-primary",
+                ".el-button--primary"
+            ]
+            
             for selector in delete_selectors:
                 try:
-                    if self.is_element_visible(selector):
-                        if self.click_element(selector):
-                            # 确认删除
-                            time.sleep(1)
-                            confirm_selectors = [
-                                "button:has-text('确认')",
-                                "button:has-text('确定')", 
-                                ".ant-btn-primary",
-                                ".el-button--primary"
-                            ]
-                            
-                            for confirm_selector in confirm_selectors:
-                                if self.is_element_visible(confirm_selector):
-                                    self.click_element(confirm_selector)
-                                    break
-                                    
-                            # 等待删除结果
-                            time.sleep(2)
-                            message = self.wait_for_toast_message()
-                            if message and "成功" in message:
-                                self.logger.info(f"VLAN删除成功: {vlan_id}")
-                                return True
-                            else:
-                                self.logger.info(f"VLAN删除完成（未找到确认消息）: {vlan_id}")
-                                return True
-                            break
-                except:
+                    if not self.is_element_visible(selector):
+                        continue
+                        
+                    def _delete_and_confirm():
+                        if not self.click_element(selector):
+                            return False
+                        # 等待确认框弹出后确认
+                        self.settle(1)
+                        for confirm_selector in confirm_selectors:
+                            if self.is_element_visible(confirm_selector):
+                                self.click_element(confirm_selector)
+                                break
+                    
+                    # 以 del 接口响应作为删除完成信号
+                    if not self.click_and_wait_api(_delete_and_confirm, "vlan", "del", description=f"删除VLAN{vlan_id}"):
+                        return False
+                    self.wait_for_table_render()
+                    self.logger.info(f"VLAN删除成功: {vlan_id}")
+                    self._track_vlan_delete(vlan_id)
+                    return True
+                except Exception:
                     continue
                     
             self.logger.error(f"未找到VLAN删除按钮: {vlan_id}")
@@ -565,7 +544,7 @@ class VlanPage(BasePage):
             self.logger.info(f"添加扩展IP: {ip} {mask if mask else ''}")
             # 点击"添加"按钮（扩展IP区域）
             self.page.get_by_role("link", name="添加").click()
-            time.sleep(1)
+            self.settle(1)
             # 输入扩展IP
             self.page.locator("input[name='ip']").fill(ip)
             # 选择掩码（如果有）
@@ -574,10 +553,10 @@ class VlanPage(BasePage):
                     self.page.locator("select[name='mask']").select_option(label=mask)
                 except Exception:
                     pass  # 掩码不是select时可忽略
-                time.sleep(0.5)
+                self.settle(0.5)
             # 点击"确定"按钮（在弹窗或下拉菜单内）
             self.page.locator("#fantasyMenu").get_by_text("确定").click()
-            time.sleep(1)
+            self.settle(1)
             return True
         except Exception as e:
             self.logger.error(f"添加扩展IP出错: {e}")
@@ -597,7 +576,7 @@ class VlanPage(BasePage):
         try:
             self.logger.info(f"启用VLAN: {vlan_id}")
             self.navigate_to_vlan_page()
-            time.sleep(2)  # 确保页面完全加载
+            self.settle(2)  # 确保页面完全加载
             
             rows = self.page.query_selector_all("table tbody tr")
             for row in rows:
@@ -607,10 +586,9 @@ class VlanPage(BasePage):
                     for btn in btns:
                         if btn.text_content() and btn.text_content().strip() == "启用":
                             self.logger.info(f"🎯 找到启用按钮，准备点击...")
-                            btn.click()
-                            self.logger.info(f"✅ 已点击启用按钮")
-                            time.sleep(2)  # 等待操作完成
-                            return True
+                            # 以 up 接口响应作为完成信号
+                            return self.click_and_wait_api(btn.click, "vlan", "up",
+                                                           description=f"启用VLAN{vlan_id}")
             
             self.logger.error(f"未找到VLAN{vlan_id}的启用按钮")
             return False
@@ -620,87 +598,15 @@ class VlanPage(BasePage):
             return False
 
     def enable_all_vlans(self):
-        """全部启用VLAN（抓取批量启用API）- 使用全局监听"""
-        try:
-            self.logger.info("全部启用VLAN")
-            
-            # 设置全局API监听器，只过滤up操作
-            hook_func, matched_calls = self._setup_vlan_api_listener("enable_all", filter_actions=["up"])
-            self.page.on("requestfinished", hook_func)
-            self.logger.info("[API监听] 已设置全局启用VLAN的API监听器")
-            
-            # 导航到VLAN页面
-            self.navigate_to_vlan_page()
-            time.sleep(2)  # 确保页面完全加载
-            
-            # 点击表头全选复选框
-            checkbox = self._find_select_all_checkbox()
-            if not checkbox:
-                self.logger.error("未找到表头全选复选框")
-                self._cleanup_api_listener(hook_func)
-                return False
-            
-            self.logger.info("🎯 准备点击全选复选框...")
-            checkbox.click()
-            self.logger.info("✅ 已点击全选复选框")
-            time.sleep(1)
-            
-            # 点击批量启用按钮
-            self.logger.info("🎯 准备点击批量启用按钮...")
-            self.page.get_by_role("link", name="启用").click()
-            self.logger.info("✅ 已点击批量启用按钮，等待API调用...")
-            
-            # 等待API调用被捕获 - 专门等待up接口
-            up_api_found = False
-            for i in range(150):  # 等待15秒，每100ms检查一次
-                if matched_calls:
-                    actions = [c['action'] for c in matched_calls]
-                    if 'up' in actions:
-                        self.logger.info(f"🎉 检测到批量启用API调用 (第{i+1}次检查): {actions}")
-                        up_api_found = True
-                        break
-                    elif i % 10 == 0:  # 每秒输出一次进度
-                        self.logger.info(f"⏳ 等待启用API调用... (第{i+1}次检查，已捕获: {actions})")
-                time.sleep(0.1)
-            
-            # 如果还没找到up接口，再等待5秒
-            if not up_api_found:
-                self.logger.info("⏳ 继续等待5秒以捕获延迟的启用API调用...")
-                for i in range(50):  # 再等待5秒
-                    if matched_calls:
-                        actions = [c['action'] for c in matched_calls]
-                        if 'up' in actions:
-                            self.logger.info(f"🎉 检测到延迟的批量启用API调用: {actions}")
-                            up_api_found = True
-                            break
-                    time.sleep(0.1)
-            
-            if not up_api_found:
-                self.logger.warning("⚠️ 等待20秒后仍未检测到批量启用(up)API调用")
-                # 显示捕获到的所有API调用
-                if matched_calls:
-                    all_actions = [c['action'] for c in matched_calls]
-                    self.logger.warning(f"实际捕获到的API调用: {all_actions}")
-            
-            # 等待额外时间确保所有API调用都被捕获
-            self.logger.info("⏳ 等待额外2秒以确保所有延迟的API调用都被捕获...")
-            time.sleep(2)
-            
-            self._cleanup_api_listener(hook_func)
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"全部启用VLAN出错: {e}")
-            self.screenshot.take_screenshot("vlan_enable_all_error")
-            self._cleanup_api_listener(hook_func)
-            return False
+        """全部启用VLAN（抓取批量启用API）- 以 up 接口响应作为完成信号"""
+        return self._set_all_vlans_status("up", "启用", "已启用", "enable_all")
             
     def disable_vlan(self, vlan_id: str):
         """单个VLAN停用（不抓取API）"""
         try:
             self.logger.info(f"停用VLAN: {vlan_id}")
             self.navigate_to_vlan_page()
-            time.sleep(2)  # 确保页面完全加载
+            self.settle(2)  # 确保页面完全加载
             
             rows = self.page.query_selector_all("table tbody tr")
             for row in rows:
@@ -710,10 +616,9 @@ class VlanPage(BasePage):
                     for btn in btns:
                         if btn.text_content() and btn.text_content().strip() == "停用":
                             self.logger.info(f"🎯 找到停用按钮，准备点击...")
-                            btn.click()
-                            self.logger.info(f"✅ 已点击停用按钮")
-                            time.sleep(2)  # 等待操作完成
-                            return True
+                            # 以 down 接口响应作为完成信号
+                            return self.click_and_wait_api(btn.click, "vlan", "down",
+                                                           description=f"停用VLAN{vlan_id}")
             
             self.logger.error(f"未找到VLAN{vlan_id}的停用按钮")
             return False
@@ -723,80 +628,84 @@ class VlanPage(BasePage):
             return False
 
     def disable_all_vlans(self):
-        """全部停用VLAN（抓取批量停用API）- 使用全局监听"""
+        """全部停用VLAN（抓取批量停用API）- 以 down 接口响应作为完成信号"""
+        return self._set_all_vlans_status("down", "停用", "已停用", "disable_all")
+
+    def _set_all_vlans_status(self, action: str, link_name: str, expected_status: str, operation_name: str):
+        """全选后点击批量启用/停用，等待对应的 /Action/call 响应，再确认表格状态已刷新
+
+        Args:
+            action: 接口 action（up / down）
+            link_name: 批量操作链接文本（启用 / 停用）
+            expected_status: 操作后状态列应显示的文本（已启用 / 已停用）
+            operation_name: API记录名称
+        """
+        hook_func = None
         try:
-            self.logger.info("全部停用VLAN")
+            self.logger.info(f"全部{link_name}VLAN")
             
-            # 设置全局API监听器，只过滤down操作
-            hook_func, matched_calls = self._setup_vlan_api_listener("disable_all", filter_actions=["down"])
+            # 设置全局API监听器（用于API记录），只过滤本次 action
+            hook_func, matched_calls = self._setup_vlan_api_listener(operation_name, filter_actions=[action])
             self.page.on("requestfinished", hook_func)
-            self.logger.info("[API监听] 已设置全局停用VLAN的API监听器")
             
             # 导航到VLAN页面
             self.navigate_to_vlan_page()
-            time.sleep(2)  # 确保页面完全加载
+            self.wait_for_table_render()
             
             # 点击表头全选复选框
             checkbox = self._find_select_all_checkbox()
             if not checkbox:
                 self.logger.error("未找到表头全选复选框")
-                self._cleanup_api_listener(hook_func)
                 return False
             
-            self.logger.info("🎯 准备点击全选复选框...")
             checkbox.click()
             self.logger.info("✅ 已点击全选复选框")
-            time.sleep(1)
+            self.settle(1)
+            
+            # 点击批量按钮，直接等待对应 action 的接口响应（超时仅作为兜底）
+            start = time.time()
+            with self.expect_api_call("vlan", action) as resp_info:
+                self.page.get_by_role("link", name=link_name).click()
+            response = resp_info.value
+            elapsed_ms = (time.time() - start) * 1000
+            
+            timing = response.request.timing or {}
+            device_ms = None
+            if timing.get('responseStart', -1) >= 0 and timing.get('requestStart', -1) >= 0:
+                device_ms = timing['responseStart'] - timing['requestStart']
+            self.last_batch_latency = {'action': action, 'total_ms': round(elapsed_ms, 1),
+                                       'device_ms': round(device_ms, 1) if device_ms is not None else None}
             
-            # 点击批量停用按钮
-            self.logger.info("🎯 准备点击批量停用按钮...")
-            self.page.get_by_role("link", name="停用").click()
-            self.logger.info("✅ 已点击批量停用按钮，等待API调用...")
-            
-            # 等待API调用被捕获 - 专门等待down接口
-            down_api_found = False
-            for i in range(150):  # 等待15秒，每100ms检查一次
-                if matched_calls:
-                    actions = [c['action'] for c in matched_calls]
-                    if 'down' in actions:
-                        self.logger.info(f"🎉 检测到批量停用API调用 (第{i+1}次检查): {actions}")
-                        down_api_found = True
-                        break
-                    elif i % 10 == 0:  # 每秒输出一次进度
-                        self.logger.info(f"⏳ 等待停用API调用... (第{i+1}次检查，已捕获: {actions})")
-                time.sleep(0.1)
-            
-            # 如果还没找到down接口，再等待5秒
-            if not down_api_found:
-                self.logger.info("⏳ 继续等待5秒以捕获延迟的停用API调用...")
-                for i in range(50):  # 再等待5秒
-                    if matched_calls:
-                        actions = [c['action'] for c in matched_calls]
-                        if 'down' in actions:
-                            self.logger.info(f"🎉 检测到延迟的批量停用API调用: {actions}")
-                            down_api_found = True
-                            break
-                    time.sleep(0.1)
-            
-            if not down_api_found:
-                self.logger.warning("⚠️ 等待20秒后仍未检测到批量停用(down)API调用")
-                # 显示捕获到的所有API调用
-                if matched_calls:
-                    all_actions = [c['action'] for c in matched_calls]
-                    self.logger.warning(f"实际捕获到的API调用: {all_actions}")
+            try:
+                resp_json = response.json()
+            except Exception:
+                resp_json = None
+            if not isinstance(resp_json, dict) or resp_json.get("Result") not in RESULT_SUCCESS_CODES:
+                self.logger.error(f"批量{link_name}接口返回失败: {resp_json}")
+                return False
+            device_text = f"{device_ms:.0f}ms" if device_ms is not None else "未知"
+            self.logger.info(f"🎉 批量{link_name}接口已返回({action})，设备处理耗时 {device_text}，点击到响应 {elapsed_ms:.0f}ms")
             
-            # 等待额外时间确保所有API调用都被捕获
-            self.logger.info("⏳ 等待额外2秒以确保所有延迟的API调用都被捕获...")
-            time.sleep(2)
+            # 确认表格中所有行的状态已刷新
+            try:
+                self.page.wait_for_function(
+                    _ALL_ROWS_STATUS_JS, arg=[expected_status, VLAN_TABLE_COLUMNS.index('status')],
+                    timeout=self.wait_settings()['api_timeout']
+                )
+            except Exception:
+                self.logger.error(f"接口已返回但表格状态未全部变为{expected_status}: {self.get_all_vlan_status()}")
+                return False
             
-            self._cleanup_api_listener(hook_func)
+            self.logger.info(f"✅ 所有VLAN状态已变为{expected_status}")
             return True
             
         except Exception as e:
-            self.logger.error(f"全部停用VLAN出错: {e}")
-            self.screenshot.take_screenshot("vlan_disable_all_error")
-            self._cleanup_api_listener(hook_func)
+            self.logger.error(f"全部{link_name}VLAN出错: {e}")
+            self.screenshot.take_screenshot(f"vlan_{operation_name}_error")
             return False
+        finally:
+            if hook_func:
+                self._cleanup_api_listener(hook_func)
 
     def _find_select_all_checkbox(self):
         """只用Playwright录制方式查找表头全选复选框"""
@@ -821,25 +730,17 @@ class VlanPage(BasePage):
             self.page.on("requestfinished", hook_func)
             
             self.navigate_to_vlan_page()
-            time.sleep(1)
+            self.settle(1)
             
             # 选择指定的VLAN
             for vid in vlan_ids:
                 self.page.get_by_role("row", name=vid).locator(".td_check").click()
             
-            # 点击批量启用按钮
-            self.page.get_by_role("link", name="启用").click()
-            
-            # 等待API调用被捕获
-            for i in range(100):  # 等待10秒
-                if matched_calls:
-                    self.logger.info(f"🎉 检测到批量启用API调用: {[c['action'] for c in matched_calls]}")
-                    break
-                time.sleep(0.1)
-            
-            time.sleep(2)  # 等待操作完成
+            # 点击批量启用按钮，以 up 接口响应作为完成信号
+            success = self.click_and_wait_api(self.page.get_by_role("link", name="启用").click, "vlan", "up",
+                                              description="批量启用VLAN")
             self._cleanup_api_listener(hook_func)
-            return True
+            return success
         except Exception as e:
             self.logger.error(f"批量启用VLAN出错: {e}")
             self.screenshot.take_screenshot("batch_vlan_enable_error")
@@ -859,30 +760,18 @@ class VlanPage(BasePage):
             self.page.on("requestfinished", hook_func)
             
             self.navigate_to_vlan_page()
-            time.sleep(1)
+            self.settle(1)
             
             # 选择指定的VLAN
             for vid in vlan_ids:
                 self.page.get_by_role("row", name=vid).locator(".td_check").click()
             
-            # 点击批量停用按钮
+            # 点击批量停用按钮，以 down 接口响应作为完成信号
             self.logger.info("🎯 准备点击批量停用按钮...")
-            self.page.get_by_role("link", name="停用").click()
-            self.logger.info("✅ 已点击批量停用按钮，等待API调用...")
-            
-            # 等待API调用被捕获
-            for i in range(100):  # 等待10秒
-                if matched_calls:
-                    self.logger.info(f"🎉 检测到批量停用API调用: {[c['action'] for c in matched_calls]}")
-                    break
-                time.sleep(0.1)
-            else:
-                self.logger.warning("⚠️ 等待10秒后仍未检测到批量停用API调用")
-            
-            # 等待额外时间确保所有API调用都被捕获
-            time.sleep(2)
+            success = self.click_and_wait_api(self.page.get_by_role("link", name="停用").click, "vlan", "down",
+                                              description="批量停用VLAN")
             self._cleanup_api_listener(hook_func)
-            return True
+            return success
         except Exception as e:
             self.logger.error(f"批量停用VLAN出错: {e}")
             self.screenshot.take_screenshot("batch_vlan_disable_error")
@@ -903,15 +792,8 @@ class VlanPage(BasePage):
     def get_all_vlan_status(self):
         """获取所有VLAN的状态，返回dict: {vlan_id: status}"""
         try:
-            result = {}
-            rows = self.page.query_selector_all("table tbody tr")
-            for row in rows:
-                cells = row.query_selector_all("td")
-                if len(cells) >= 8:
-                    vid = cells[0].text_content().strip()
-                    status = cells[7].text_content().strip()
-                    result[vid] = status
-            return result
+            rows = self.read_table(columns=VLAN_TABLE_COLUMNS, selectors=["table tbody tr"], min_cells=8)
+            return {row['id']: row['status'] for row in rows}
         except Exception as e:
             self.logger.error(f"获取所有VLAN状态失败: {e}")
             return {}
@@ -985,7 +867,7 @@ class VlanPage(BasePage):
             self.logger.info(f"成功导出{fmt.upper()}文件: {target_path.name}")
             
             # 等待API调用完成
-            time.sleep(2)
+            self.settle(2)
             self._cleanup_api_listener(hook_func)
             return target_path
         except Exception as e:
@@ -1017,7 +899,7 @@ class VlanPage(BasePage):
         try:
             # 点击导入按钮
             self.page.get_by_role("link", name="导入").click()
-            time.sleep(1) # 等待导入按钮点击生效
+            self.settle(1) # 等待导入按钮点击生效
 
             # 定位文件输入框并设置文件
             file_input = self.page.locator("input[type=file]")
@@ -1057,23 +939,24 @@ class VlanPage(BasePage):
                     self.logger.warning("未找到 \"合并到当前数据\" 复选框，可能 UI 更新")
 
             # 点击确定/上传按钮
+            # 先尝试常见按钮文本
+            confirm_btn = self.page.get_by_role("button", name="确定")
+            if not confirm_btn.count():
+                confirm_btn = self.page.get_by_role("button", name="确认导入")
+            if not confirm_btn.count():
+                confirm_btn = self.page.get_by_role("button", name="上传")
+            if not confirm_btn.count():
+                # 最后回退纯文本匹配
+                confirm_btn = self.page.locator("button:has-text('确定')")
+
+            # 导入请求尚无抓包记录（文件上传多为 multipart，不是 /Action/call 的JSON请求），
+            # 以导入后表格刷新（vlan.show 响应）作为完成信号，未等到时退回等待表格渲染
             try:
-                # 先尝试常见按钮文本
-                confirm_btn = self.page.get_by_role("button", name="确定")
-                if not confirm_btn.count():
-                    confirm_btn = self.page.get_by_role("button", name="确认导入")
-                if not confirm_btn.count():
-                    confirm_btn = self.page.get_by_role("button", name="上传")
-
-                if confirm_btn.count():
+                with self.expect_api_call("vlan", "show"):
                     confirm_btn.first.click()
-                else:
-                    # 最后回退纯文本匹配
-                    self.page.locator("button:has-text('确定')").first.click()
-            except:
-                pass
-
-            time.sleep(3)  # 等待导入完成
+            except Exception as e:
+                self.logger.debug(f"导入后未等到 vlan.show 响应，等待表格渲染: {e}")
+            self.wait_for_table_render()
             self.logger.info(f"已导入文件: {file_path.name}")
             self._cleanup_api_listener(hook_func)
             return True
@@ -1106,7 +989,7 @@ class VlanPage(BasePage):
                 else:
                     self.logger.warning("未找到表头全选复选框，可能页面结构变更")
 
-            time.sleep(1)
+            self.settle(1)
             # 点击 删除 按钮
             delete_btns = self.page.get_by_role("link", name="删除")
             if delete_btns.count() == 0:
@@ -1115,17 +998,21 @@ class VlanPage(BasePage):
                 self.logger.warning("未找到批量删除按钮")
                 return False
 
-            delete_btns.first.click()
-            # 确认对话框
-            try:
-                self.page.get_by_role("button", name="确定").click()
-            except:
-                pass
+            def _delete_and_confirm():
+                delete_btns.first.click()
+                # 确认对话框
+                try:
+                    self.page.get_by_role("button", name="确定").click(timeout=self.wait_settings()['toast_timeout'])
+                except Exception:
+                    pass
 
-            time.sleep(3)
-            self.logger.info("已批量删除所有 VLAN 配置")
+            # 以 del 接口响应作为完成信号
+            success = self.click_and_wait_api(_delete_and_confirm, "vlan", "del", description="批量删除VLAN")
+            if success:
+                self.wait_for_table_render()
+                self.logger.info("已批量删除所有 VLAN 配置")
             self._cleanup_api_listener(hook_func)
-            return True
+            return success
         except Exception as e:
             self.logger.error(f"删除所有VLAN失败: {e}")
             self._cleanup_api_listener(hook_func)
@@ -1179,7 +1066,7 @@ class VlanPage(BasePage):
             self.logger.info(f"捕获 VLAN 接口响应: {resp_json}")
 
             # 判断成功
-            if isinstance(resp_json, dict) and resp_json.get("Result") in [0, 30000]:
+            if isinstance(resp_json, dict) and resp_json.get("Result") in RESULT_SUCCESS_CODES:
                 return True, request_payload, resp_json
             else:
                 # 返回非成功码，交由调用方判定
@@ -1207,7 +1094,7 @@ class VlanPage(BasePage):
             try:
                 self.page.wait_for_timeout(3000)
             except Exception:
-                time.sleep(3)
+                self.settle(3)
             if hasattr(self.page, "off"):
                 self.page.off("response", _all_resp_cb)
             else:
@@ -1217,136 +1104,77 @@ class VlanPage(BasePage):
             return False, None, None
     
     def search_vlan(self, search_term: str):
-        """在VLAN列表中搜索指定内容"""
+        """在VLAN列表中搜索指定内容，搜索结果以 show 接口响应为准（保存到 last_search_rows）"""
         try:
             self.logger.info(f"开始搜索VLAN: {search_term}")
             
             # 确保在VLAN页面
             if not self.navigate_to_vlan_page():
                 return False
-                
-            # 等待页面加载
-            time.sleep(2)
+            
+            self.last_search_term = None
+            self.last_search_rows = None
+            
+            search_box = self.page.get_by_role("textbox", name="vlanID/Vlan名称/IP/备注")
+            if search_box.count() == 0:
+                self.logger.error("未找到搜索框")
+                return False
             
             # 设置API监听器
             hook_func, matched_calls = self._setup_vlan_api_listener(f"search_{search_term}")
             self.page.on("requestfinished", hook_func)
-            
             try:
-                # 严格按照用户录制的代码执行三步操作
-                self.logger.info("执行搜索操作 - 步骤1: 点击搜索框")
-                
-                # 步骤1: 点击搜索框
-                search_box = self.page.get_by_role("textbox", name="vlanID/Vlan名称/IP/备注")
-                if search_box.count() == 0:
-                    self.logger.error("未找到搜索框")
-                    return False
-                    
-                search_box.click()
-                self.logger.info("✅ 已点击搜索框")
-                time.sleep(0.5)  # 等待搜索框获得焦点
-                
-                # 步骤2: 输入搜索内容
-                self.logger.info(f"执行搜索操作 - 步骤2: 输入搜索内容 '{search_term}'")
-                if search_term:
-                    search_box.fill(search_term)
-                    self.logger.info(f"✅ 已在搜索框中输入: {search_term}")
-                else:
-                    search_box.clear()
-                    self.logger.info("✅ 已清空搜索框")
-                time.sleep(0.5)  # 等待输入完成
-                
-                # 步骤3: 点击搜索按钮（严格按照录制代码）
-                self.logger.info("执行搜索操作 - 步骤3: 点击搜索按钮")
-                
-                # 首先尝试用户录制的精确方式
-                search_buttons = self.page.get_by_role("button")
-                if search_buttons.count() > 0:
-                    # 查找搜索框附近的按钮
-                    clicked = False
-                    for i in range(search_buttons.count()):
-                        try:
-                            button = search_buttons.nth(i)
-                            if button.is_visible():
-                                # 尝试点击按钮
-                                button.click()
-                                self.logger.info(f"✅ 已点击搜索按钮 (第{i+1}个按钮)")
-                                clicked = True
-                                break
-                        except Exception as e:
-                            self.logger.debug(f"点击第{i+1}个按钮失败: {e}")
-                            continue
-                    
-                    if not clicked:
-                        self.logger.warning("所有按钮点击失败，尝试按回车键")
-                        search_box.press("Enter")
-                        self.logger.info("✅ 已按回车键执行搜索")
-                else:
-                    self.logger.warning("未找到搜索按钮，使用回车键")
-                    search_box.press("Enter")
-                    self.logger.info("✅ 已按回车键执行搜索")
-                
-                # 等待搜索结果更新
-                time.sleep(2)
-                self.page.wait_for_load_state("networkidle", timeout=5000)
-                
-                self.logger.info(f"✅ 搜索操作完成: {search_term}")
-                return True
-                
-            except Exception as e:
-                self.logger.error(f"搜索操作失败: {e}")
-                self.screenshot.take_screenshot("search_vlan_error")
-                return False
-                    
+                response = self._submit_search(search_box, search_term)
             finally:
                 # 清理API监听器
                 self._cleanup_api_listener(hook_func)
             
+            try:
+                resp_json = response.json()
+            except Exception:
+                resp_json = None
+            if not isinstance(resp_json, dict) or resp_json.get("Result") not in RESULT_SUCCESS_CODES:
+                self.logger.error(f"搜索接口返回失败: {resp_json}")
+                return False
+            
+            data = resp_json.get("Data") or {}
+            self.last_search_term = search_term
+            self.last_search_rows = [self._api_vlan_row(row) for row in data.get("data") or []]
+            self.last_search_total = int(data.get("total") or 0)
+            self.logger.info(f"✅ 搜索操作完成: '{search_term}'，接口返回 {len(self.last_search_rows)} 条 (共 {self.last_search_total} 条)")
+            return True
+            
         except Exception as e:
             self.logger.error(f"搜索VLAN失败: {e}")
+            self.screenshot.take_screenshot("search_vlan_error")
             return False
     
+    def _submit_search(self, search_box, search_term: str):
+        """输入搜索内容并回车，返回 vlan show 接口响应；回车未触发查询时点击搜索框后的按钮"""
+        try:
+            with self.expect_api_call("vlan", "show") as resp_info:
+                search_box.fill(search_term or "")
+                search_box.press("Enter")
+            return resp_info.value
+        except Exception as e:
+            self.logger.debug(f"回车未触发搜索请求，改为点击搜索按钮: {e}")
+        with self.expect_api_call("vlan", "show") as resp_info:
+            search_box.locator("xpath=following::button[1]").click()
+        return resp_info.value
+    
+    def search_vlan_via_api(self, search_term: str):
+        """直接调用 show 接口搜索（与页面搜索框使用相同的 FINDS/KEYWORDS 参数）"""
+        return self.get_vlan_list_via_api(keywords=search_term or None)
+    
     def get_filtered_vlan_list(self):
         """获取当前过滤后的VLAN列表"""
         try:
-            # 等待搜索结果更新
-            time.sleep(1)
-            self.page.wait_for_load_state("networkidle", timeout=5000)
+            # 等待搜索结果渲染
+            self.wait_for_table_render()
             
-            # 查找VLAN表格
-            table_selectors = [
-                "table tbody tr",
-                ".vlan-table tbody tr", 
-                ".ant-table tbody tr",
-                ".el-table tbody tr",
-                "[class*='table'] tbody tr"
-            ]
+            # 只保留可见行（未被搜索过滤掉）
+            vlans = self.read_vlan_rows(min_cells=2, visible_only=True)
             
-            vlans = []
-            for selector in table_selectors:
-                try:
-                    rows = self.page.query_selector_all(selector)
-                    if rows:
-                        for row in rows:
-                            # 检查行是否可见（未被搜索过滤掉）
-                            if not row.is_visible():
-                                continue
-                                
-                            cells = row.query_selector_all("td")
-                            if len(cells) >= 2:
-                                vlan_data = {
-                                    'id': (cells[0].text_content() or "").strip() if len(cells) > 0 else "",
-                                    'name': (cells[1].text_content() or "").strip() if len(cells) > 1 else "",
-                                    'ip': (cells[2].text_content() or "").strip() if len(cells) > 2 else "",
-                                    'comment': (cells[3].text_content() or "").strip() if len(cells) > 3 else ""
-                                }
-                                # 过滤掉空行
-                                if vlan_data['id'] or vlan_data['name']:
-                                    vlans.append(vlan_data)
-                        break
-                except:
-                    continue
-                    
             self.logger.info(f"获取到过滤后的VLAN列表，共 {len(vlans)} 条记录")
             return vlans
             
@@ -1359,106 +1187,68 @@ class VlanPage(BasePage):
         try:
             self.logger.info("清空搜索框")
             
-            # 设置API监听器
-            hook_func, matched_calls = self._setup_vlan_api_listener("clear_search")
-            self.page.on("requestfinished", hook_func)
+            search_box = self.page.get_by_role("textbox", name="vlanID/Vlan名称/IP/备注")
+            if search_box.count() == 0:
+                self.logger.error("未找到搜索框")
+                return False
             
-            try:
-                # 严格按照录制代码的三步操作
-                self.logger.info("执行清空搜索 - 步骤1: 点击搜索框")
-                
-                # 步骤1: 点击搜索框
-                search_box = self.page.get_by_role("textbox", name="vlanID/Vlan名称/IP/备注")
-                if search_box.count() == 0:
-                    self.logger.error("未找到搜索框")
-                    return False
-                    
-                search_box.click()
-                self.logger.info("✅ 已点击搜索框")
-                time.sleep(0.5)
-                
-                # 步骤2: 清空搜索框
-                self.logger.info("执行清空搜索 - 步骤2: 清空搜索框")
-                search_box.clear()
-                self.logger.info("✅ 已清空搜索框")
-                time.sleep(0.5)
-                
-                # 步骤3: 点击搜索按钮
-                self.logger.info("执行清空搜索 - 步骤3: 点击搜索按钮")
-                search_buttons = self.page.get_by_role("button")
-                if search_buttons.count() > 0:
-                    clicked = False
-                    for i in range(search_buttons.count()):
-                        try:
-                            button = search_buttons.nth(i)
-                            if button.is_visible():
-                                button.click()
-                                self.logger.info(f"✅ 已点击搜索按钮 (第{i+1}个按钮)")
-                                clicked = True
-                                break
-                        except Exception as e:
-                            self.logger.debug(f"点击第{i+1}个按钮失败: {e}")
-                            continue
-                    
-                    if not clicked:
-                        search_box.press("Enter")
-                        self.logger.info("✅ 已按回车键执行搜索")
-                else:
-                    search_box.press("Enter")
-                    self.logger.info("✅ 已按回车键执行搜索")
-                
-                # 等待搜索结果更新
-                time.sleep(2)
-                self.page.wait_for_load_state("networkidle", timeout=5000)
-                self.logger.info("✅ 清空搜索操作完成")
-                return True
-                        
-            finally:
-                # 清理API监听器
-                self._cleanup_api_listener(hook_func)
+            self._submit_search(search_box, "")
+            self.last_search_term = None
+            self.last_search_rows = None
+            self.logger.info("✅ 清空搜索操作完成")
+            return True
                 
         except Exception as e:
             self.logger.error(f"清空搜索框失败: {e}")
             return False
     
-    def verify_search_results(self, search_term: str, expected_vlans: list):
-        """验证搜索结果是否符合预期"""
+    def _search_result_rows(self, search_term: str):
+        """搜索结果行：优先使用最近一次页面搜索的接口响应，分页未取全时直接查询接口"""
+        if (self.last_search_term == search_term and self.last_search_rows is not None
+                and len(self.last_search_rows) >= self.last_search_total):
+            return self.last_search_rows
+        return self.search_vlan_via_api(search_term)
+    
+    def verify_search_results(self, search_term: str, expected_vlans: list, dom_check: bool = False):
+        """验证搜索结果是否符合预期
+
+        Args:
+            search_term: 搜索内容
+            expected_vlans: 期望匹配的VLAN ID列表，为空表示应无匹配结果
+            dom_check: 额外读取一次页面表格，确认显示的行与接口结果一致（需先调用 search_vlan）
+        """
         try:
-            filtered_vlans = self.get_filtered_vlan_list()
+            found_vlan_ids = [vlan['id'] for vlan in self._search_result_rows(search_term)]
             
             # 如果期望的VLAN列表为空，表示应该没有匹配结果
             if not expected_vlans:
-                if len(filtered_vlans) == 0:
-                    self.logger.info(f"搜索'{search_term}'无匹配结果，符合预期")
-                    return True
-                else:
-                    self.logger.error(f"搜索'{search_term}'应该无匹配结果，但实际找到{len(filtered_vlans)}条")
+                if found_vlan_ids:
+                    self.logger.error(f"搜索'{search_term}'应该无匹配结果，但实际找到{len(found_vlan_ids)}条")
                     return False
-            
-            # 验证搜索结果是否包含期望的VLAN
-            found_vlan_ids = [vlan['id'] for vlan in filtered_vlans]
-            
-            # 检查是否所有期望的VLAN都在结果中
-            missing_vlans = []
-            for expected_id in expected_vlans:
-                if expected_id not in found_vlan_ids:
-                    missing_vlans.append(expected_id)
-            
-            # 检查是否有多余的VLAN
-            extra_vlans = []
-            for found_id in found_vlan_ids:
-                if found_id not in expected_vlans:
-                    extra_vlans.append(found_id)
-            
-            if missing_vlans:
-                self.logger.error(f"搜索'{search_term}'缺少期望的VLAN: {missing_vlans}")
-                return False
-                
-            if extra_vlans:
-                self.logger.error(f"搜索'{search_term}'包含多余的VLAN: {extra_vlans}")
-                return False
+                self.logger.info(f"搜索'{search_term}'无匹配结果，符合预期")
+            else:
+                missing_vlans = [vlan_id for vlan_id in expected_vlans if vlan_id not in found_vlan_ids]
+                extra_vlans = [vlan_id for vlan_id in found_vlan_ids if vlan_id not in expected_vlans]
                 
-            self.logger.info(f"搜索'{search_term}'结果验证通过，匹配VLAN: {found_vlan_ids}")
+                if missing_vlans:
+                    self.logger.error(f"搜索'{search_term}'缺少期望的VLAN: {missing_vlans}")
+                    return False
+                    
+                if extra_vlans:
+                    self.logger.error(f"搜索'{search_term}'包含多余的VLAN: {extra_vlans}")
+                    return False
+                    
+                self.logger.info(f"搜索'{search_term}'结果验证通过，匹配VLAN: {found_vlan_ids}")
+            
+            if dom_check:
+                # 页面只显示当前分页，与页面搜索请求返回的那一页比较
+                shown = self.last_search_rows if self.last_search_term == search_term else None
+                expected_ids = {vlan['id'] for vlan in shown} if shown is not None else set(found_vlan_ids)
+                dom_ids = {vlan['id'] for vlan in self.get_filtered_vlan_list()}
+                if dom_ids != expected_ids:
+                    self.logger.error(f"搜索'{search_term}'页面显示与接口结果不一致: 页面{sorted(dom_ids)}, 接口{sorted(expected_ids)}")
+                    return False
+                self.logger.info(f"搜索'{search_term}'页面显示与接口结果一致")
             return True
             
         except Exception as e:
@@ -1475,7 +1265,7 @@ class VlanPage(BasePage):
                 return False
             
             # 等待页面加载
-            time.sleep(2)
+            self.settle(2)
             
             # 步骤1: 点击指定VLAN的编辑按钮
             self.logger.info(f"步骤1: 点击VLAN{vlan_id}的编辑按钮")
@@ -1483,7 +1273,7 @@ class VlanPage(BasePage):
                 return False
             
             # 等待编辑页面加载
-            time.sleep(2)
+            self.settle(2)
             
             # 步骤2: 测试取消按钮功能
             self.logger.info("步骤2: 测试取消按钮功能")
@@ -1493,7 +1283,7 @@ class VlanPage(BasePage):
                 if cancel_button.count() > 0:
                     cancel_button.click()
                     self.logger.info("✅ 已点击取消按钮")
-                    time.sleep(2)
+                    self.settle(2)
                     
                     # 验证是否返回到列表页面
                     if self.page.url.find("vlan") != -1:
@@ -1511,7 +1301,7 @@ class VlanPage(BasePage):
                 return False
             
             # 等待编辑页面加载
-            time.sleep(2)
+            self.settle(2)
             
             # 步骤4-10: 执行编辑操作
             if not self._perform_edit_operations(edit_data):
@@ -1549,24 +1339,13 @@ class VlanPage(BasePage):
                         continue
                 
                 if save_button:
-                    save_button.click()
-                    self.logger.info("✅ 已点击保存按钮")
-                    
-                    # 等待API调用被捕获
-                    self.logger.info("等待API调用捕获...")
-                    for i in range(50):  # 等待最多5秒
-                        if matched_calls:
-                            self.logger.info(f"🎉 检测到API调用 (第{i+1}次检查): {[c['action'] for c in matched_calls]}")
-                            break
-                        time.sleep(0.1)
-                    else:
-                        self.logger.warning("⚠️ 等待5秒后仍未检测到API调用")
-                    
-                    # 等待保存完成
-                    time.sleep(2)
-                    self.page.wait_for_load_state("networkidle", timeout=10000)
+                    # 点击保存，以 edit 接口响应作为完成信号
+                    if not self.click_and_wait_api(save_button.click, "vlan", "edit", description=f"保存VLAN{vlan_id}编辑"):
+                        return False
+                    self.wait_for_table_render()
                     
                     self.logger.info("✅ VLAN编辑操作完成")
+                    self._track_vlan_edit(vlan_id, edit_data)
                     return True
                 else:
                     self.logger.error("未找到保存按钮")
@@ -1729,7 +1508,7 @@ class VlanPage(BasePage):
                         # 先选择vlan201再改回lan1 (根据录制代码)
                         if 'line_temp' in edit_data:
                             line_combobox.select_option(edit_data['line_temp'])
-                            time.sleep(0.5)
+                            self.settle(0.5)
                         line_combobox.select_option(edit_data['line'])
                         self.logger.info(f"✅ 已修改线路为: {edit_data['line']}")
                     else:
@@ -1749,7 +1528,7 @@ class VlanPage(BasePage):
                     if extend_edit_button.count() > 0:
                         extend_edit_button.click()
                         self.logger.info("✅ 已点击扩展IP编辑按钮")
-                        time.sleep(1)
+                        self.settle(1)
                         
                         # 修改扩展IP的子网掩码
                         # 根据录制代码：page.get_by_role("cell", name="(24)").get_by_role("combobox").select_option("255.255.255.128")
@@ -1780,7 +1559,7 @@ class VlanPage(BasePage):
                             if confirm_button.count() > 0:
                                 confirm_button.click()
                                 self.logger.info("✅ 已确认扩展IP修改")
-                                time.sleep(1)
+                                self.settle(1)
                         except Exception as e:
                             self.logger.warning(f"确认扩展IP修改失败: {e}")
                     else:
@@ -1823,7 +1602,7 @@ class VlanPage(BasePage):
             return False
     
     def verify_vlan_edited(self, vlan_id: str, expected_data: dict):
-        """验证VLAN编辑结果"""
+        """验证VLAN编辑结果（只读取目标行）"""
         try:
             self.logger.info(f"验证VLAN{vlan_id}编辑结果")
             
@@ -1831,77 +1610,30 @@ class VlanPage(BasePage):
             if not self.navigate_to_vlan_page():
                 return False
             
-            # 等待页面加载
-            time.sleep(2)
-            
-            # 获取VLAN列表
-            vlans = self.get_vlan_list()
+            # 等待表格渲染后只读取目标VLAN所在行
+            self.wait_for_table_render()
+            rows = self.read_vlan_rows(min_cells=4, keys=[vlan_id])
             
-            # 调试：显示所有VLAN数据结构
-            self.logger.debug(f"当前VLAN列表数据: {vlans}")
-            
-            # 查找指定的VLAN
-            target_vlan = None
-            for vlan in vlans:
-                if vlan['id'] == vlan_id:
-                    target_vlan = vlan
-                    break
-            
-            if not target_vlan:
+            if not rows:
                 self.logger.error(f"未找到VLAN{vlan_id}")
                 return False
             
-            # 调试：显示目标VLAN的完整数据
+            target_vlan = rows[0]
             self.logger.info(f"找到目标VLAN数据: {target_vlan}")
-            self.logger.info(f"表格结构: vlanID={target_vlan.get('id')}, vlan名称={target_vlan.get('name')}, MAC={target_vlan.get('mac')}, IP={target_vlan.get('ip')}, 子网掩码={target_vlan.get('subnet_mask')}, 线路={target_vlan.get('line')}, 备注={target_vlan.get('comment')}, 状态={target_vlan.get('status')}")
             
-            # 验证各字段是否已更新
-            verification_results = []
+            # 期望状态只包含本次编辑的字段
+            expected = TableState(key='id')
+            expected_columns = self.edit_columns(expected_data)
+            expected.expect_edit(vlan_id, expected_columns)
+            mismatched = expected.diff(rows)['mismatched'].get(str(vlan_id), {})
             
-            if 'vlan_name' in expected_data:
-                if target_vlan['name'] == expected_data['vlan_name']:
-                    self.logger.info(f"✅ VLAN名称验证通过: {target_vlan['name']}")
-                    verification_results.append(True)
+            for column, value in expected_columns.items():
+                if column in mismatched:
+                    self.logger.error(f"❌ {column}验证失败: 期望{value}, 实际{target_vlan.get(column)}")
                 else:
-                    self.logger.error(f"❌ VLAN名称验证失败: 期望{expected_data['vlan_name']}, 实际{target_vlan['name']}")
-                    verification_results.append(False)
+                    self.logger.info(f"✅ {column}验证通过: {target_vlan.get(column)}")
             
-            if 'ip_addr' in expected_data:
-                if target_vlan['ip'] == expected_data['ip_addr']:
-                    self.logger.info(f"✅ IP地址验证通过: {target_vlan['ip']}")
-                    verification_results.append(True)
-                else:
-                    self.logger.error(f"❌ IP地址验证失败: 期望{expected_data['ip_addr']}, 实际{target_vlan['ip']}")
-                    verification_results.append(False)
-            
-            if 'comment' in expected_data:
-                if target_vlan['comment'] == expected_data['comment']:
-                    self.logger.info(f"✅ 备注验证通过: {target_vlan['comment']}")
-                    verification_results.append(True)
-                else:
-                    self.logger.error(f"❌ 备注验证失败: 期望{expected_data['comment']}, 实际{target_vlan['comment']}")
-                    verification_results.append(False)
-            
-            # 验证子网掩码（如果有）
-            if 'subnet_mask' in expected_data:
-                if target_vlan['subnet_mask'] == expected_data['subnet_mask']:
-                    self.logger.info(f"✅ 子网掩码验证通过: {target_vlan['subnet_mask']}")
-                    verification_results.append(True)
-                else:
-                    self.logger.error(f"❌ 子网掩码验证失败: 期望{expected_data['subnet_mask']}, 实际{target_vlan['subnet_mask']}")
-                    verification_results.append(False)
-            
-            # 验证线路（如果有）
-            if 'line' in expected_data:
-                if target_vlan['line'] == expected_data['line']:
-                    self.logger.info(f"✅ 线路验证通过: {target_vlan['line']}")
-                    verification_results.append(True)
-                else:
-                    self.logger.error(f"❌ 线路验证失败: 期望{expected_data['line']}, 实际{target_vlan['line']}")
-                    verification_results.append(False)
-            
-            # 总体验证结果
-            if all(verification_results):
+            if not mismatched:
                 self.logger.info(f"✅ VLAN{vlan_id}编辑结果验证通过")
                 return True
             else:
@@ -1912,138 +1644,107 @@ class VlanPage(BasePage):
             self.logger.error(f"验证VLAN编辑结果失败: {e}")
             return False
     
-    def batch_create_vlans_via_api(self, start_id: int = 300, count: int = 200) -> bool:
+    def api_client(self) -> RouterApiClient:
+        """基于当前浏览器登录会话创建接口客户端"""
+        return RouterApiClient.from_page(self.page)
+
+    def batch_create_vlans_via_api(self, start_id: int = 300, count: int = 200, concurrency: int = None) -> bool:
         """通过API批量创建VLAN（用于分页测试的前置条件）
         
+        请求由 BulkProvisioner 并发下发，在途请求数受并发上限约束，
+        传输错误或响应变慢时自动降低并发，传输错误退避重试；Result 错误码不重试。
+        
         Args:
             start_id: 起始VLAN ID
             count: 创建数量
+            concurrency: 并发上限，指定时并发不超过该值（1 表示逐个创建）；
+                         默认从配置 api.bulk_concurrency 起步，最多自适应增长到 api.bulk_max_concurrency
             
         Returns:
-            bool: 是否成功创建
+            bool: 是否全部创建成功（已存在的VLAN视为成功）
         """
         try:
             self.logger.info(f"开始通过API批量创建{count}个VLAN，起始ID: {start_id}")
             
-            # 导航到VLAN页面获取必要的cookie和session
+            # 导航到VLAN页面，确保浏览器会话已建立
             if not self.navigate_to_vlan_page():
                 self.logger.error("无法导航到VLAN页面")
                 return False
             
-            # 从页面获取当前的cookie
-            cookies = self.page.context.cookies()
-            cookie_str = "; ".join([f"{c['name']}={c['value']}" for c in cookies])
-            
-            # 获取当前页面的URL来确定host
-            current_url = self.page.url
-            import re
-            host_match = re.search(r'https?://([^/]+)', current_url)
-            host = host_match.group(1) if host_match else "10.66.0.40"
-            
-            success_count = 0
-            failed_count = 0
-            
-            for i in range(count):
-                vlan_id = start_id + i
-                vlan_name = f"vlan{vlan_id}"
-                ip_addr = f"192.168.{vlan_id % 254 + 1}.1"  # 避免IP地址冲突
-                mac = f"00:b7:21:ef:{(vlan_id // 256):02x}:{(vlan_id % 256):02x}"  # 生成唯一MAC
-                comment = f"批量测试VLAN{vlan_id}"
-                
-                # 构造API请求数据
-                api_data = {
-                    "func_name": "vlan",
-                    "action": "add",
-                    "param": {
-                        "vlan_id": str(vlan_id),
-                        "vlan_name": vlan_name,
-                        "ip_addr": ip_addr,
-                        "mac": mac,
-                        "ip_mask": "",
-                        "interface": "lan1",
-                        "netmask": "255.255.255.0",
-                        "comment": comment,
-                        "enabled": "yes"
-                    }
-                }
-                
-                # 发送API请求
-                try:
-                    response = self.page.request.post(
-                        f"http://{host}/Action/call",
-                        headers={
-                            "accept": "application/json, text/plain, */*",
-                            "content-type": "application/json;charset=UTF-8",
-                            "cookie": cookie_str,
-                            "referer": f"http://{host}/",
-                        },
-                        data=json.dumps(api_data)
-                    )
-                    
-                    if response.status == 200:
-                        result = response.json()
-                        if result.get("Result") == 30000:  # 成功
-                            success_count += 1
-                            if i % 50 == 0:  # 每50个输出一次进度
-                                self.logger.info(f"已创建 {success_count} 个VLAN，当前: {vlan_name}")
-                        else:
-                            failed_count += 1
-                            if result.get("Result") == 30001:  # 已存在
-                                self.logger.debug(f"VLAN{vlan_id}已存在，跳过")
-                            else:
-                                self.logger.warning(f"创建VLAN{vlan_id}失败: {result.get('ErrMsg', '未知错误')}")
-                    else:
-                        failed_count += 1
-                        self.logger.warning(f"创建VLAN{vlan_id}失败: HTTP {response.status}")
-                    
-                    # 只保存第一个API调用记录（用于去重）
-                    if i == 0:  # 只保存第一个VLAN的API记录
-                        try:
-                            from utils.api_recorder import save_api_call
-                            # 创建一个mock的request对象来保存API记录
-                            class MockRequest:
-                                def __init__(self, url, method, headers, data):
-                                    self.url = url
-                                    self.method = method
-                                    self.headers = headers
-                                    self.post_data = data
-                                    
-                                def all_headers(self):
-                                    return self.headers
-                            
-                            mock_request = MockRequest(
-                                f"http://{host}/Action/call",
-                                "POST",
-                                {
-                                    "accept": "application/json, text/plain, */*",
-                                    "content-type": "application/json;charset=UTF-8",
-                                    "cookie": cookie_str,
-                                    "referer": f"http://{host}/",
-                                },
-                                json.dumps(api_data)
-                            )
-                            
-                            json_path, curl_path = save_api_call("add_vlan_36", mock_request, response, use_timestamp=False)
-                            self.logger.info(f"[API-BATCH-ADD] 已保存批量创建API示例: {json_path}")
-                            self.logger.info(f"[API-BATCH-ADD] CURL: {curl_path}")
-                            
-                        except Exception as e:
-                            self.logger.warning(f"保存批量创建API记录失败: {e}")
-                        
-                except Exception as e:
-                    failed_count += 1
-                    self.logger.warning(f"创建VLAN{vlan_id}异常: {e}")
-                
-                # 每10个请求休息一下，避免请求过快
-                if i % 10 == 0:
-                    time.sleep(0.1)
-            
-            self.logger.info(f"批量创建完成: 成功{success_count}个, 失败{failed_count}个")
-            return success_count > 0
+            api_cfg = (YamlReader().read_yaml("config/test_config.yaml") or {}).get("api", {})
+            if concurrency is None:
+                concurrency = api_cfg.get("bulk_concurrency", 8)
+                max_concurrency = max(concurrency, api_cfg.get("bulk_max_concurrency", 32))
+            else:
+                max_concurrency = concurrency
+            
+            def make_task(vlan_id):
+                return lambda client: client.add_vlan(
+                    vlan_id=vlan_id,
+                    vlan_name=f"vlan{vlan_id}",
+                    ip_addr=f"10.{vlan_id // 256}.{vlan_id % 256}.1",  # 每个VLAN ID对应唯一网段
+                    comment=f"批量测试VLAN{vlan_id}"
+                )
+            
+            client = self.api_client()
+            provisioner = BulkProvisioner(
+                client,
+                concurrency=concurrency,
+                max_concurrency=max_concurrency,
+                slow_threshold_ms=api_cfg.get("slow_threshold_ms", 1000),
+                max_retries=api_cfg.get("max_retries", 3)
+            )
+            report = provisioner.run((start_id + i, make_task(start_id + i)) for i in range(count))
+            client.close()
+            self.last_provision_report = report
+            
+            for failure in report['failures']:
+                self.logger.warning(f"创建VLAN{failure['key']}失败: {failure['error']}")
+            self.logger.info(
+                f"批量创建完成: 成功{report['success']}个, 已存在{report['exists']}个, 失败{report['failed']}个"
+            )
+            return report['failed'] == 0
             
         except Exception as e:
             self.logger.error(f"批量创建VLAN失败: {e}")
             return False
+
+    def delete_all_vlans_via_api(self) -> bool:
+        """通过API删除全部VLAN（用于测试前置/清理）"""
+        try:
+            client = self.api_client()
+            deleted = client.delete_all_vlans()
+            client.close()
+            self.logger.info(f"已通过API删除 {deleted} 个VLAN")
+            return True
+        except Exception as e:
+            self.logger.error(f"通过API删除全部VLAN失败: {e}")
+            return False
+
+    def get_vlan_list_via_api(self, keywords: str = None):
+        """通过 show 接口获取VLAN列表（字段名与 get_vlan_list 保持一致）"""
+        try:
+            client = self.api_client()
+            rows = client.show_vlans(keywords=keywords)
+            client.close()
+            return [self._api_vlan_row(row) for row in rows]
+        except Exception as e:
+            self.logger.error(f"通过API获取VLAN列表失败: {e}")
+            return []
+    
+    @staticmethod
+    def _api_vlan_row(row: dict) -> dict:
+        """show 接口数据行转换为与 get_vlan_list 一致的字段名"""
+        return {
+            'id': str(row.get('vlan_id', '')),
+            'name': row.get('vlan_name', ''),
+            'mac': row.get('mac', ''),
+            'ip': row.get('ip_addr', ''),
+            'subnet_mask': row.get('netmask', ''),
+            'line': row.get('interface', ''),
+            'comment': row.get('comment', ''),
+            'enabled': row.get('enabled', ''),
+        }
     
     def test_pagination_display(self, page_sizes: list = [100, 50, 20, 10]) -> bool:
         """测试分页显示功能
@@ -2062,7 +1763,7 @@ class VlanPage(BasePage):
                 return False
             
             # 等待页面加载
-            time.sleep(2)
+            self.settle(2)
             
             results = []
             
@@ -2073,7 +1774,7 @@ class VlanPage(BasePage):
                     # 查找分页下拉框 - 根据录制的代码使用get_by_role("combobox")
                     # 通常分页下拉框在页面底部，可能需要滚动
                     self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    time.sleep(1)
+                    self.settle(1)
                     
                     # 查找分页下拉框
                     combobox = self.page.get_by_role("combobox")
@@ -2091,7 +1792,7 @@ class VlanPage(BasePage):
                     self.logger.info(f"已选择分页大小: {page_size}")
                     
                     # 等待页面更新
-                    time.sleep(2)
+                    self.settle(2)
                     
                     # 验证分页是否生效（检查表格行数）
                     # 使用更精确的选择器，排除表头行
@@ -2132,7 +1833,7 @@ class VlanPage(BasePage):
                     results.append(False)
                     
                 # 每次测试间隔
-                time.sleep(1)
+                self.settle(1)
             
             # 总体结果
             success_count = sum(results)
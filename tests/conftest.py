@@ -34,7 +34,15 @@ except ImportError:
 try:
     from utils.yaml_reader import YamlReader
     from utils.logger import Logger
+    from utils.wait_stats import WaitStats
+    from utils.call_profiler import CallProfiler, format_profile
+    from utils.log_context import log_context
+    from utils import result_channel
+    from utils.screenshot_helper import ScreenshotWriter
+    from utils.worker_sandbox import WorkerSandbox, current_worker_id
+    from utils.session_store import SessionStore
     from pages.login_page import LoginPage
+    from pages.base_page import BasePage
 except ImportError:
     # 如果导入失败，创建简单的替代类
     class YamlReader:
@@ -55,6 +63,18 @@ except ImportError:
         def login(self, username, password):
             return False
 
+    WaitStats = None
+    CallProfiler = None
+    log_context = None
+    ScreenshotWriter = None
+    WorkerSandbox = None
+
+    def current_worker_id():
+        return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+# 等待其他 worker 完成登录的最长时间（秒）
+SHARED_LOGIN_WAIT = 120
+
 @pytest.fixture(scope="session")
 def config():
     """加载测试配置"""
@@ -71,6 +91,11 @@ def test_data():
         'common': yaml_reader.read_yaml("data/common_data.yaml")
     }
 
+@pytest.fixture(scope="session")
+def worker_sandbox():
+    """当前 worker 的数据沙箱（VLAN ID / 分组名称区间）"""
+    return WorkerSandbox() if WorkerSandbox else None
+
 if PLAYWRIGHT_AVAILABLE:
     @pytest.fixture(scope="session")
     def browser_context():
@@ -107,6 +132,12 @@ if PLAYWRIGHT_AVAILABLE:
             
             browser.close()
 
+    def _restore_login(browser_context, login_page, router_config, state):
+        """把已验证的登录 Cookie 加入上下文并打开首页"""
+        browser_context.add_cookies(state.get('cookies', []))
+        login_page.navigate_to(f"http://{router_config.get('ip', '10.66.0.40')}/")
+        print(f"[{current_worker_id()}] 复用已保存的登录状态，跳过UI登录")
+
     @pytest.fixture(scope="session")
     def authenticated_page(browser_context, config):
         """Session级别的已登录页面 - 避免重复登录"""
@@ -116,20 +147,38 @@ if PLAYWRIGHT_AVAILABLE:
         screen_width, screen_height = get_screen_size()
         page.set_viewport_size({"width": screen_width, "height": screen_height})
         
-        # 执行一次登录
         login_page = LoginPage(page)
         router_config = config.get('router', {})
         
-        print("Session级别登录开始...")  # 移除emoji
-        success = login_page.login(
-            router_config.get('username', 'admin'),
-            router_config.get('password', 'admin123')
-        )
-        
-        if not success:
-            pytest.fail("Session级别登录失败，无法继续测试")
+        # 优先复用磁盘上的登录状态（一次接口调用校验），失效时才走UI登录；
+        # 并行执行时由抢到锁的 worker 登录，其余 worker 等待后复用
+        store = SessionStore(host=router_config.get('ip'))
+        state = store.load_valid()
+        owner = False
+        if state is None:
+            owner = store.acquire_lock(stale_after=SHARED_LOGIN_WAIT)
+            if not owner:
+                state = store.wait_for_login(timeout=SHARED_LOGIN_WAIT)
         
-        print("Session级别登录成功，后续测试将复用此登录状态")  # 移除emoji
+        try:
+            if state is not None:
+                _restore_login(browser_context, login_page, router_config, state)
+            else:
+                # 执行一次登录
+                print("Session级别登录开始...")  # 移除emoji
+                success = login_page.login(
+                    router_config.get('username', 'admin'),
+                    router_config.get('password', 'admin123')
+                )
+                
+                if not success:
+                    pytest.fail("Session级别登录失败，无法继续测试")
+                
+                store.save(browser_context)
+                print("Session级别登录成功，后续测试将复用此登录状态")  # 移除emoji
+        finally:
+            if owner:
+                store.release_lock()
         
         yield page
         page.close()
@@ -151,6 +200,14 @@ if PLAYWRIGHT_AVAILABLE:
         """已登录的页面 - 用于功能测试，复用Session登录状态"""
         return authenticated_page
 
+    @pytest.fixture(scope="session")
+    def router_api(authenticated_page):
+        """复用Session登录Cookie的接口客户端 - 用于数据准备、清理和校验"""
+        from utils.router_api import RouterApiClient
+        client = RouterApiClient.from_page(authenticated_page)
+        yield client
+        client.close()
+
 else:
     # 如果Playwright不可用，创建模拟的fixture
     @pytest.fixture(scope="session")
@@ -173,12 +230,97 @@ else:
         """模拟已登录页面"""
         return None
 
+    @pytest.fixture(scope="session")
+    def router_api(authenticated_page):
+        """模拟接口客户端"""
+        return None
+
+def _wait_savings_enabled():
+    """是否开启等待节省统计（config/test_config.yaml -> waits.report_savings）"""
+    if WaitStats is None:
+        return False
+    waits = (YamlReader().read_yaml("config/test_config.yaml") or {}).get('waits') or {}
+    return waits.get('report_savings', True)
+
+@pytest.fixture(autouse=True)
+def wait_savings(request):
+    """按用例统计事件等待相对固定sleep节省的时间"""
+    if not _wait_savings_enabled():
+        yield
+        return
+    stats = WaitStats()
+    stats.begin_test(request.node.nodeid)
+    yield
+    summary = stats.end_test()
+    if summary['count']:
+        Logger().get_logger().info(
+            f"[等待统计] {request.node.name}: 原固定等待 {summary['budget']:.1f}秒, "
+            f"实际等待 {summary['actual']:.1f}秒, 节省 {summary['saved']:.1f}秒 ({summary['count']}次)"
+        )
+
+@pytest.fixture(autouse=True)
+def log_correlation(request):
+    """用例执行期间的日志带上 test_id 字段（logging.format: json 时写入日志文件）"""
+    if log_context is None:
+        yield
+        return
+    with log_context(test_id=request.node.nodeid):
+        yield
+
+@pytest.fixture(autouse=True)
+def call_profile(request):
+    """按用例输出调用剖析分解（config/test_config.yaml -> profiling.enabled）"""
+    if CallProfiler is None or not CallProfiler().installed:
+        yield
+        return
+    profiler = CallProfiler()
+    profiler.begin_test(request.node.nodeid)
+    yield
+    summary = profiler.end_test()
+    # 在 test_end 之前写入结果通道，报告中随用例展示
+    result_channel.emit("profile", nodeid=request.node.nodeid, profile=summary)
+    Logger().get_logger().info(f"[调用剖析] {request.node.name}: {format_profile(summary)}")
+
+def pytest_sessionfinish(session, exitstatus):
+    """会话结束收尾：截图队列写盘并输出截图统计、关闭调用剖析 trace、保存等待和导航统计"""
+    if ScreenshotWriter is not None:
+        # 报告生成前确保后台队列中的截图已写盘
+        writer = ScreenshotWriter()
+        writer.flush()
+        stats = writer.stats()
+        if stats['saved'] or stats['skipped']:
+            Logger().get_logger().info(
+                f"[截图统计] 保存 {stats['saved']} 张, 重复跳过 {stats['skipped']} 张, "
+                f"超出预算删除 {stats['evicted']} 张, 占用 {stats['total_mb']}MB"
+            )
+    if CallProfiler is not None:
+        trace_file = CallProfiler().close()
+        if trace_file:
+            Logger().get_logger().info(f"[调用剖析] trace 文件已保存: {trace_file}")
+    if not _wait_savings_enabled():
+        return
+    try:
+        file_path = WaitStats().dump()
+        if file_path:
+            Logger().get_logger().info(f"[等待统计] 汇总已保存: {file_path}")
+        nav = BasePage.navigation_stats
+        if any(nav.values()):
+            Logger().get_logger().info(
+                f"[导航统计] 跳过 {nav['skipped']} 次, 地址直达 {nav['direct']} 次, "
+                f"菜单导航 {nav['menu']} 次, 失败 {nav['failed']} 次"
+            )
+    except Exception as e:
+        print(f"保存等待统计失败: {e}")
+
 def pytest_configure(config):
     """pytest配置"""
     # 确保必要的目录存在
     os.makedirs("logs", exist_ok=True)
     os.makedirs("screenshots", exist_ok=True)
     os.makedirs("reports/outputs", exist_ok=True)
+    # 调用剖析需在创建任何页面对象之前安装
+    if CallProfiler is not None:
+        CallProfiler().install()
 
 def pytest_runtest_makereport(item, call):
     """测试报告钩子"""
@@ -193,6 +335,12 @@ def pytest_runtest_makereport(item, call):
 
 def pytest_collection_modifyitems(config, items):
     """修改测试收集"""
+    # 并行模式(--dist loadgroup)下同一测试类的用例共享页面状态和测试数据，固定在同一 worker 执行
+    if config.pluginmanager.hasplugin("xdist"):
+        for item in items:
+            group = item.cls.__name__ if item.cls else item.module.__name__
+            item.add_marker(pytest.mark.xdist_group(name=group))
+    
     if not PLAYWRIGHT_AVAILABLE:
         # 如果Playwright不可用，跳过所有需要浏览器的测试
         skip_playwright = pytest.mark.skip(reason="Playwright not available")
@@ -0,0 +1,70 @@
+# 日志归档测试 - 跨进程清理只压缩已关闭的日志，GUI 仍持有的落盘文件不受影响
+import pytest
+import sys
+import os
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils import log_batcher
+from utils.log_batcher import LogBatcher
+from utils.log_rotation import DEFAULT_LOG_SETTINGS, cleanup_logs
+
+
+def _settings(log_dir):
+    settings = dict(DEFAULT_LOG_SETTINGS)
+    settings['dir'] = str(log_dir)
+    return settings
+
+
+def _make_idle(path, minutes):
+    stamp = time.time() - minutes * 60
+    os.utime(path, (stamp, stamp))
+
+
+class TestLogRotation:
+    """日志归档测试类"""
+
+    def test_closed_logs_are_compressed(self, tmp_path):
+        closed = tmp_path / "test_20260101_000000.log"
+        closed.write_text("旧日志\n", encoding="utf-8")
+        _make_idle(closed, 60)
+        recent = tmp_path / "test_20260101_010000.log"
+        recent.write_text("仍在写入\n", encoding="utf-8")
+
+        result = cleanup_logs(_settings(tmp_path))
+        assert result['compressed'] == 1
+        assert not closed.exists()
+        assert (tmp_path / "test_20260101_000000.log.gz").exists()
+        assert recent.exists()
+
+    def test_live_gui_spool_survives_idle_period(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(log_batcher, "SPOOL_HEARTBEAT_SECONDS", 0)
+        batcher = LogBatcher(spool_dir=str(tmp_path))
+        try:
+            batcher.push("开始执行测试")
+            batcher.drain()
+            # 界面长时间没有新日志，但定时器仍在调用 drain()
+            _make_idle(batcher.spool_file, 60)
+            assert batcher.drain() == []
+
+            result = cleanup_logs(_settings(tmp_path))
+            assert result == {'compressed': 0, 'deleted': 0}
+            assert batcher.spool_file.exists()
+
+            batcher.push("测试成功")
+            assert batcher.load_full_log(apply_filter=False)[-1].endswith("测试成功")
+        finally:
+            batcher.close()
+
+    def test_closed_gui_spool_is_archived(self, tmp_path):
+        batcher = LogBatcher(spool_dir=str(tmp_path))
+        batcher.push("开始执行测试")
+        batcher.close()
+        _make_idle(batcher.spool_file, 60)
+
+        assert cleanup_logs(_settings(tmp_path))['compressed'] == 1
+        assert not batcher.spool_file.exists()
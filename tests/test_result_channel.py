@@ -0,0 +1,70 @@
+# 结构化结果通道测试 - 在子进程中运行一个不依赖路由器的小用例集，检查事件文件内容
+import pytest
+import sys
+import os
+import subprocess
+from pathlib import Path
+from collections import Counter
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.result_channel import ResultCollector, iter_events
+
+DUMMY_SUITE = '''
+import pytest
+
+@pytest.mark.parametrize("value", [1, 2, 3])
+def test_pass(value):
+    assert value
+
+def test_fail():
+    assert False, "预期失败"
+
+def test_skip():
+    pytest.skip("预期跳过")
+'''
+
+
+def _run_dummy_suite(tmp_path, *extra_args):
+    """运行示例用例集，返回事件文件中的全部事件"""
+    (tmp_path / "test_dummy.py").write_text(DUMMY_SUITE, encoding="utf-8")
+    events_file = tmp_path / "events.jsonl"
+    env = {k: v for k, v in os.environ.items() if not k.startswith("PYTEST_XDIST")}
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(project_root), env.get("PYTHONPATH")]))
+    subprocess.run(
+        [sys.executable, "-m", "pytest", "-p", "utils.result_channel", f"--result-channel={events_file}",
+         "-p", "no:cacheprovider", "-q", "test_dummy.py", *extra_args],
+        cwd=tmp_path, env=env, capture_output=True, timeout=120
+    )
+    return list(iter_events(str(events_file)))
+
+
+class TestResultChannel:
+    """结果通道事件测试"""
+
+    def test_serial_events(self, tmp_path):
+        """串行执行时每个用例恰好一条 test_start / test_end"""
+        events = _run_dummy_suite(tmp_path)
+        ends = Counter(e['nodeid'] for e in events if e['event'] == 'test_end')
+        assert len(ends) == 5
+        assert set(ends.values()) == {1}
+
+        collector = ResultCollector()
+        for event in events:
+            collector.handle(event)
+        assert collector.finished
+        assert collector.stats == {'total': 5, 'passed': 3, 'failed': 1, 'skipped': 1, 'error': 0}
+
+    def test_xdist_events_not_duplicated(self, tmp_path):
+        """-n 2 时事件只由 worker 写入，主控进程不重复写 test_end"""
+        pytest.importorskip("xdist")
+        events = _run_dummy_suite(tmp_path, "-n", "2")
+        ends = [e for e in events if e['event'] == 'test_end']
+        per_node = Counter(e['nodeid'] for e in ends)
+        assert len(per_node) == 5
+        assert set(per_node.values()) == {1}, per_node
+        assert {e['worker'] for e in ends} <= {'gw0', 'gw1'}
+        starts = Counter(e['nodeid'] for e in events if e['event'] == 'test_start')
+        assert starts == per_node
@@ -16,6 +16,7 @@ from pages.sta_group_page import StaGroupPage
 from utils.yaml_reader import YamlReader
 from utils.logger import Logger
 from utils.screenshot_helper import ScreenshotHelper
+from utils.worker_sandbox import WorkerSandbox
 
 
 class BaseGroupTest:
@@ -31,6 +32,8 @@ class BaseGroupTest:
             cls.sta_group_data = cls.yaml_reader.read_yaml("data/sta_group.yaml")
             if not cls.sta_group_data:
                 raise Exception("终端分组测试数据为空")
+            # 并行执行时给分组名加上本 worker 的后缀
+            cls.sta_group_data = WorkerSandbox().map_group_data(cls.sta_group_data)
         except Exception as e:
             cls.logger.error(f"加载终端分组数据失败: {str(e)}")
             pytest.fail(f"无法加载测试数据: {str(e)}")
@@ -122,9 +125,8 @@ class GroupTestBase(BaseGroupTest):
                 navigate=False
             )
 
-            # 验证分组
-            addr_list_str = "\n".join(test_data["addr_list"])
-            assert self.group_page.verify_group_added(test_data["name"], addr_list_str)
+            # 验证分组（只读取新增的行）
+            assert self.group_page.verify_group_state()
 
             self._log_step(f"测试通过: {test_case}")
 
@@ -339,13 +341,8 @@ class GroupTestBase(BaseGroupTest):
                 timeout=5000
             )
 
-            # 搜索并验证新分组
-            assert self.group_page.search_group(new_name)
-            assert self.group_page.verify_group_added(new_name, new_addr_str)
-
-            # 验证原始分组不存在
-            assert self.group_page.search_group(original_name)
-            assert self.group_page.verify_no_data_prompt()
+            # 按名称搜索校验：新分组地址正确，原始分组不存在
+            assert self.group_page.verify_group_state(search=True)
 
             self._log_step(f"测试通过: {test_case}")
 
@@ -376,8 +373,8 @@ class GroupTestBase(BaseGroupTest):
             # 执行删除操作
             assert self.group_page.delete_group(group_name)
 
-            # 验证删除结果
-            assert self.group_page.search_group(group_name)
+            # 验证删除结果（按名称搜索后应显示暂无数据）
+            assert self.group_page.verify_group_state(search=True)
             assert self.group_page.verify_no_data_prompt()
 
             self._log_step(f"测试通过: {test_case}")
@@ -0,0 +1,98 @@
+# 表格状态模型测试 - 不依赖路由器，直接校验快照、变更登记和差异输出
+import pytest
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.table_state import TableState
+
+SNAPSHOT = [
+    {'id': '36', 'name': 'vlan36', 'ip': '192.168.36.1', 'comment': ''},
+    {'id': '201', 'name': 'vlan201', 'ip': '192.168.201.1', 'comment': '办公'},
+    {'id': '', 'name': '', 'ip': '', 'comment': ''},
+]
+
+
+class TestTableState:
+    """表格状态模型测试类"""
+
+    def test_snapshot_skips_rows_without_key(self):
+        state = TableState(SNAPSHOT, key='id')
+        assert set(state.rows) == {'36', '201'}
+        assert not state.pending
+        assert state.expected(36)['name'] == 'vlan36'
+
+    def test_add_edit_delete_only_pending_rows_checked(self):
+        state = TableState(SNAPSHOT, key='id')
+        state.expect_add({'id': '888', 'name': 'vlan888'})
+        state.expect_edit('36', {'comment': '新备注'})
+        state.expect_delete('201')
+        assert state.pending == {'888', '36', '201'}
+
+        # 实际行只需包含变更行，未变更的行不参与对比
+        actual = [{'id': '888', 'name': 'vlan888'},
+                  {'id': '36', 'name': 'vlan36', 'ip': '192.168.36.1', 'comment': ' 新备注 '}]
+        diff = state.diff(actual)
+        assert state.is_clean(diff), state.format_diff(diff)
+        state.commit()
+        assert not state.pending
+
+    def test_diff_reports_missing_unexpected_and_mismatched(self):
+        state = TableState(SNAPSHOT, key='id')
+        state.expect_add({'id': '888', 'name': 'vlan888'})
+        state.expect_edit('36', {'name': 'vlan36_edited'})
+        state.expect_delete('201')
+
+        diff = state.diff([{'id': '36', 'name': 'vlan36'}, {'id': '201', 'name': 'vlan201'}])
+        assert diff['missing'] == ['888']
+        assert diff['unexpected'] == ['201']
+        assert diff['mismatched']['36']['name'] == {'expected': 'vlan36_edited', 'actual': 'vlan36'}
+        assert not state.is_clean(diff)
+
+        text = state.format_diff(diff)
+        assert "缺少行: 888" in text
+        assert "应已删除但仍存在: 201" in text
+        assert "行 36 字段不一致" in text
+
+    def test_edit_renaming_key_checks_old_and_new_rows(self):
+        state = TableState([{'name': 'group_a', 'addrs': '10.0.0.1'}], key='name')
+        state.expect_edit('group_a', {'name': 'group_b', 'addrs': '10.0.0.2'})
+        assert state.pending == {'group_a', 'group_b'}
+        assert state.expected('group_a') is None
+
+        assert state.is_clean(state.diff([{'name': 'group_b', 'addrs': '10.0.0.2'}]))
+        assert state.diff([{'name': 'group_a', 'addrs': '10.0.0.1'},
+                           {'name': 'group_b', 'addrs': '10.0.0.2'}])['unexpected'] == ['group_a']
+
+    def test_edit_without_snapshot_row(self):
+        state = TableState(key='id')
+        state.expect_edit('888', {'name': 'vlan888_edited'})
+        assert state.expected('888') == {'id': '888', 'name': 'vlan888_edited'}
+        assert state.diff([{'id': '888', 'name': 'vlan888'}])['mismatched']['888']['name']['actual'] == 'vlan888'
+
+    def test_expect_clear(self):
+        state = TableState(SNAPSHOT, key='id')
+        state.expect_clear()
+        assert not state.rows
+        assert state.pending == {'36', '201'}
+        assert state.is_clean(state.diff([]))
+        assert state.diff([{'id': '36'}])['unexpected'] == ['36']
+
+    def test_normalizers_and_key_subset(self):
+        normalize = lambda text: tuple(sorted(line.split()[0] for line in text.splitlines() if line.strip()))
+        state = TableState(key='name', normalizers={'addrs': normalize})
+        state.expect_add({'name': 'g1', 'addrs': "10.0.0.2 备注\n10.0.0.1"})
+        state.expect_add({'name': 'g2', 'addrs': "10.0.0.3"})
+
+        actual = {'g1': {'name': 'g1', 'addrs': "10.0.0.1\n10.0.0.2"}}
+        assert state.is_clean(state.diff(actual, keys=['g1']))
+        assert state.diff(actual)['missing'] == ['g2']
+
+        state.commit(keys=['g1'])
+        assert state.pending == {'g2'}
+
+    def test_format_diff_clean(self):
+        assert TableState.format_diff({'missing': [], 'unexpected': [], 'mismatched': {}}) == "无差异"
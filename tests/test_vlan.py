@@ -15,6 +15,7 @@ from pages.vlan_page import VlanPage
 from utils.yaml_reader import YamlReader
 from utils.logger import Logger
 from utils.constants import DOWNLOAD_DIR
+from utils.worker_sandbox import WorkerSandbox
 
 class TestVlan:
     """VLAN功能测试类 - 完全基于YAML配置的优化版本"""
@@ -29,6 +30,8 @@ class TestVlan:
             self.vlan_data = self.yaml_reader.read_yaml("data/vlan_data.yaml")
             if not self.vlan_data:
                 raise Exception("VLAN测试数据为空")
+            # 并行执行时映射到本 worker 的VLAN ID区间
+            self.vlan_data = WorkerSandbox().map_vlan_data(self.vlan_data)
         except Exception as e:
             self.logger.error(f"加载VLAN测试数据失败: {str(e)}")
             pytest.fail(f"无法加载测试数据: {str(e)}")
@@ -252,15 +255,11 @@ class TestVlan:
 
                 vlan_page = VlanPage(logged_in_page)
 
-                # 1. 获取当前VLAN状态
+                # 1. 获取当前VLAN状态（表格快照，之后只校验变更的行）
                 self._log_step("步骤1: 查看当前系统VLAN配置状态")
-                try:
-                    initial_list = vlan_page.get_vlan_list()
-                    initial_count = len(initial_list)
-                    self._log_step(f"当前系统中有 {initial_count} 个VLAN")
-                except Exception as e:
-                    self._log_step(f"获取VLAN列表异常: {str(e)}", "error")
-                    initial_count = 0
+                vlan_state = vlan_page.snapshot_vlan_table()
+                assert vlan_state is not None, "读取VLAN表格失败"
+                self._log_step(f"当前系统中有 {len(vlan_state.rows)} 个VLAN")
 
                 # 2. 准备测试VLAN配置
                 self._log_step("步骤2: 规划新VLAN配置")
@@ -296,10 +295,10 @@ class TestVlan:
                 vlan_page.page.wait_for_load_state("networkidle", timeout=10000)
                 self._log_step("点击保存按钮完成", "success")
 
-                # 5. 验证VLAN配置结果
+                # 5. 验证VLAN配置结果（表单为手动填写，这里登记预期新增的行）
                 self._log_step("步骤4: 验证VLAN配置结果")
-                vlan_list = vlan_page.get_vlan_list()
-                assert any(v.get('id') == test_vlan['id'] for v in vlan_list), "新VLAN未出现在列表中"
+                vlan_state.expect_add({'id': test_vlan['id'], 'name': test_vlan['name']})
+                assert vlan_page.verify_vlan_state(), "新VLAN未出现在列表中"
                 self._log_step("VLAN配置验证通过", "success")
 
                 self._log_step("VLAN工作流程测试完成")
@@ -553,15 +552,16 @@ class TestVlan:
                             comment=vlan.get('comment', '')
                         )
                 
-                # 重新获取VLAN列表
-                all_vlans = vlan_page.get_vlan_list()
+                # 重新获取VLAN列表（show 接口，作为页面空搜索的对照）
+                all_vlans = vlan_page.get_vlan_list_via_api()
                 self._log_step(f"准备完成，当前系统中有 {len(all_vlans)} 个VLAN")
                 
-                # 步骤2: 执行各种搜索场景测试
+                # 步骤2: 执行各种搜索场景测试（直接调用 show 接口的搜索参数，断言响应数据行）
                 self._log_step("步骤2: 开始执行搜索场景测试")
                 
                 passed_scenarios = 0
                 failed_scenarios = 0
+                dom_scenario = None
                 
                 for scenario in search_scenarios:
                     search_type = scenario.get('search_type', '')
@@ -573,58 +573,44 @@ class TestVlan:
                     self._log_step(f"测试场景: {description}")
                     self._log_step(f"搜索内容: '{search_term}'")
                     
-                    # 执行搜索
-                    if vlan_page.search_vlan(search_term):
-                        self._log_step(f"搜索操作成功")
-                        
-                        # 验证搜索结果
-                        if search_type == "empty_search":
-                            # 空搜索应该显示所有结果
-                            filtered_vlans = vlan_page.get_filtered_vlan_list()
-                            if len(filtered_vlans) == len(all_vlans):
-                                self._log_step(f"空搜索显示所有结果，验证通过", "success")
-                                passed_scenarios += 1
-                            else:
-                                self._log_step(f"空搜索应显示 {len(all_vlans)} 个结果，实际显示 {len(filtered_vlans)} 个", "error")
-                                failed_scenarios += 1
-                        elif expected_count == 0:
-                            # 应该没有匹配结果
-                            if vlan_page.verify_search_results(search_term, expected_vlans):
-                                self._log_step(f"无匹配结果验证通过", "success")
-                                passed_scenarios += 1
-                            else:
-                                self._log_step(f"无匹配结果验证失败", "error")
-                                failed_scenarios += 1
+                    if search_type == "empty_search":
+                        # 空搜索应该显示所有结果：页面搜索框提交空内容，其 show 响应的总数与接口列表对比
+                        result_count = vlan_page.last_search_total if vlan_page.search_vlan(search_term) else None
+                        if result_count == len(all_vlans):
+                            self._log_step(f"空搜索显示所有结果，验证通过", "success")
+                            passed_scenarios += 1
                         else:
-                            # 验证具体的搜索结果
-                            if vlan_page.verify_search_results(search_term, expected_vlans):
-                                self._log_step(f"搜索结果验证通过", "success")
-                                passed_scenarios += 1
-                            else:
-                                self._log_step(f"搜索结果验证失败", "error")
-                                failed_scenarios += 1
+                            self._log_step(f"空搜索应显示 {len(all_vlans)} 个结果，实际显示 {result_count} 个", "error")
+                            failed_scenarios += 1
+                    elif vlan_page.verify_search_results(search_term, expected_vlans):
+                        self._log_step(f"{'无匹配结果' if expected_count == 0 else '搜索结果'}验证通过", "success")
+                        passed_scenarios += 1
+                        if dom_scenario is None and expected_vlans:
+                            dom_scenario = scenario
                     else:
-                        self._log_step(f"搜索操作失败", "error")
+                        self._log_step(f"{'无匹配结果' if expected_count == 0 else '搜索结果'}验证失败", "error")
                         failed_scenarios += 1
-                    
-                    # 每个场景测试完成后清空搜索
-                    vlan_page.clear_search()
-                    time.sleep(1)
                 
-                # 步骤3: 测试搜索的实时过滤效果
-                self._log_step("步骤3: 测试搜索的实时过滤效果")
+                # 步骤3: 通过页面搜索框执行一次搜索，并与页面表格交叉验证
+                self._log_step("步骤3: 页面搜索与表格显示交叉验证")
+                if dom_scenario is not None:
+                    search_term = dom_scenario.get('search_term', '')
+                    if vlan_page.search_vlan(search_term) and vlan_page.verify_search_results(
+                            search_term, dom_scenario.get('expected_vlans', []), dom_check=True):
+                        self._log_step(f"页面搜索'{search_term}'与表格显示一致", "success")
+                    else:
+                        self._log_step(f"页面搜索'{search_term}'与表格显示不一致", "error")
+                        failed_scenarios += 1
+                    vlan_page.clear_search()
+                else:
+                    self._log_step("没有可用于交叉验证的搜索场景，跳过", "warning")
                 
-                # 逐字符输入，观察实时过滤
+                # 逐字符输入的过滤效果（接口结果）
                 test_term = "vlan"
                 for i in range(1, len(test_term) + 1):
                     partial_term = test_term[:i]
-                    vlan_page.search_vlan(partial_term)
-                    filtered_count = len(vlan_page.get_filtered_vlan_list())
+                    filtered_count = len(vlan_page.search_vlan_via_api(partial_term))
                     self._log_step(f"输入'{partial_term}'，过滤后显示 {filtered_count} 个结果")
-                    time.sleep(0.5)
-                
-                # 清空搜索
-                vlan_page.clear_search()
                 
                 # 步骤4: 总结测试结果
                 self._log_step("步骤4: 搜索功能测试总结")
@@ -687,10 +673,11 @@ class TestVlan:
                 
                 vlan_page = VlanPage(logged_in_page)
                 
-                # 步骤1: 验证目标VLAN存在
+                # 步骤1: 验证目标VLAN存在（表格快照，之后的新增和编辑自动登记）
                 self._log_step(f"步骤1: 验证VLAN{vlan_id}存在")
-                initial_vlans = vlan_page.get_vlan_list()
-                target_found = any(vlan.get('id') == vlan_id for vlan in initial_vlans)
+                vlan_state = vlan_page.snapshot_vlan_table()
+                assert vlan_state is not None, "读取VLAN表格失败"
+                target_found = vlan_state.expected(vlan_id) is not None
                 
                 if not target_found:
                     self._log_step(f"目标VLAN{vlan_id}不存在，先创建", "warning")
@@ -730,18 +717,18 @@ class TestVlan:
                 if edit_result:
                     self._log_step("VLAN编辑操作执行成功", "success")
                     
-                    # 步骤5: 验证编辑结果
+                    # 步骤5: 验证编辑结果（只读取目标行，对比 verification_data 中的字段）
                     self._log_step("步骤4: 验证编辑结果")
                     verification_data = edit_test_data.get('verification_data', {})
-                    verify_result = vlan_page.verify_vlan_edited(vlan_id, verification_data)
+                    vlan_state.expect_edit(vlan_id, vlan_page.edit_columns(verification_data))
+                    verify_result = vlan_page.verify_vlan_state()
                     
                     if verify_result:
                         self._log_step("VLAN编辑结果验证通过", "success")
                         
-                        # 步骤6: 获取编辑后的VLAN信息
+                        # 步骤6: 校验通过后期望状态即为编辑后的VLAN信息，无需重新读取表格
                         self._log_step("步骤5: 获取编辑后的VLAN信息")
-                        updated_vlans = vlan_page.get_vlan_list()
-                        updated_vlan = next((v for v in updated_vlans if v.get('id') == vlan_id), None)
+                        updated_vlan = vlan_state.expected(vlan_id)
                         
                         if updated_vlan:
                             self._log_step(f"编辑后VLAN信息 - ID: {updated_vlan.get('id', '')}")
@@ -1,8 +1,37 @@
+# 接口抓包记录 - 单次样例文件(JSON + curl) 与 后台线程写入的 JSON Lines 归档
+import atexit
+import gzip
 import json
+import os
+import queue
+import re
+import threading
 import time
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any
 
+from utils.logger import Logger
+from utils.yaml_reader import YamlReader
+
+# 只用正则从请求体中取 func_name/action，避免对每个请求做JSON解析
+_FUNC_NAME_RE = re.compile(r'"func_name"\s*:\s*"([A-Za-z0-9_]+)"')
+_ACTION_RE = re.compile(r'"action"\s*:\s*"([A-Za-z0-9_]+)"')
+
+
+def peek_call(url: str, body: str | None):
+    """快速识别 POST /Action/call 请求，返回 (func_name, action)，不是接口调用时返回None
+
+    func_name/action 统一转为小写。
+    """
+    if not body or "/action/call" not in url.lower():
+        return None
+    m = _FUNC_NAME_RE.search(body)
+    if not m:
+        return None
+    a = _ACTION_RE.search(body)
+    return m.group(1).lower(), (a.group(1).lower() if a else "unknown")
+
 
 def _format_curl(request_url: str, method: str, headers: Dict[str, str], body: str | None = None) -> str:
     """根据请求信息构造 curl bash 命令字符串"""
@@ -19,27 +48,8 @@ def _format_curl(request_url: str, method: str, headers: Dict[str, str], body: s
     return "\n".join(parts)
 
 
-def save_api_call(name: str, request, response, base_dir: str = "api_logs/vlan", use_timestamp: bool = True) -> tuple[Path, Path]:
-    """保存接口请求/响应详情到文件，并生成 curl 命令
-
-    参数:
-        name: 逻辑名称，如 add_vlan36
-        request: Playwright.Request 对象
-        response: Playwright.Response 对象
-        base_dir: 保存目录
-        use_timestamp: 是否在文件名中包含时间戳
-    返回: (json文件路径, curl文件路径)
-    """
-    ts = int(time.time())
-    dir_path = Path(base_dir)
-    dir_path.mkdir(parents=True, exist_ok=True)
-
-    if use_timestamp:
-        file_path = dir_path / f"{name}_{ts}.json"
-    else:
-        file_path = dir_path / f"{name}.json"
-
-    # headers
+def build_api_record(request, response) -> Dict[str, Any]:
+    """读取 Playwright 请求/响应的完整详情（需在 Playwright 所在线程调用）"""
     # Playwright 的 headers() 可能省略 Cookie，用 all_headers() 可拿到完整数据
     try:
         req_headers = dict(request.all_headers())  # type: ignore
@@ -53,21 +63,8 @@ def save_api_call(name: str, request, response, base_dir: str = "api_logs/vlan",
     except Exception:
         body = ""
 
-    # 生成 python requests 片段
-    def _format_python(url: str, hdrs: Dict[str, str], body: str | None):
-        py = ["import requests, json", f"url = '{url}'", f"headers = {json.dumps(hdrs, ensure_ascii=False, indent=2)}"]
-        if body:
-            py.append(f"data = {json.dumps(body, ensure_ascii=False)}")
-            py.append("resp = requests.post(url, headers=headers, data=data, verify=False)")
-        else:
-            py.append("resp = requests.get(url, headers=headers, verify=False)")
-        py.append("print(resp.text)")
-        return "\n".join(py)
-
-    curl_cmd = _format_curl(request.url, request.method, req_headers, body)
-
     data: Dict[str, Any] = {
-        "timestamp": ts,
+        "timestamp": int(time.time()),
         "url": request.url,
         "method": request.method,
         "request_headers": req_headers,
@@ -75,8 +72,6 @@ def save_api_call(name: str, request, response, base_dir: str = "api_logs/vlan",
         "response_status": response.status,
         "response_headers": resp_headers,
         "response_body": None,
-        "curl": curl_cmd,
-        "python": _format_python(request.url, req_headers, body),
     }
 
     # 尝试解析响应 json
@@ -87,27 +82,213 @@ def save_api_call(name: str, request, response, base_dir: str = "api_logs/vlan",
             data["response_body"] = response.text()[:2000]
         except Exception:
             data["response_body"] = "<binary>"
+    return data
 
-    # 生成文件名
-    if use_timestamp:
-        json_filename = f"{name}_{ts}.json"
-        curl_filename = f"{name}_{ts}.curl"
+
+def _format_python(url: str, hdrs: Dict[str, str], body: str | None):
+    """生成 python requests 片段"""
+    py = ["import requests, json", f"url = '{url}'", f"headers = {json.dumps(hdrs, ensure_ascii=False, indent=2)}"]
+    if body:
+        py.append(f"data = {json.dumps(body, ensure_ascii=False)}")
+        py.append("resp = requests.post(url, headers=headers, data=data, verify=False)")
     else:
-        json_filename = f"{name}.json"
-        curl_filename = f"{name}.curl"
-    
-    json_file_path = dir_path / json_filename
-    curl_file_path = dir_path / curl_filename
-    
+        py.append("resp = requests.get(url, headers=headers, verify=False)")
+    py.append("print(resp.text)")
+    return "\n".join(py)
+
+
+def _sample_paths(name: str, base_dir: str, use_timestamp: bool, ts: int) -> tuple[Path, Path]:
+    stem = f"{name}_{ts}" if use_timestamp else name
+    dir_path = Path(base_dir)
+    return dir_path / f"{stem}.json", dir_path / f"{stem}.curl"
+
+
+def write_api_files(data: Dict[str, Any], json_file_path: Path, curl_file_path: Path) -> tuple[Path, Path]:
+    """把 build_api_record() 的结果写成 JSON 文件和 curl 文件"""
+    json_file_path.parent.mkdir(parents=True, exist_ok=True)
+    curl_cmd = _format_curl(data["url"], data["method"], data["request_headers"], data["request_body"])
+    data = dict(data, python=_format_python(data["url"], data["request_headers"], data["request_body"]))
+
     # 保存curl命令到单独的文件（纯文本，无引号）
     with open(curl_file_path, "w", encoding="utf-8") as f:
         f.write(curl_cmd)
-    
-    # 从data中移除curl字段，保存到JSON文件
-    data_without_curl = data.copy()
-    del data_without_curl["curl"]
-    
+
     with open(json_file_path, "w", encoding="utf-8") as f:
-        json.dump(data_without_curl, f, ensure_ascii=False, indent=2)
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+    return json_file_path, curl_file_path
+
+
+def save_api_call(name: str, request, response, base_dir: str = "api_logs/vlan", use_timestamp: bool = True) -> tuple[Path, Path]:
+    """保存接口请求/响应详情到文件，并生成 curl 命令
+
+    参数:
+        name: 逻辑名称，如 add_vlan36
+        request: Playwright.Request 对象
+        response: Playwright.Response 对象
+        base_dir: 保存目录
+        use_timestamp: 是否在文件名中包含时间戳
+    返回: (json文件路径, curl文件路径)
+    """
+    data = build_api_record(request, response)
+    json_file_path, curl_file_path = _sample_paths(name, base_dir, use_timestamp, data["timestamp"])
+    return write_api_files(data, json_file_path, curl_file_path)
+
+
+class ApiCaptureRecorder:
+    """接口抓包记录器（进程内单例）
+
+    - capture(): 在 Playwright 线程中只读取原始字符串并入队，不做JSON解析和磁盘IO
+    - 后台线程把记录追加到本次运行的单个 JSON Lines 归档（可选 gzip 压缩）
+    - save_sample(): 样例文件(JSON + curl)同样交给后台线程写入
+    - 按配置 api_capture.func_names / actions 过滤，不关心的调用直接丢弃
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if hasattr(self, 'initialized'):
+            return
+        self.initialized = True
+        cfg = (YamlReader().read_yaml("config/test_config.yaml") or {}).get('api_capture') or {}
+        self.enabled = cfg.get('enabled', True)
+        self.func_names = {f.lower() for f in cfg.get('func_names') or []}
+        self.actions = {a.lower() for a in cfg.get('actions') or []}
+        self.compress = cfg.get('compress', False)
+        self.archive_dir = Path(cfg.get('archive_dir', "api_logs/capture"))
+
+        self.captured = 0
+        self.dropped = 0
+        # 后台写入失败的记录数，只记录第一次失败的日志
+        self.write_errors = 0
+        self.archive_file = None
+        self._queue = queue.Queue(maxsize=cfg.get('queue_size', 10000))
+        self._thread = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # 生产端（Playwright 线程）
+    # ------------------------------------------------------------------
+    def wants(self, func_name: str, action: str = None) -> bool:
+        """是否需要记录该调用（func_names/actions 为空表示不限制）"""
+        if not self.enabled:
+            return False
+        if self.func_names and func_name not in self.func_names:
+            return False
+        return not (action and self.actions and action not in self.actions)
+
+    def capture(self, request, response, func_name: str, action: str, operation: str = None) -> bool:
+        """记录一次接口调用到归档，队列已满时丢弃并计数"""
+        if not self.wants(func_name, action):
+            return False
+        try:
+            response_text = response.text()
+        except Exception:
+            response_text = None
+        record = {
+            "time": round(time.time(), 3),
+            "operation": operation,
+            "func_name": func_name,
+            "action": action,
+            "url": request.url,
+            "method": request.method,
+            "request_headers": request.headers,
+            "request_body": request.post_data,
+            "response_status": response.status,
+            "response_body": response_text,
+        }
+        return self._put(("archive", record))
+
+    def save_sample(self, name: str, request, response, base_dir: str = "api_logs/vlan",
+                    use_timestamp: bool = False) -> tuple[Path, Path]:
+        """异步保存样例文件，返回将要写入的 (json文件路径, curl文件路径)"""
+        data = build_api_record(request, response)
+        paths = _sample_paths(name, base_dir, use_timestamp, data["timestamp"])
+        self._put(("sample", (data, paths)))
+        return paths
+
+    def _put(self, job) -> bool:
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(job)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    # ------------------------------------------------------------------
+    # 后台写入
+    # ------------------------------------------------------------------
+    def _ensure_writer(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="api-capture-writer")
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _open_archive(self):
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        worker = os.environ.get("PYTEST_XDIST_WORKER", "master")
+        name = f"capture_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{worker}.jsonl"
+        if self.compress:
+            self.archive_file = self.archive_dir / f"{name}.gz"
+            return gzip.open(self.archive_file, "at", encoding="utf-8")
+        self.archive_file = self.archive_dir / name
+        return open(self.archive_file, "a", encoding="utf-8")
+
+    def _run(self):
+        archive = None
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    break
+                kind, payload = job
+                if kind == "archive":
+                    if archive is None:
+                        archive = self._open_archive()
+                    body = payload["response_body"]
+                    try:
+                        payload["response_body"] = json.loads(body) if body else body
+                    except ValueError:
+                        payload["response_body"] = body[:2000]
+                    archive.write(json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n")
+                    self.captured += 1
+                    if self._queue.empty():
+                        archive.flush()
+                elif kind == "sample":
+                    data, (json_path, curl_path) = payload
+                    write_api_files(data, json_path, curl_path)
+            except Exception as e:
+                self.write_errors += 1
+                if self.write_errors == 1:
+                    Logger().get_logger().warning(f"抓包记录写入失败，后续失败只计数: {e}")
+            finally:
+                self._queue.task_done()
+        if archive is not None:
+            archive.close()
+
+    def flush(self):
+        """等待已入队的记录全部写入磁盘"""
+        if self._thread is not None:
+            self._queue.join()
 
-    return json_file_path, curl_file_path 
\ No newline at end of file
+    def close(self):
+        """写完剩余记录并关闭归档（进程退出时自动调用）"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        if thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout=10)
+        if self.dropped or self.write_errors:
+            Logger().get_logger().warning(
+                f"抓包记录: 已写入 {self.captured} 条, 队列满丢弃 {self.dropped} 条, 写入失败 {self.write_errors} 条")
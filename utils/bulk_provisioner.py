@@ -0,0 +1,187 @@
+# 批量数据下发工具 - 并发流水线 + 自适应退避
+import bisect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.logger import Logger
+from utils.router_api import RouterApiError
+
+
+class LatencyHistogram:
+    """请求耗时直方图（毫秒）"""
+
+    BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.samples = []
+
+    def record(self, seconds: float):
+        ms = seconds * 1000
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+            self.samples.append(ms)
+
+    def percentile(self, p: float) -> float:
+        with self._lock:
+            if not self.samples:
+                return 0.0
+            ordered = sorted(self.samples)
+        index = min(int(round(p / 100 * (len(ordered) - 1))), len(ordered) - 1)
+        return ordered[index]
+
+    def to_dict(self):
+        labels = [f"<={b}ms" for b in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]}ms"]
+        with self._lock:
+            buckets = dict(zip(labels, self.counts))
+            max_ms = max(self.samples) if self.samples else 0.0
+        return {
+            'buckets': buckets,
+            'p50_ms': round(self.percentile(50), 1),
+            'p95_ms': round(self.percentile(95), 1),
+            'max_ms': round(max_ms, 1),
+        }
+
+    def format(self) -> str:
+        """生成便于日志输出的文本直方图"""
+        data = self.to_dict()
+        total = sum(data['buckets'].values()) or 1
+        lines = []
+        for label, count in data['buckets'].items():
+            if count:
+                bar = "#" * max(1, int(count * 40 / total))
+                lines.append(f"{label:>10} {count:>6} {bar}")
+        lines.append(f"p50={data['p50_ms']}ms p95={data['p95_ms']}ms max={data['max_ms']}ms")
+        return "\n".join(lines)
+
+
+class BulkProvisioner:
+    """并发批量调用 /Action/call
+
+    - 在途请求数受并发窗口限制，窗口按 AIMD 自适应：
+      请求快速成功时缓慢增大，遇到错误或耗时超过阈值时减半
+    - 每个工作线程持有独立的 RouterApiClient（requests.Session），复用长连接
+    - 传输错误、超时等失败按指数退避重试；设备返回的 Result 错误码（参数校验失败等）
+      是确定性的，直接记为失败，不重试也不缩小窗口
+    """
+
+    def __init__(self, client, concurrency: int = 8, max_concurrency: int = 32, min_concurrency: int = 1,
+                 slow_threshold_ms: float = 1000, max_retries: int = 3, backoff_base: float = 0.2):
+        self.logger = Logger().get_logger()
+        self.client = client
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.window = float(min(max(concurrency, self.min_concurrency), self.max_concurrency))
+        self.slow_threshold_ms = slow_threshold_ms
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+
+        self.histogram = LatencyHistogram()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._peak_window = self.window
+        self._local = threading.local()
+        self._clients = []
+
+    def _thread_client(self):
+        """每个线程复用一个客户端，保持连接"""
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self.client.clone()
+            self._local.client = client
+            with self._cond:
+                self._clients.append(client)
+        return client
+
+    def _acquire(self):
+        with self._cond:
+            while self._in_flight >= int(self.window):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def _release(self, ok: bool, latency_ms: float):
+        with self._cond:
+            self._in_flight -= 1
+            if not ok or latency_ms > self.slow_threshold_ms:
+                # 乘性减小：路由器出错或变慢
+                self.window = max(float(self.min_concurrency), self.window / 2)
+            else:
+                # 加性增大：每成功一个窗口的请求，窗口 +1
+                self.window = min(float(self.max_concurrency), self.window + 1 / self.window)
+            self._peak_window = max(self._peak_window, self.window)
+            self._cond.notify_all()
+
+    def _run_one(self, key, operation):
+        """执行单个任务（含重试），返回 (key, status, detail)"""
+        for attempt in range(self.max_retries + 1):
+            self._acquire()
+            start = time.perf_counter()
+            ok = False
+            try:
+                result = operation(self._thread_client())
+                ok = True
+                status = self.client.decode_result(result)
+                return key, status, result
+            except RouterApiError as e:
+                detail = e
+                if e.result is not None:
+                    # 设备已正常处理并返回错误码，重试结果相同
+                    ok = True
+                    return key, "error", e
+            except Exception as e:
+                # 超时、连接错误等按失败处理并退避重试
+                detail = e
+            finally:
+                latency = time.perf_counter() - start
+                self.histogram.record(latency)
+                self._release(ok, latency * 1000)
+
+            if attempt < self.max_retries:
+                time.sleep(self.backoff_base * (2 ** attempt))
+        return key, "failed", detail
+
+    def run(self, tasks):
+        """执行任务列表
+
+        Args:
+            tasks: [(key, operation)]，operation 接收 RouterApiClient 并返回响应JSON
+        Returns:
+            dict: 执行报告
+        """
+        tasks = list(tasks)
+        started = time.perf_counter()
+        counts = {'success': 0, 'exists': 0, 'error': 0, 'failed': 0}
+        failures = []
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="provision") as pool:
+            futures = [pool.submit(self._run_one, key, op) for key, op in tasks]
+            for future in futures:
+                key, status, detail = future.result()
+                counts[status] = counts.get(status, 0) + 1
+                if status in ("failed", "error"):
+                    failures.append({'key': key, 'error': str(detail.get('ErrMsg') if isinstance(detail, dict) else detail)})
+
+        for client in self._clients:
+            client.close()
+
+        elapsed = time.perf_counter() - started
+        report = {
+            'total': len(tasks),
+            'success': counts['success'],
+            'exists': counts['exists'],
+            'failed': counts['failed'] + counts['error'],
+            'elapsed': round(elapsed, 3),
+            'throughput': round(len(tasks) / elapsed, 2) if elapsed > 0 else 0.0,
+            'final_concurrency': round(self.window, 2),
+            'peak_concurrency': round(self._peak_window, 2),
+            'latency': self.histogram.to_dict(),
+            'failures': failures[:50],
+        }
+        self.logger.info(
+            f"[批量下发] 共{report['total']}个: 成功{report['success']}, 已存在{report['exists']}, "
+            f"失败{report['failed']}, 耗时{report['elapsed']}秒, 吞吐{report['throughput']}个/秒, "
+            f"并发窗口峰值{report['peak_concurrency']}"
+        )
+        self.logger.info(f"[批量下发] 请求耗时分布:\n{self.histogram.format()}")
+        return report
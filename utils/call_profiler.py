@@ -0,0 +1,360 @@
+# 调用剖析 - 记录页面对象方法、Playwright 调用、sleep 和接口调用的耗时与调用栈，按用例输出火焰图式分解和 trace 文件
+#
+# 开启: config/test_config.yaml -> profiling.enabled: true（默认关闭，关闭时不做任何包装）
+# trace 文件为 Chrome Trace Event 格式（reports/outputs/trace_<worker>_<ts>.json），
+# 可在 chrome://tracing 或 https://ui.perfetto.dev 中打开。
+import functools
+import json
+import os
+import threading
+import time
+import types
+from datetime import datetime
+from pathlib import Path
+from utils.yaml_reader import YamlReader
+
+DEFAULT_PROFILING_SETTINGS = {
+    'enabled': False,
+    'trace': True,                 # 是否写 trace 文件
+    'trace_dir': 'reports/outputs',
+    'max_trace_events': 200000,    # 单个进程写入 trace 的事件上限，超出后只做汇总
+    'min_node_percent': 0.5,       # 分解树中占比低于该值的节点合并为"其他"
+}
+
+# 调用类别：sleep 固定等待 / wait 条件等待 / network 导航和接口 / ipc 其他 Playwright 调用 / code 页面对象自身代码
+CATEGORIES = ('sleep', 'wait', 'network', 'ipc', 'code')
+CATEGORY_NAMES = {'sleep': '固定等待', 'wait': '条件等待', 'network': '导航/接口', 'ipc': 'Playwright调用', 'code': '页面对象代码'}
+_SLEEP_CALLS = {'wait_for_timeout', 'sleep'}
+_NETWORK_CALLS = {'goto', 'reload', 'go_back', 'go_forward', 'wait_for_url', 'wait_for_load_state',
+                  'expect_response', 'expect_request', 'expect_navigation', 'expect_download', 'call'}
+
+
+def categorize(name: str) -> str:
+    """按调用名归类"""
+    if name in _SLEEP_CALLS:
+        return 'sleep'
+    if name in _NETWORK_CALLS:
+        return 'network'
+    if name.startswith(('wait_for', 'expect_')):
+        return 'wait'
+    return 'ipc'
+
+
+class ProfiledProxy:
+    """包装 Playwright 对象，记录每次方法调用；返回的 Locator/ElementHandle 等对象继续包装
+
+    expect_response() 等返回的上下文管理器在 __exit__ 时才真正等待，该段耗时按创建它的调用归类。
+    """
+
+    def __init__(self, target, profiler, label: str = None):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_profiler", profiler)
+        object.__setattr__(self, "_label", label or type(target).__name__)
+
+    @staticmethod
+    def _is_playwright(value) -> bool:
+        return type(value).__module__.startswith("playwright.")
+
+    def _wrap(self, value, label=None):
+        if self._is_playwright(value):
+            return ProfiledProxy(value, self._profiler, label)
+        if isinstance(value, list) and value and self._is_playwright(value[0]):
+            return [ProfiledProxy(item, self._profiler) for item in value]
+        return value
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if not callable(value):
+            return self._wrap(value)
+        label = f"{type(self._target).__name__}.{name}"
+        category = categorize(name)
+        profiler = self._profiler
+        # expect_* 只创建上下文管理器，等待发生在 __exit__ 中
+        deferred = name.startswith("expect_")
+
+        def call(*args, **kwargs):
+            frame = None if deferred else profiler.enter(label, category)
+            try:
+                result = value(*args, **kwargs)
+            finally:
+                profiler.exit(frame)
+            return self._wrap(result, label)
+        return call
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+
+    def __enter__(self):
+        return self._wrap(self._target.__enter__())
+
+    def __exit__(self, *exc):
+        frame = self._profiler.enter(self._label, categorize(self._label.rsplit(".", 1)[-1]))
+        try:
+            return self._target.__exit__(*exc)
+        finally:
+            self._profiler.exit(frame)
+
+    def __iter__(self):
+        return iter(self._target)
+
+    def __len__(self):
+        return len(self._target)
+
+
+class CallProfiler:
+    """调用剖析（单例）
+
+    install() 包装 BasePage 及其子类的方法、time.sleep 和 RouterApiClient.call；
+    BasePage 创建时通过 wrap() 拿到包装后的 Page。每个调用按调用栈路径累计总耗时和自身耗时，
+    end_test() 返回该用例的分解：
+        by_category: 各类别自身耗时（合计即为被剖析的总时间）
+        by_method:   页面对象方法的总耗时及其中各类别耗时
+        tree:        按调用栈合并的分解树（火焰图的数据）
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            self.initialized = True
+            cfg = YamlReader().read_yaml("config/test_config.yaml") or {}
+            self.settings = dict(DEFAULT_PROFILING_SETTINGS)
+            self.settings.update(cfg.get('profiling') or {})
+            self.enabled = bool(self.settings.get('enabled'))
+            self.installed = False
+            self.active = False
+            self._lock = threading.Lock()
+            self._local = threading.local()
+            self._restore = []
+            self._t0 = time.perf_counter()
+            self._trace_file = None
+            self._trace_path = None
+            self._trace_events = 0
+            self._reset_test("session")
+
+    def _reset_test(self, test_id: str):
+        self._test_id = test_id
+        self._test_start = time.perf_counter()
+        self._paths = {}
+        self._by_category = {}
+        self._by_method = {}
+        self._calls = 0
+
+    # ------------------------------------------------------------------
+    # 安装
+    # ------------------------------------------------------------------
+    def install(self):
+        """包装页面对象方法、time.sleep 和接口客户端（未开启时不做任何事）"""
+        if self.installed or not self.enabled:
+            return False
+        from pages.base_page import BasePage
+        import pages.login_page, pages.vlan_page, pages.sta_group_page  # noqa: F401  确保子类已定义
+        from utils.router_api import RouterApiClient
+
+        classes, pending = [], [BasePage]
+        while pending:
+            cls = pending.pop()
+            classes.append(cls)
+            pending.extend(cls.__subclasses__())
+        for cls in classes:
+            for name, value in list(vars(cls).items()):
+                # 只包装普通方法，staticmethod/classmethod/property 保持原样
+                if isinstance(value, types.FunctionType) and not name.startswith("__") \
+                        and not getattr(value, "__profiled__", False):
+                    self._patch(cls, name, self._profiled(value, f"{cls.__name__}.{name}", 'code'))
+
+        self._patch(time, "sleep", self._profiled(time.sleep, "time.sleep", 'sleep'))
+        self._patch(RouterApiClient, "call", self._profiled(RouterApiClient.call, "RouterApiClient.call", 'network'))
+        self.installed = True
+        return True
+
+    def uninstall(self):
+        for owner, name, original in reversed(self._restore):
+            setattr(owner, name, original)
+        self._restore.clear()
+        self.installed = False
+
+    def _patch(self, owner, name, replacement):
+        self._restore.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, replacement)
+
+    def _profiled(self, fn, label: str, category: str):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            frame = self.enter(label, category)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.exit(frame)
+        wrapper.__profiled__ = True
+        return wrapper
+
+    def wrap(self, page):
+        """返回记录调用的 Page 包装（未安装时原样返回）"""
+        if not self.installed or page is None or isinstance(page, ProfiledProxy):
+            return page
+        return ProfiledProxy(page, self, "Page")
+
+    # ------------------------------------------------------------------
+    # 记录
+    # ------------------------------------------------------------------
+    def _frames(self):
+        frames = getattr(self._local, "frames", None)
+        if frames is None:
+            frames = self._local.frames = []
+        return frames
+
+    def enter(self, name: str, category: str):
+        if not self.active:
+            return None
+        frame = [name, category, time.perf_counter(), 0.0]
+        self._frames().append(frame)
+        return frame
+
+    def exit(self, frame):
+        if frame is None:
+            return
+        end = time.perf_counter()
+        frames = self._frames()
+        # 用例在调用过程中结束时栈可能已被清空
+        if not frames or frames[-1] is not frame:
+            return
+        frames.pop()
+        name, category, start, child = frame
+        duration = end - start
+        if frames:
+            frames[-1][3] += duration
+        path = tuple(f[0] for f in frames) + (name,)
+        owner = next((f[0] for f in reversed(frames) if f[1] == 'code'), None)
+        self._record(path, category, start, duration, duration - child, owner)
+
+    def _record(self, path, category, start, duration, self_time, owner):
+        with self._lock:
+            self._calls += 1
+            node = self._paths.get(path)
+            if node is None:
+                node = self._paths[path] = {'category': category, 'count': 0, 'total': 0.0, 'self': 0.0}
+            node['count'] += 1
+            node['total'] += duration
+            node['self'] += self_time
+            self._by_category[category] = self._by_category.get(category, 0.0) + self_time
+
+            if category == 'code':
+                method = self._by_method.setdefault(path[-1], {'count': 0, 'total': 0.0, 'categories': {}})
+                method['count'] += 1
+                if path[-1] not in path[:-1]:
+                    method['total'] += duration
+                owner = path[-1]
+            if owner is not None:
+                categories = self._by_method.setdefault(owner, {'count': 0, 'total': 0.0, 'categories': {}})['categories']
+                categories[category] = categories.get(category, 0.0) + self_time
+
+            self._write_trace(path[-1], category, start, duration)
+
+    def _write_trace(self, name, category, start, duration, args=None):
+        if not self.settings.get('trace') or self._trace_events >= self.settings['max_trace_events']:
+            return
+        if self._trace_file is None:
+            out_dir = Path(self.settings['trace_dir'])
+            out_dir.mkdir(parents=True, exist_ok=True)
+            worker = os.environ.get("PYTEST_XDIST_WORKER", "master")
+            self._trace_path = out_dir / f"trace_{worker}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            self._trace_file = open(self._trace_path, "w", encoding="utf-8")
+            self._trace_file.write("[\n")
+        event = {'name': name, 'cat': category, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+                 'ts': round((start - self._t0) * 1e6), 'dur': round(duration * 1e6)}
+        if args:
+            event['args'] = args
+        self._trace_file.write(("," if self._trace_events else "") + json.dumps(event, ensure_ascii=False) + "\n")
+        self._trace_events += 1
+
+    # ------------------------------------------------------------------
+    # 按用例汇总
+    # ------------------------------------------------------------------
+    def begin_test(self, test_id: str):
+        with self._lock:
+            self._reset_test(test_id)
+        self._local.frames = []
+        self.active = True
+
+    def end_test(self) -> dict:
+        """结束当前用例的剖析，返回分解汇总（毫秒）"""
+        self.active = False
+        end = time.perf_counter()
+        with self._lock:
+            summary = self._summarize(end - self._test_start)
+            self._write_trace(self._test_id, 'test', self._test_start, end - self._test_start,
+                              args={'calls': self._calls})
+            self._reset_test("session")
+        return summary
+
+    def _summarize(self, wall: float) -> dict:
+        profiled = sum(node['total'] for path, node in self._paths.items() if len(path) == 1)
+        ms = lambda seconds: round(seconds * 1000, 1)
+        methods = sorted(self._by_method.items(), key=lambda item: -item[1]['total'])
+        return {
+            'test_id': self._test_id,
+            'wall_ms': ms(wall),
+            'profiled_ms': ms(profiled),
+            'calls': self._calls,
+            'by_category': {category: ms(self._by_category[category])
+                            for category in CATEGORIES if category in self._by_category},
+            'by_method': [
+                {'method': name, 'count': record['count'], 'total_ms': ms(record['total']),
+                 'categories': {c: ms(v) for c, v in sorted(record['categories'].items(), key=lambda i: -i[1])}}
+                for name, record in methods[:20] if record['count']
+            ],
+            'tree': self._build_tree(profiled),
+        }
+
+    def _build_tree(self, profiled: float) -> list:
+        """把调用栈路径合并为树，占比过小的子节点合并为"其他" """
+        root = {'children': {}}
+        for path, node in self._paths.items():
+            parent = root
+            for name in path[:-1]:
+                parent = parent['children'].setdefault(name, {'name': name, 'category': 'code', 'count': 0,
+                                                               'total': 0.0, 'self': 0.0, 'children': {}})
+            entry = parent['children'].setdefault(path[-1], {'name': path[-1], 'children': {}})
+            entry.update({'category': node['category'], 'count': node['count'],
+                          'total': node['total'], 'self': node['self']})
+
+        threshold = profiled * self.settings['min_node_percent'] / 100
+
+        def convert(children):
+            nodes, other = [], 0.0
+            for child in sorted(children.values(), key=lambda c: -c['total']):
+                if child['total'] < threshold:
+                    other += child['total']
+                    continue
+                nodes.append({'name': child['name'], 'category': child['category'], 'count': child['count'],
+                              'total_ms': round(child['total'] * 1000, 1), 'self_ms': round(child['self'] * 1000, 1),
+                              'children': convert(child['children'])})
+            if round(other * 1000, 1) > 0:
+                nodes.append({'name': '其他', 'category': 'other', 'count': 0, 'total_ms': round(other * 1000, 1),
+                              'self_ms': round(other * 1000, 1), 'children': []})
+            return nodes
+        return convert(root['children'])
+
+    def close(self):
+        """结束 trace 文件，返回文件路径"""
+        with self._lock:
+            if self._trace_file is None:
+                return None
+            self._trace_file.write("]\n")
+            self._trace_file.close()
+            self._trace_file = None
+            self._trace_events = 0
+            return self._trace_path
+
+
+def format_profile(summary: dict) -> str:
+    """单行文本形式的分解（写入日志）"""
+    categories = ", ".join(f"{CATEGORY_NAMES.get(c, c)} {v / 1000:.1f}秒" for c, v in summary['by_category'].items())
+    top = ", ".join(f"{m['method']} {m['total_ms'] / 1000:.1f}秒" for m in summary['by_method'][:3])
+    return (f"总耗时 {summary['wall_ms'] / 1000:.1f}秒, 页面对象内 {summary['profiled_ms'] / 1000:.1f}秒 "
+            f"({summary['calls']}次调用) | {categories} | 最耗时: {top}")
@@ -0,0 +1,103 @@
+# 多轮执行插件 - 在同一个pytest进程内重复执行用例，浏览器和登录会话跨轮次保持
+#
+# 用法: python -m pytest -p utils.cycle_plugin --cycles 10 tests/test_vlan.py
+import time
+import pytest
+from utils import result_channel
+from utils.log_context import current_cycle
+
+# 轮次边界标记，TestRunner 据此切分每轮输出（统计取自结果通道的 cycle_end 事件）
+CYCLE_START_MARKER = "[循环开始]"
+CYCLE_END_MARKER = "[循环结束]"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("cycles", "多轮执行")
+    group.addoption("--cycles", type=int, default=1,
+                    help="在同一进程内重复执行所选用例的轮数（会话级fixture跨轮复用）")
+    group.addoption("--cycle-maxfail", type=int, default=0,
+                    help="单轮失败数达到该值时结束本轮，进入下一轮（0表示不限制）")
+
+
+def pytest_configure(config):
+    # xdist worker 由 xdist 驱动执行循环，不接管
+    if config.getoption("cycles") > 1 and not hasattr(config, "workerinput"):
+        config.pluginmanager.register(CycleRunner(config), "cycle_runner")
+
+
+class CycleRunner:
+    """接管 pytest_runtestloop，按轮次重复执行 session.items
+
+    每轮最后一个用例的 nextitem 指向下一轮第一个用例，
+    因此 session 级 fixture（浏览器、已登录页面、接口客户端）只在全部轮次结束后才销毁。
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.cycles = config.getoption("cycles")
+        self.cycle_maxfail = config.getoption("cycle_maxfail")
+        self.stats = None
+
+    @staticmethod
+    def _empty_stats():
+        return {'total': 0, 'passed': 0, 'failed': 0, 'skipped': 0, 'error': 0}
+
+    def pytest_runtest_logreport(self, report):
+        """按轮次统计结果（setup/teardown 失败计为 error）"""
+        if self.stats is None:
+            return
+        if report.when == "call":
+            self.stats['total'] += 1
+            if report.passed:
+                self.stats['passed'] += 1
+            elif report.failed:
+                self.stats['failed'] += 1
+            elif report.skipped:
+                self.stats['skipped'] += 1
+        elif report.when == "setup" and report.skipped:
+            self.stats['total'] += 1
+            self.stats['skipped'] += 1
+        elif report.failed:
+            if report.when == "setup":
+                self.stats['total'] += 1
+            self.stats['error'] += 1
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtestloop(self, session):
+        if session.config.option.collectonly:
+            return None
+        if session.testsfailed and not session.config.option.continue_on_collection_errors:
+            raise session.Interrupted(f"{session.testsfailed} error(s) during collection")
+
+        items = session.items
+        for cycle in range(1, self.cycles + 1):
+            self.stats = self._empty_stats()
+            start = time.time()
+            print(f"\n{CYCLE_START_MARKER} {cycle}/{self.cycles}", flush=True)
+            result_channel.emit("cycle_start", cycle=cycle, cycles=self.cycles)
+            current_cycle.set(cycle)
+
+            for i, item in enumerate(items):
+                if i + 1 < len(items):
+                    nextitem = items[i + 1]
+                else:
+                    nextitem = items[0] if cycle < self.cycles else None
+                item.config.hook.pytest_runtest_protocol(item=item, nextitem=nextitem)
+
+                if session.shouldfail:
+                    raise session.Failed(session.shouldfail)
+                if session.shouldstop:
+                    raise session.Interrupted(session.shouldstop)
+                if self.cycle_maxfail and self.stats['failed'] + self.stats['error'] >= self.cycle_maxfail:
+                    if cycle < self.cycles:
+                        # 提前结束本轮：只拆除下一轮首个用例用不到的fixture
+                        session._setupstate.teardown_exact(items[0])
+                    print(f"\n本轮失败数达到 {self.cycle_maxfail}，提前结束第 {cycle} 轮", flush=True)
+                    break
+
+            self.stats['duration'] = round(time.time() - start, 2)
+            print(f"\n{CYCLE_END_MARKER} {cycle}/{self.cycles}", flush=True)
+            result_channel.emit("cycle_end", cycle=cycle, cycles=self.cycles, stats=dict(self.stats))
+
+        self.stats = None
+        return True
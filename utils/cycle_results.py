@@ -0,0 +1,197 @@
+# 多轮结果存储 - 每次用例执行一行紧凑记录，按用例跨轮汇总通过率、耗时分布和失败聚集情况
+#
+# 记录格式（JSON Lines）: {"cycle": 3, "nodeid": "tests/test_vlan.py::TestVlan::test_add_vlan",
+#                          "outcome": "failed", "duration": 12.3, "message": "AssertionError: ..."}
+#
+# 用法: python -m utils.cycle_results reports/outputs/cycle_results_20250101_120000.jsonl
+import json
+import math
+import os
+import re
+import sys
+import threading
+from collections import Counter
+
+MESSAGE_LIMIT = 200
+
+_SEVERITY = {'skipped': 0, 'passed': 1, 'failed': 2, 'error': 3}
+
+# 失败信息归类时抹掉数字、地址等易变部分
+_VOLATILE = re.compile(r"0x[0-9a-fA-F]+|\d+(?:\.\d+)*")
+
+
+def percentile(values, pct: float) -> float:
+    """最近秩法分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def failure_signature(message: str) -> str:
+    """失败信息签名：去掉数字后的首行，用于把同类失败归为一组"""
+    first_line = (message or "").strip().splitlines()[0] if (message or "").strip() else "(无失败信息)"
+    return _VOLATILE.sub("N", first_line)[:MESSAGE_LIMIT]
+
+
+class CycleResultStore:
+    """写入端：TestRunner 每收到一条 test_end 事件写一行"""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def record(self, cycle: int, nodeid: str, outcome: str, duration: float, message: str = ""):
+        line = json.dumps({
+            'cycle': cycle,
+            'nodeid': nodeid,
+            'outcome': outcome,
+            'duration': round(float(duration or 0.0), 3),
+            'message': (message or "")[:MESSAGE_LIMIT],
+        }, ensure_ascii=False)
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line + "\n")
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def iter_records(path):
+    """逐行读取结果存储，跳过损坏的行"""
+    if not path or not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def _failure_streaks(failure_cycles):
+    """连续失败的轮次区间 [(起, 止), ...]"""
+    streaks = []
+    for cycle in sorted(failure_cycles):
+        if streaks and cycle == streaks[-1][1] + 1:
+            streaks[-1][1] = cycle
+        else:
+            streaks.append([cycle, cycle])
+    return [tuple(streak) for streak in streaks]
+
+
+def aggregate(records) -> dict:
+    """按用例汇总多轮结果
+
+    Returns:
+        {
+            'cycles': 轮次数,
+            'cycle_list': 全部轮次号,
+            'total_runs': 执行次数,
+            'tests': [{nodeid, name, runs, passed, failed, error, skipped, pass_rate, min, p50, p95, max,
+                       first_failure_cycle, failure_cycles, streaks, signatures, outcomes: {轮次: 结果}}],
+            'cycle_failures': {轮次: 失败用例数},
+            'clusters': [{signature, count, tests, cycles}]   # 同类失败聚集
+        }
+    """
+    tests = {}
+    cycles = set()
+    cycle_failures = Counter()
+    clusters = {}
+    total_runs = 0
+
+    for record in records:
+        total_runs += 1
+        cycle = int(record.get('cycle') or 0)
+        nodeid = record.get('nodeid', '')
+        outcome = record.get('outcome', 'error')
+        cycles.add(cycle)
+
+        test = tests.get(nodeid)
+        if test is None:
+            test = tests[nodeid] = {
+                'nodeid': nodeid,
+                'name': nodeid.split("::")[-1],
+                'runs': 0, 'passed': 0, 'failed': 0, 'error': 0, 'skipped': 0,
+                'durations': [],
+                'failure_cycles': [],
+                'signatures': Counter(),
+                'outcomes': {},
+            }
+        test['runs'] += 1
+        test[outcome if outcome in ('passed', 'failed', 'error', 'skipped') else 'error'] += 1
+        if outcome != 'skipped':
+            test['durations'].append(float(record.get('duration') or 0.0))
+        # 同一轮内重复执行时保留最差的结果
+        if _SEVERITY.get(outcome, 3) >= _SEVERITY.get(test['outcomes'].get(cycle), -1):
+            test['outcomes'][cycle] = outcome
+
+        if outcome in ('failed', 'error'):
+            signature = failure_signature(record.get('message', ''))
+            test['failure_cycles'].append(cycle)
+            test['signatures'][signature] += 1
+            cycle_failures[cycle] += 1
+            cluster = clusters.setdefault(signature, {'signature': signature, 'count': 0, 'tests': set(), 'cycles': set()})
+            cluster['count'] += 1
+            cluster['tests'].add(test['name'])
+            cluster['cycles'].add(cycle)
+
+    results = []
+    for test in tests.values():
+        durations = test.pop('durations')
+        executed = test['runs'] - test['skipped']
+        test.update({
+            'pass_rate': round(test['passed'] / executed * 100, 1) if executed else 0.0,
+            'min': round(min(durations), 2) if durations else 0.0,
+            'p50': round(percentile(durations, 50), 2),
+            'p95': round(percentile(durations, 95), 2),
+            'max': round(max(durations), 2) if durations else 0.0,
+            'first_failure_cycle': min(test['failure_cycles']) if test['failure_cycles'] else None,
+            'streaks': _failure_streaks(test['failure_cycles']),
+            'signatures': test['signatures'].most_common(),
+        })
+        results.append(test)
+    # 不稳定的用例排在前面
+    results.sort(key=lambda t: (t['pass_rate'], t['nodeid']))
+
+    return {
+        'cycles': len(cycles),
+        'cycle_list': sorted(cycles),
+        'total_runs': total_runs,
+        'tests': results,
+        'cycle_failures': dict(sorted(cycle_failures.items())),
+        'clusters': sorted(
+            ({'signature': c['signature'], 'count': c['count'],
+              'tests': sorted(c['tests']), 'cycles': sorted(c['cycles'])} for c in clusters.values()),
+            key=lambda c: -c['count']
+        ),
+    }
+
+
+def format_summary(summary: dict) -> str:
+    """文本形式的汇总（命令行输出）"""
+    lines = [f"共 {summary['cycles']} 轮，{summary['total_runs']} 次用例执行"]
+    for test in summary['tests']:
+        first = f"第{test['first_failure_cycle']}轮" if test['first_failure_cycle'] else "无"
+        lines.append(f"  {test['name']:<40} 通过率 {test['pass_rate']:>5.1f}% ({test['passed']}/{test['runs']})  "
+                     f"耗时 min/p50/p95/max {test['min']}/{test['p50']}/{test['p95']}/{test['max']}秒  首次失败: {first}")
+    if summary['clusters']:
+        lines.append("失败归类:")
+        for cluster in summary['clusters']:
+            lines.append(f"  [{cluster['count']}次] {cluster['signature']}  用例: {', '.join(cluster['tests'])}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("用法: python -m utils.cycle_results <cycle_results.jsonl>")
+        sys.exit(2)
+    print(format_summary(aggregate(iter_records(sys.argv[1]))))
@@ -0,0 +1,125 @@
+# GUI日志批量投递 - 在产生日志的线程完成格式化和过滤，界面定时器按批次取出刷新
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+# 关闭"显示详细日志"时保留的关键字
+SUMMARY_KEYWORDS = ("执行步骤", "❌", "✅", "测试失败", "测试成功", "报告", "已清空", "开始执行测试",
+                    "停止测试", "加载完成", "保存成功", "失败", "错误", "提示")
+
+_UNICODE_ESCAPE = re.compile(r"\\u[0-9a-fA-F]{4}")
+
+# 落盘文件修改时间的刷新间隔（秒）：界面长时间无日志时，避免被其他进程的日志归档当作已关闭文件压缩删除
+SPOOL_HEARTBEAT_SECONDS = 60
+
+
+def decode_unicode_escape(text: str) -> str:
+    """将 "\\uXXXX" 转义序列还原成真实中文，防止 GUI 显示乱码"""
+    if "\\u" not in text:
+        return text
+    try:
+        return _UNICODE_ESCAPE.sub(lambda m: chr(int(m.group(0)[2:], 16)), text)
+    except Exception:
+        return text
+
+
+class LogBatcher:
+    """线程安全的日志缓冲区
+
+    - push(): 任意线程调用，完成转义还原、加时间戳、详细日志过滤并写入落盘文件
+    - drain(): 界面定时器调用，一次取出自上次以来的全部行
+    - 内存中只保留最近 max_lines 行（环形缓冲），完整日志从落盘文件按需加载
+    """
+
+    def __init__(self, max_lines: int = 5000, max_batch: int = 500, spool_dir: str = "logs"):
+        self.max_lines = max_lines
+        self.max_batch = max_batch
+        self.show_detail = True
+        self.dropped = 0
+        self._lines = deque(maxlen=max_lines)
+        self._pending = deque(maxlen=max_lines)
+        self._lock = threading.Lock()
+
+        Path(spool_dir).mkdir(parents=True, exist_ok=True)
+        self.spool_file = Path(spool_dir) / f"gui_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+        self._spool = open(self.spool_file, "a", encoding="utf-8")
+        self._last_heartbeat = time.monotonic()
+
+    def set_show_detail(self, enabled: bool):
+        self.show_detail = bool(enabled)
+
+    def _accept(self, message: str) -> bool:
+        return self.show_detail or any(k in message for k in SUMMARY_KEYWORDS)
+
+    def push(self, message):
+        """写入一行日志（可在测试线程中直接作为 log_callback 使用）"""
+        message = decode_unicode_escape(str(message))
+        line = f"[{datetime.now().strftime('%H:%M:%S')}] {message}"
+        with self._lock:
+            if not self._spool.closed:
+                self._spool.write(line + "\n")
+            if not self._accept(message):
+                return
+            if len(self._pending) == self._pending.maxlen:
+                self.dropped += 1
+            self._pending.append(line)
+            self._lines.append(line)
+
+    def _heartbeat(self):
+        """定期刷新落盘文件的修改时间，标记该文件仍在使用（调用方持有锁）"""
+        now = time.monotonic()
+        if now - self._last_heartbeat < SPOOL_HEARTBEAT_SECONDS or self._spool.closed:
+            return
+        self._last_heartbeat = now
+        try:
+            self._spool.flush()
+            os.utime(self.spool_file)
+        except OSError:
+            pass
+
+    def drain(self):
+        """取出待显示的行，单次最多 max_batch 行；积压超过缓冲上限的旧行计入 dropped"""
+        with self._lock:
+            self._heartbeat()
+            if not self._pending:
+                return []
+            count = min(len(self._pending), self.max_batch)
+            batch = [self._pending.popleft() for _ in range(count)]
+            if not self._spool.closed:
+                self._spool.flush()
+        return batch
+
+    def recent_lines(self):
+        """内存中保留的最近日志（已过滤）"""
+        with self._lock:
+            return list(self._lines)
+
+    def load_full_log(self, apply_filter: bool = True):
+        """从落盘文件读取本次会话的完整日志"""
+        with self._lock:
+            if not self._spool.closed:
+                self._spool.flush()
+        try:
+            with open(self.spool_file, "r", encoding="utf-8") as f:
+                lines = [line.rstrip("\n") for line in f]
+        except OSError:
+            return []
+        if not apply_filter or self.show_detail:
+            return lines
+        # 时间戳前缀 "[HH:MM:SS] " 固定11个字符
+        return [line for line in lines if self._accept(line[11:])]
+
+    def clear(self):
+        """清空界面缓冲（落盘文件保留）"""
+        with self._lock:
+            self._pending.clear()
+            self._lines.clear()
+            self.dropped = 0
+
+    def close(self):
+        with self._lock:
+            self._spool.close()
@@ -0,0 +1,131 @@
+# 结构化日志 - 用 contextvars 记录当前用例、轮次等关联字段，JSON 格式下日志文件每行一个带这些字段的对象
+#
+# 开启: config/test_config.yaml -> logging.format: json（控制台仍为文本格式，TestRunner 的输出解析不受影响）
+# 字段: time, level, message, test_id, cycle, worker, method(模块.函数), action(如 vlan.add), duration_ms, step
+# 查询: python -m utils.log_context logs/test_20250101_120000.log --test test_add_vlan --level WARNING
+#       （支持轮转压缩后的 .log.gz 文件）
+import argparse
+import contextvars
+import gzip
+import json
+import logging
+import os
+from contextlib import contextmanager
+from datetime import datetime
+
+STEP_PREFIX = "[执行步骤]"
+
+current_test = contextvars.ContextVar("current_test", default=None)
+# 逐轮子进程模式由 TestRunner 通过环境变量传入轮次
+current_cycle = contextvars.ContextVar("current_cycle", default=int(os.environ.get("ROUTER_TEST_CYCLE") or 0) or None)
+current_action = contextvars.ContextVar("current_action", default=None)
+
+_CONTEXT_VARS = {'test_id': current_test, 'cycle': current_cycle, 'action': current_action}
+_LEVEL_ORDER = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40, 'CRITICAL': 50}
+
+
+@contextmanager
+def log_context(**fields):
+    """在 with 块内为日志附加关联字段（test_id / cycle / action）"""
+    tokens = [(_CONTEXT_VARS[name], _CONTEXT_VARS[name].set(value)) for name, value in fields.items()]
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """在产生日志的线程把上下文字段写入 record（之后 QueueHandler 转到后台线程也不会丢失）"""
+
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+    def filter(self, record) -> bool:
+        for name, var in _CONTEXT_VARS.items():
+            if getattr(record, name, None) is None:
+                setattr(record, name, var.get())
+        record.worker = self.worker
+        return True
+
+
+class JsonLogFormatter(logging.Formatter):
+    """每条日志输出为一行JSON"""
+
+    def format(self, record) -> str:
+        message = record.getMessage()
+        entry = {
+            'time': datetime.fromtimestamp(record.created).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3],
+            'level': record.levelname,
+            'logger': record.name,
+            'test_id': getattr(record, 'test_id', None),
+            'cycle': getattr(record, 'cycle', None),
+            'worker': getattr(record, 'worker', None),
+            'method': f"{record.module}.{record.funcName}",
+            'action': getattr(record, 'action', None),
+        }
+        if message.startswith(STEP_PREFIX):
+            entry['step'] = True
+            message = message[len(STEP_PREFIX):].strip()
+        duration = getattr(record, 'duration_ms', None)
+        if duration is not None:
+            entry['duration_ms'] = round(duration, 1)
+        entry['message'] = message
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps({k: v for k, v in entry.items() if v is not None}, ensure_ascii=False, default=str)
+
+
+def iter_log_records(path):
+    """逐行读取 JSON 格式日志（含 .gz），跳过非JSON行"""
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if not line.startswith("{"):
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def query(records, test: str = None, cycle: int = None, level: str = None, action: str = None, steps: bool = False):
+    """按字段筛选日志记录"""
+    min_level = _LEVEL_ORDER.get((level or "DEBUG").upper(), 10)
+    for record in records:
+        if test and test not in (record.get('test_id') or ''):
+            continue
+        if cycle is not None and record.get('cycle') != cycle:
+            continue
+        if _LEVEL_ORDER.get(record.get('level'), 0) < min_level:
+            continue
+        if action and not (record.get('action') or '').startswith(action):
+            continue
+        if steps and not record.get('step'):
+            continue
+        yield record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="查询 JSON 格式日志")
+    parser.add_argument("files", nargs="+", help="日志文件（.log 或 .log.gz）")
+    parser.add_argument("--test", help="用例 nodeid 包含的文本")
+    parser.add_argument("--cycle", type=int, help="轮次")
+    parser.add_argument("--level", help="最低日志级别")
+    parser.add_argument("--action", help="接口操作前缀，如 vlan 或 vlan.add")
+    parser.add_argument("--steps", action="store_true", help="只显示执行步骤")
+    parser.add_argument("--json", action="store_true", help="原样输出JSON行")
+    args = parser.parse_args()
+
+    for path in args.files:
+        for record in query(iter_log_records(path), args.test, args.cycle, args.level, args.action, args.steps):
+            if args.json:
+                print(json.dumps(record, ensure_ascii=False))
+                continue
+            extra = f" {record['duration_ms']}ms" if 'duration_ms' in record else ""
+            test = (record.get('test_id') or '-').split("::")[-1]
+            print(f"{record['time']} {record['level']:<7} [{test}] {record.get('method', '')}: {record['message']}{extra}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,155 @@
+# 日志轮转与归档 - 按大小/时间轮转并 gzip 压缩，启动时压缩已关闭的旧日志，按数量和天数清理
+import gzip
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from logging.handlers import BaseRotatingHandler
+from pathlib import Path
+
+# 日志配置默认值，可在 config/test_config.yaml 的 logging 节点覆盖
+DEFAULT_LOG_SETTINGS = {
+    'dir': 'logs',
+    'max_file_mb': 20,            # 单个日志文件超过该大小时轮转，0 表示不限
+    'rotate_interval_hours': 24,  # 每隔多少小时轮转一次，0 表示不按时间轮转
+    'compress': True,             # 轮转出的文件和已关闭的旧日志 gzip 压缩
+    'keep_files': 50,             # 最多保留的日志文件数（含压缩文件）
+    'max_age_days': 14,           # 超过该天数的日志删除，0 表示不按天数清理
+    'archive_after_minutes': 30,  # 其他进程的日志超过该时间未写入才视为已关闭（GUI 运行期间每分钟刷新其 gui_*.log 的修改时间）
+    'patterns': ['test_*', 'gui_*'],
+    'async': True,                # 文件写入放到后台线程（QueueHandler）
+    'format': 'text',             # text / json（见 utils/log_context.py）
+}
+
+
+def _gzip_file(source: Path) -> Path:
+    """压缩为 source.gz 并删除原文件，返回压缩文件路径"""
+    target = source.with_name(source.name + ".gz")
+    with open(source, "rb") as src, gzip.open(target, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.utime(target, (source.stat().st_atime, source.stat().st_mtime))
+    source.unlink()
+    return target
+
+
+class RotatingLogHandler(BaseRotatingHandler):
+    """按大小或时间间隔轮转的文件handler
+
+    轮转后的文件命名为 <原文件名>.<序号>.log[.gz]，压缩和清理在写日志的线程中完成
+    （配合 QueueListener 时即后台线程）。
+    """
+
+    def __init__(self, filename, max_bytes: int = 0, interval: float = 0, compress: bool = True,
+                 settings: dict = None):
+        super().__init__(filename, "a", encoding="utf-8", delay=True)
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.compress = compress
+        self.settings = settings
+        self.rollover_at = time.time() + interval if interval else None
+        self._rotations = 0
+
+    def shouldRollover(self, record) -> bool:
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            return True
+        if self.max_bytes > 0:
+            if self.stream is None:
+                self.stream = self._open()
+            # 按字符数估算，中文日志会略早于上限轮转
+            return self.stream.tell() + len(self.format(record)) + 1 >= self.max_bytes
+        return False
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        source = Path(self.baseFilename)
+        if source.exists() and source.stat().st_size > 0:
+            self._rotations += 1
+            target = source.with_name(f"{source.stem}.{self._rotations}{source.suffix}")
+            os.replace(source, target)
+            if self.compress:
+                _gzip_file(target)
+        if self.interval:
+            self.rollover_at = time.time() + self.interval
+        if self.settings:
+            cleanup_logs(self.settings, active={source})
+
+
+def cleanup_logs(settings: dict, active=()) -> dict:
+    """压缩已关闭的旧日志，并按天数和数量清理
+
+    active 为当前进程正在写入的文件；其他进程的日志按 archive_after_minutes 判断是否已关闭。
+    Returns: {'compressed': n, 'deleted': n}
+    """
+    log_dir = Path(settings['dir'])
+    active = {Path(p).resolve() for p in active}
+    now = time.time()
+    closed_after = settings['archive_after_minutes'] * 60
+    result = {'compressed': 0, 'deleted': 0}
+
+    files = []
+    for pattern in settings['patterns']:
+        files.extend(log_dir.glob(f"{pattern}.log"))
+        files.extend(log_dir.glob(f"{pattern}.log.gz"))
+    files = {f for f in files if f.resolve() not in active}
+
+    if settings['compress']:
+        for path in sorted(f for f in files if f.suffix == ".log"):
+            try:
+                if now - path.stat().st_mtime < closed_after:
+                    continue
+                files.discard(path)
+                files.add(_gzip_file(path))
+                result['compressed'] += 1
+            except OSError:
+                # Windows 下其他进程仍打开的文件无法删除，下次再处理
+                continue
+
+    by_age = []
+    for path in files:
+        try:
+            by_age.append((path.stat().st_mtime, path))
+        except OSError:
+            continue
+    by_age.sort(reverse=True)
+
+    max_age = settings['max_age_days'] * 86400
+    keep = max(settings['keep_files'] - len(active), 0)
+    for index, (mtime, path) in enumerate(by_age):
+        expired = max_age and now - mtime > max_age
+        if not expired and index < keep:
+            continue
+        # 未压缩且可能仍在写入的文件不删除
+        if path.suffix == ".log" and now - mtime < closed_after:
+            continue
+        try:
+            path.unlink()
+            result['deleted'] += 1
+        except OSError:
+            continue
+    return result
+
+
+def cleanup_logs_async(settings: dict, active=(), logger: logging.Logger = None):
+    """在后台线程执行一次清理（进程启动时调用，不阻塞测试）"""
+    def run():
+        try:
+            result = cleanup_logs(settings, active)
+        except Exception as e:
+            if logger:
+                logger.debug(f"日志清理失败: {e}")
+            return
+        if logger and (result['compressed'] or result['deleted']):
+            logger.debug(f"日志归档: 压缩 {result['compressed']} 个, 删除 {result['deleted']} 个")
+    thread = threading.Thread(target=run, daemon=True, name="log-cleanup")
+    thread.start()
+    return thread
+
+
+def new_log_file(settings: dict, prefix: str = "test") -> Path:
+    log_dir = Path(settings['dir'])
+    log_dir.mkdir(parents=True, exist_ok=True)
+    return log_dir / f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
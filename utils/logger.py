@@ -1,8 +1,11 @@
 # 日志工具
+import atexit
 import logging
-import os
-from datetime import datetime
-from pathlib import Path
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from utils.log_context import ContextFilter, JsonLogFormatter
+from utils.log_rotation import DEFAULT_LOG_SETTINGS, RotatingLogHandler, cleanup_logs_async, new_log_file
+from utils.yaml_reader import YamlReader
 
 class Logger:
     _instance = None
@@ -18,8 +21,9 @@ class Logger:
             self._setup_logger()
     
     def _setup_logger(self):
-        log_dir = Path("logs")
-        log_dir.mkdir(exist_ok=True)
+        cfg = YamlReader().read_yaml("config/test_config.yaml") or {}
+        settings = dict(DEFAULT_LOG_SETTINGS)
+        settings.update(cfg.get('logging') or {})
         
         self.logger = logging.getLogger("RouterTest")
         self.logger.setLevel(logging.DEBUG)
@@ -27,19 +31,37 @@ class Logger:
         if self.logger.handlers:
             self.logger.handlers.clear()
         
-        log_file = log_dir / f"test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        self.log_file = new_log_file(settings)
+        file_handler = RotatingLogHandler(
+            self.log_file,
+            max_bytes=int(settings['max_file_mb'] * 1024 * 1024),
+            interval=settings['rotate_interval_hours'] * 3600,
+            compress=settings['compress'],
+            settings=settings
+        )
         file_handler.setLevel(logging.DEBUG)
         
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.INFO)
         
         formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
+        # json: 日志文件每行一个带 test_id/cycle/action 等字段的JSON对象
+        file_handler.setFormatter(JsonLogFormatter() if settings['format'] == 'json' else formatter)
         console_handler.setFormatter(formatter)
+        self.logger.addFilter(ContextFilter())
         
-        self.logger.addHandler(file_handler)
+        # 文件写入（含轮转压缩）放到后台线程，DEBUG 日志不阻塞测试线程；控制台输出保持同步，顺序与 print 一致
+        self._listener = None
+        if settings['async']:
+            self._listener = QueueListener(queue.Queue(-1), file_handler, respect_handler_level=True)
+            self._listener.start()
+            atexit.register(self._listener.stop)
+            self.logger.addHandler(QueueHandler(self._listener.queue))
+        else:
+            self.logger.addHandler(file_handler)
         self.logger.addHandler(console_handler)
+        
+        cleanup_logs_async(settings, active={self.log_file}, logger=self.logger)
     
     def get_logger(self):
         return self.logger
@@ -0,0 +1,408 @@
+# 本地模拟路由器 - 回放 api_logs 中录制的 /Action/call 数据，提供有状态的 VLAN 接口和最小化WEB界面
+#
+# 用法:
+#   python -m utils.mock_router --port 8080                 # 前台运行
+#   python -m utils.mock_router --port 8080 --latency-ms 30 # 模拟设备处理延迟
+# 然后把 config/test_config.yaml 中 router.ip 改为 127.0.0.1:8080 即可在无设备环境运行页面对象和基准测试。
+# 代码中使用: with MockRouter() as router: client = RouterApiClient(host=router.host)
+import argparse
+import json
+import secrets
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+from utils.router_api import RESULT_ALREADY_EXISTS
+
+# 录制数据默认目录
+SEED_DIR = Path(__file__).parent.parent / "api_logs" / "vlan"
+
+RESULT_OK = 30000
+RESULT_ERROR = 10000
+
+# 每种数据表的唯一键和默认搜索字段
+TABLES = {
+    'vlan': {'key': 'vlan_id', 'finds': "vlan_id,vlan_name,ip_addr,comment"},
+}
+
+
+class MockRouterState:
+    """模拟路由器的数据和会话（线程安全）"""
+
+    def __init__(self, username: str = "admin", password: str = "admin123"):
+        self.username = username
+        self.password = password
+        self.sessions = set()
+        self.tables = {name: [] for name in TABLES}
+        self.next_ids = {name: 1 for name in TABLES}
+        # 未建模的调用按 (func_name, action) 回放录制的响应
+        self.replay = {}
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # 录制数据
+    # ------------------------------------------------------------------
+    def seed_from_logs(self, log_dir=SEED_DIR) -> int:
+        """从 api_logs 录制文件加载初始数据：取行数最多的 show 响应作为初始表，其余响应用于回放"""
+        best_rows = {}
+        for path in sorted(Path(log_dir).glob("*.json")):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    record = json.load(f)
+                payload = json.loads(record.get("request_body") or "{}")
+            except (OSError, ValueError):
+                continue
+            response = record.get("response_body")
+            func_name = payload.get("func_name")
+            action = str(payload.get("action", "")).lower()
+            if not isinstance(response, dict) or not func_name:
+                continue
+            rows = (response.get("Data") or {}).get("data") if action == "show" else None
+            # 带关键字的搜索结果不是完整列表，不作为初始数据
+            if rows is not None and not (payload.get("param") or {}).get("KEYWORDS"):
+                if len(rows) > len(best_rows.get(func_name, [])):
+                    best_rows[func_name] = rows
+            self.replay.setdefault((func_name, action), response)
+
+        with self._lock:
+            for func_name, rows in best_rows.items():
+                if func_name not in self.tables:
+                    continue
+                self.tables[func_name] = [dict(row) for row in rows]
+                self.next_ids[func_name] = max((int(r.get("id", 0)) for r in rows), default=0) + 1
+        return sum(len(rows) for rows in best_rows.values())
+
+    def reset(self):
+        with self._lock:
+            self.tables = {name: [] for name in TABLES}
+            self.next_ids = {name: 1 for name in TABLES}
+            self.stats = {}
+
+    # ------------------------------------------------------------------
+    # 会话
+    # ------------------------------------------------------------------
+    def login(self, username: str, password: str):
+        if username != self.username or password != self.password:
+            return None
+        sess_key = secrets.token_hex(16)
+        with self._lock:
+            self.sessions.add(sess_key)
+        return sess_key
+
+    def is_logged_in(self, sess_key: str) -> bool:
+        return sess_key in self.sessions
+
+    # ------------------------------------------------------------------
+    # /Action/call
+    # ------------------------------------------------------------------
+    def call(self, func_name: str, action: str, param: dict) -> dict:
+        start = time.perf_counter()
+        action = (action or "").lower()
+        with self._lock:
+            if func_name in self.tables:
+                handler = getattr(self, f"_do_{action}", None)
+                result = handler(func_name, param or {}) if handler else self._replay(func_name, action)
+            else:
+                result = self._replay(func_name, action)
+            stat = self.stats.setdefault(f"{func_name}.{action}", {'count': 0, 'total_ms': 0.0})
+            stat['count'] += 1
+            stat['total_ms'] += (time.perf_counter() - start) * 1000
+        return result
+
+    def _replay(self, func_name, action):
+        recorded = self.replay.get((func_name, action))
+        if recorded is not None:
+            return dict(recorded)
+        return {"Result": RESULT_ERROR, "ErrMsg": f"mock router: unsupported {func_name}.{action}"}
+
+    @staticmethod
+    def _ids(param) -> set:
+        return {str(i).strip() for i in str(param.get("id", "")).split(",") if str(i).strip()}
+
+    def _do_show(self, func_name, param):
+        rows = self.tables[func_name]
+        keywords = str(param.get("KEYWORDS") or "")
+        if keywords:
+            finds = str(param.get("FINDS") or TABLES[func_name]['finds']).split(",")
+            rows = [r for r in rows if any(keywords in str(r.get(f, "")) for f in finds)]
+        order_by = param.get("ORDER_BY")
+        if order_by:
+            rows = sorted(rows, key=lambda r: str(r.get(order_by, "")), reverse=param.get("ORDER") == "desc")
+
+        data = {}
+        types = str(param.get("TYPE") or "total,data").split(",")
+        if "total" in types:
+            data["total"] = len(rows)
+        if "data" in types:
+            try:
+                offset, count = (int(x) for x in str(param.get("limit") or f"0,{len(rows)}").split(","))
+            except ValueError:
+                offset, count = 0, len(rows)
+            data["data"] = [dict(r) for r in rows[offset:offset + count]]
+        return {"Result": RESULT_OK, "ErrMsg": "Success", "Data": data}
+
+    def _do_add(self, func_name, param):
+        key = TABLES[func_name]['key']
+        value = str(param.get(key, ""))
+        if not value:
+            return {"Result": RESULT_ERROR, "ErrMsg": f"{key} is required"}
+        if any(str(r.get(key)) == value for r in self.tables[func_name]):
+            return {"Result": RESULT_ALREADY_EXISTS, "ErrMsg": "Already exists"}
+        row = dict(param)
+        row.setdefault("enabled", "yes")
+        row["id"] = self.next_ids[func_name]
+        self.next_ids[func_name] += 1
+        self.tables[func_name].append(row)
+        return {"Result": RESULT_OK, "ErrMsg": "Success", "RowId": row["id"]}
+
+    def _do_edit(self, func_name, param):
+        row_id = str(param.get("id", ""))
+        for row in self.tables[func_name]:
+            if str(row.get("id")) == row_id:
+                row.update({k: v for k, v in param.items() if k != "id"})
+                return {"Result": RESULT_OK, "ErrMsg": "Success"}
+        return {"Result": RESULT_ERROR, "ErrMsg": f"id {row_id} not found"}
+
+    def _do_del(self, func_name, param):
+        ids = self._ids(param)
+        self.tables[func_name] = [r for r in self.tables[func_name] if str(r.get("id")) not in ids]
+        return {"Result": RESULT_OK, "ErrMsg": "Success"}
+
+    def _set_enabled(self, func_name, param, enabled):
+        ids = self._ids(param)
+        for row in self.tables[func_name]:
+            if str(row.get("id")) in ids:
+                row["enabled"] = enabled
+        return {"Result": RESULT_OK, "ErrMsg": "Success"}
+
+    def _do_up(self, func_name, param):
+        return self._set_enabled(func_name, param, "yes")
+
+    def _do_down(self, func_name, param):
+        return self._set_enabled(func_name, param, "no")
+
+    def _do_export(self, func_name, param):
+        fmt = param.get("format", "csv")
+        return {"Result": RESULT_OK, "ErrMsg": "Success", "Filename": f"{func_name}_config.{fmt}"}
+
+    def _do_import(self, func_name, param):
+        return {"Result": RESULT_OK, "ErrMsg": "Success"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """HTTP请求处理：/Action/login、/Action/call、/__mock__/* 和WEB界面"""
+
+    protocol_version = "HTTP/1.1"
+    # keep-alive 连接上响应头和响应体分两次写出，关闭 Nagle 避免与客户端延迟确认叠加出 40ms 的固定延迟
+    disable_nagle_algorithm = True
+    server_version = "Nginx"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def state(self) -> MockRouterState:
+        return self.server.state
+
+    def _send(self, status: int, body, content_type="application/json;charset=UTF-8", cookies=None):
+        if not isinstance(body, (bytes, str)):
+            body = json.dumps(body, ensure_ascii=False)
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        for name, value in (cookies or {}).items():
+            self.send_header("Set-Cookie", f"{name}={value}; Path=/")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(raw.decode("utf-8") or "{}")
+        except ValueError:
+            return {}
+
+    def _sess_key(self):
+        cookie = SimpleCookie(self.headers.get("Cookie") or "")
+        return cookie["sess_key"].value if "sess_key" in cookie else None
+
+    def _delay(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/__mock__/stats":
+            return self._send(200, {"stats": self.state.stats,
+                                    "rows": {k: len(v) for k, v in self.state.tables.items()}})
+        self._send(200, MOCK_UI_HTML, content_type="text/html;charset=UTF-8")
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        payload = self._read_json()
+        if path == "/Action/login":
+            sess_key = self.state.login(payload.get("username"), payload.get("passwd"))
+            if not sess_key:
+                return self._send(200, {"Result": RESULT_ERROR, "ErrMsg": "用户名或密码错误"})
+            return self._send(200, {"Result": RESULT_OK, "ErrMsg": "Success"},
+                              cookies={"sess_key": sess_key, "username": payload.get("username"), "login": "1"})
+        if path == "/Action/call":
+            if not self.state.is_logged_in(self._sess_key()):
+                # 与真实设备一致：会话失效时返回登录页HTML
+                return self._send(200, MOCK_UI_HTML, content_type="text/html;charset=UTF-8")
+            self._delay()
+            result = self.state.call(payload.get("func_name"), payload.get("action"), payload.get("param"))
+            return self._send(200, result)
+        if path == "/__mock__/reset":
+            self.state.reset()
+            if payload.get("seed", True):
+                self.state.seed_from_logs(self.server.seed_dir)
+            return self._send(200, {"Result": RESULT_OK})
+        self._send(404, {"Result": RESULT_ERROR, "ErrMsg": "not found"})
+
+
+class MockRouter:
+    """在后台线程运行的模拟路由器，支持 with 语句"""
+
+    def __init__(self, port: int = 0, bind: str = "127.0.0.1", seed_dir=SEED_DIR, latency_ms: float = 0,
+                 username: str = "admin", password: str = "admin123"):
+        self.state = MockRouterState(username, password)
+        if seed_dir:
+            self.state.seed_from_logs(seed_dir)
+        self.server = ThreadingHTTPServer((bind, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.state = self.state
+        self.server.seed_dir = seed_dir
+        self.server.latency = latency_ms / 1000.0
+        self._thread = None
+
+    @property
+    def host(self) -> str:
+        """供 RouterApiClient / router.ip 使用的 地址:端口"""
+        address, port = self.server.server_address[:2]
+        return f"{address}:{port}"
+
+    def login_cookies(self) -> dict:
+        """直接创建一个已登录会话，返回可用于 RouterApiClient(cookies=...) 的Cookie"""
+        return {"sess_key": self.state.login(self.state.username, self.state.password),
+                "username": self.state.username, "login": "1"}
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True, name="mock-router")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+# 最小化WEB界面：登录页、网络设置菜单、VLAN设置的列表/添加/搜索，
+# 元素名称与页面对象使用的选择器保持一致
+MOCK_UI_HTML = """<!DOCTYPE html>
+<html lang="zh-CN"><head><meta charset="utf-8"><title>Mock Router</title>
+<style>body{font-family:sans-serif;margin:0}nav{float:left;width:180px;padding:8px}nav ul{list-style:none;padding-left:12px}
+a{cursor:pointer;color:#1677ff;display:block;margin:4px 0}.main-content{margin-left:200px;padding:8px}
+table{border-collapse:collapse}td,th{border:1px solid #ccc;padding:2px 6px}.hidden{display:none}</style></head>
+<body><div id="app"></div>
+<script>
+const app = document.getElementById('app');
+async function call(func_name, action, param) {
+  const r = await fetch('/Action/call', {method: 'POST', headers: {'content-type': 'application/json;charset=UTF-8'},
+    body: JSON.stringify({func_name, action, param: param || {}})});
+  return r.json();
+}
+function renderLogin() {
+  app.innerHTML = '<div class="login"><input type="text" aria-label="用户名" placeholder="用户名">' +
+    '<input type="password" aria-label="密码" placeholder="密码"><button>登录</button><div class="error"></div></div>';
+  app.querySelector('button').onclick = async () => {
+    const [u, p] = app.querySelectorAll('input');
+    const r = await (await fetch('/Action/login', {method: 'POST', body: JSON.stringify({username: u.value, passwd: p.value})})).json();
+    if (r.Result === 30000) { location.href = '/#/home'; } else { app.querySelector('.error').textContent = r.ErrMsg; }
+  };
+}
+function renderLayout(content) {
+  app.innerHTML = '<nav><a id="net">网络设置</a><ul id="net-sub" class="hidden"><li><a href="#/vlan">VLAN设置</a></li></ul>' +
+    '<a>系统管理</a><a>高级设置</a></nav><div class="main-content">' + (content || '') + '</div>';
+  app.querySelector('#net').onclick = () => app.querySelector('#net-sub').classList.toggle('hidden');
+}
+function esc(v) { return String(v == null ? '' : v).replace(/[&<>"]/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c])); }
+async function renderTable(func_name, headers, fields, finds, placeholder, formFields) {
+  renderLayout('<a class="add">添加</a><input type="text" placeholder="' + placeholder + '" name="searchText">' +
+    '<button aria-label="search"></button><div class="form hidden">' +
+    formFields.map(f => '<input name="' + f + '">').join('') + '<button>保存</button></div>' +
+    '<table><thead><tr>' + headers.map(h => '<th>' + h + '</th>').join('') + '</tr></thead><tbody></tbody></table>');
+  const main = app.querySelector('.main-content');
+  const search = main.querySelector('input[name=searchText]');
+  async function load() {
+    const param = {TYPE: 'total,data', limit: '0,20', ORDER_BY: '', ORDER: ''};
+    if (search.value) { param.FINDS = finds; param.KEYWORDS = search.value; }
+    const r = await call(func_name, 'show', param);
+    main.querySelector('tbody').innerHTML = ((r.Data || {}).data || []).map(row =>
+      '<tr>' + fields.map(f => '<td>' + esc(f === 'enabled' ? (row[f] === 'yes' ? '已启用' : '已停用') : row[f]) + '</td>').join('') + '</tr>').join('');
+  }
+  main.querySelector('.add').onclick = () => main.querySelector('.form').classList.remove('hidden');
+  main.querySelector('.form button').onclick = async () => {
+    const param = {};
+    main.querySelectorAll('.form input').forEach(i => { param[i.name] = i.value; });
+    const r = await call(func_name, 'add', param);
+    if (r.Result === 30000) { main.querySelector('.form').classList.add('hidden'); }
+    await load();
+  };
+  main.querySelector('button[aria-label=search]').onclick = load;
+  search.onkeydown = e => { if (e.key === 'Enter') load(); };
+  await load();
+}
+function route() {
+  if (!document.cookie.includes('sess_key=') || location.pathname.startsWith('/login')) { return renderLogin(); }
+  const hash = location.hash;
+  if (hash.startsWith('#/vlan')) {
+    return renderTable('vlan', ['vlanID', 'vlan名称', 'MAC', 'IP', '子网掩码', '线路', '备注', '状态'],
+      ['vlan_id', 'vlan_name', 'mac', 'ip_addr', 'netmask', 'interface', 'comment', 'enabled'],
+      'vlan_id,vlan_name,ip_addr,comment', 'VlanID/Vlan名称/IP/备注', ['vlan_id', 'vlan_name', 'ip_addr', 'comment']);
+  }
+  renderLayout('<div class="dashboard">首页</div>');
+}
+window.addEventListener('hashchange', route);
+route();
+</script></body></html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟路由器")
+    parser.add_argument("--bind", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8080, help="监听端口")
+    parser.add_argument("--seed", default=str(SEED_DIR), help="录制数据目录，传空字符串表示不加载")
+    parser.add_argument("--latency-ms", type=float, default=0, help="每次接口调用附加的模拟设备延迟(毫秒)")
+    args = parser.parse_args()
+
+    router = MockRouter(port=args.port, bind=args.bind, seed_dir=args.seed or None, latency_ms=args.latency_ms)
+    rows = {k: len(v) for k, v in router.state.tables.items() if v}
+    print(f"模拟路由器已启动: http://{router.host}/login#/login  初始数据: {rows}")
+    print("将 config/test_config.yaml 中 router.ip 改为上面的 地址:端口 即可使用")
+    try:
+        router.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        router.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,23 @@
 # 测试报告生成器 - 优化版本（修复执行时间）
 from datetime import datetime
 from pathlib import Path
+import io
 import json
 import os
 import re
 from jinja2 import Template
 from utils.logger import Logger
 from utils.yaml_reader import YamlReader
+from utils.result_channel import ResultCollector, iter_events
+from utils.cycle_plugin import CYCLE_START_MARKER
+from utils.cycle_results import aggregate, iter_records
+from utils.soak_runner import load_time_series
+
+# 浸泡报告折线图配色
+_CHART_COLORS = ['#2196F3', '#f44336', '#4CAF50', '#FF9800', '#9C27B0', '#00BCD4', '#795548', '#607D8B']
+
+# 原始输出中的轮次分隔行："=== 第N轮测试输出 ===" 或 cycle_plugin 的 "[循环开始] N/M"
+_CYCLE_HEADER = re.compile(r'^(?:=== 第(\d+)轮测试输出 ===|' + re.escape(CYCLE_START_MARKER) + r'\s*(\d+)/)')
 
 class ReportGenerator:
     """测试报告生成器 - 优化版"""
@@ -73,6 +84,145 @@ class ReportGenerator:
             self.logger.error(f"生成中文测试报告失败: {e}")
             return None
     
+    def generate_aggregate_report(self, results_store, test_config=None):
+        """由多轮结果存储生成跨轮汇总报告（通过率、耗时分布、首次失败轮次、失败聚集）"""
+        try:
+            test_config = test_config or {}
+            summary = aggregate(iter_records(results_store))
+            if not summary['total_runs']:
+                self.logger.warning(f"多轮结果存储为空，跳过汇总报告: {results_store}")
+                return None
+            
+            test_function_raw = test_config.get('test_function', '全部功能')
+            html_content = Template(self._get_aggregate_template()).render(
+                title='路由器自动化测试多轮汇总报告',
+                generate_time=datetime.now().strftime('%Y年%m月%d日 %H:%M:%S'),
+                router_ip=test_config.get('router', {}).get('ip', '未知'),
+                test_function='、'.join(test_function_raw) if isinstance(test_function_raw, list) else str(test_function_raw),
+                results_store=str(results_store),
+                unstable_count=sum(1 for test in summary['tests'] if test['failed'] or test['error']),
+                max_cycle_failures=max(summary['cycle_failures'].values(), default=0),
+                **summary
+            )
+            
+            report_file = self.report_dir / f"多轮汇总报告_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+            with open(report_file, 'w', encoding='utf-8') as f:
+                f.write(html_content)
+            
+            self.logger.info(f"多轮汇总报告生成成功: {report_file}")
+            return str(report_file)
+            
+        except Exception as e:
+            self.logger.error(f"生成多轮汇总报告失败: {e}")
+            return None
+    
+    def generate_soak_report(self, time_series_file, settings=None, test_config=None):
+        """由浸泡测试时间序列生成报告：各接口耗时/错误率随时间变化曲线和设备状态"""
+        try:
+            records = load_time_series(time_series_file)
+            if not records:
+                self.logger.warning(f"浸泡时间序列为空，跳过报告: {time_series_file}")
+                return None
+            settings = settings or {}
+            test_config = test_config or {}
+            
+            op_names = sorted({op for record in records for op in record.get('ops', {})})
+            health_names = sorted({k for record in records for k, v in (record.get('health') or {}).items()
+                                   if isinstance(v, (int, float)) or v is None})
+            
+            def series(metric):
+                return {op: [(r['elapsed_s'] / 60, r['ops'][op][metric]) for r in records if op in r.get('ops', {})]
+                        for op in op_names}
+            
+            ops_summary = []
+            for op in op_names:
+                windows = [r['ops'][op] for r in records if op in r.get('ops', {})]
+                count = sum(w['count'] for w in windows)
+                errors = sum(w['errors'] for w in windows)
+                third = max(1, len(windows) // 3)
+                head = sum(w['p95_ms'] for w in windows[:third]) / third
+                tail = sum(w['p95_ms'] for w in windows[-third:]) / third
+                change = (tail - head) / head * 100 if head else 0.0
+                ops_summary.append({
+                    'name': op,
+                    'count': count,
+                    'errors': errors,
+                    'error_rate': round(errors / count * 100, 2) if count else 0.0,
+                    'first_p95': round(head, 1),
+                    'last_p95': round(tail, 1),
+                    'change': round(change, 1),
+                    'degraded': len(windows) >= 3 and change > 50,
+                })
+            
+            html_content = Template(self._get_soak_template()).render(
+                title='路由器浸泡测试报告',
+                generate_time=datetime.now().strftime('%Y年%m月%d日 %H:%M:%S'),
+                router_ip=test_config.get('router', {}).get('ip', '未知'),
+                operations='、'.join(settings.get('operations', [])),
+                window_seconds=settings.get('window_seconds', '未知'),
+                duration_minutes=round(records[-1]['elapsed_s'] / 60 + records[-1].get('duration_s', 0) / 60, 1),
+                windows=len(records),
+                records=records,
+                ops_summary=ops_summary,
+                health_names=health_names,
+                p95_chart=self._svg_line_chart(series('p95_ms'), "ms"),
+                p50_chart=self._svg_line_chart(series('p50_ms'), "ms"),
+                error_chart=self._svg_line_chart(series('error_rate'), "%"),
+                health_chart=self._svg_line_chart(
+                    {name: [(r['elapsed_s'] / 60, r['health'][name]) for r in records
+                            if isinstance((r.get('health') or {}).get(name), (int, float))]
+                     for name in health_names}, ""),
+                time_series_file=str(time_series_file),
+            )
+            
+            report_file = self.report_dir / f"浸泡测试报告_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+            with open(report_file, 'w', encoding='utf-8') as f:
+                f.write(html_content)
+            
+            self.logger.info(f"浸泡测试报告生成成功: {report_file}")
+            return str(report_file)
+            
+        except Exception as e:
+            self.logger.error(f"生成浸泡测试报告失败: {e}")
+            return None
+    
+    @staticmethod
+    def _svg_line_chart(series: dict, unit: str, width: int = 1000, height: int = 260) -> str:
+        """生成内联SVG折线图，series 为 {名称: [(x分钟, y), ...]}"""
+        points = [p for values in series.values() for p in values]
+        if not points:
+            return '<div class="muted">无数据</div>'
+        left, right, top, bottom = 60, 20, 10, 30
+        max_x = max(x for x, _ in points) or 1
+        max_y = max(y for _, y in points) or 1
+        
+        def sx(x):
+            return left + x / max_x * (width - left - right)
+        
+        def sy(y):
+            return top + (1 - y / max_y) * (height - top - bottom)
+        
+        parts = [f'<svg viewBox="0 0 {width} {height}" width="100%" preserveAspectRatio="none" '
+                 f'style="background:#fafafa;border:1px solid #eee;">']
+        for i in range(5):
+            y_value = max_y * i / 4
+            parts.append(f'<line x1="{left}" x2="{width - right}" y1="{sy(y_value):.1f}" y2="{sy(y_value):.1f}" stroke="#e0e0e0"/>')
+            parts.append(f'<text x="{left - 6}" y="{sy(y_value) + 4:.1f}" font-size="11" text-anchor="end" fill="#888">'
+                         f'{y_value:.0f}{unit}</text>')
+        for i in range(5):
+            x_value = max_x * i / 4
+            parts.append(f'<text x="{sx(x_value):.1f}" y="{height - 8}" font-size="11" text-anchor="middle" fill="#888">'
+                         f'{x_value:.0f}分</text>')
+        legend = []
+        for index, (name, values) in enumerate(series.items()):
+            color = _CHART_COLORS[index % len(_CHART_COLORS)]
+            if values:
+                path = " ".join(f"{sx(x):.1f},{sy(y):.1f}" for x, y in values)
+                parts.append(f'<polyline fill="none" stroke="{color}" stroke-width="2" points="{path}"/>')
+            legend.append(f'<span style="color:{color};margin-right:15px;">● {name}</span>')
+        parts.append('</svg>')
+        return "".join(parts) + '<div class="muted">' + "".join(legend) + '</div>'
+    
     def _prepare_report_data(self, test_results, test_config):
         """准备报告数据"""
         if test_results is None:
@@ -127,15 +277,19 @@ class ReportGenerator:
         """从原始输出中提取测试用例详情"""
         test_cases = []
         
-        # 获取原始输出
-        raw_output = test_results.get('raw_output', '')
-        if not raw_output:
-            # 尝试从test_details中获取
-            test_details = test_results.get('test_details', [])
-            if test_details:
-                raw_output = '\n'.join([detail.get('output', '') for detail in test_details])
-        
-        if not raw_output:
+        # 优先使用结果通道的结构化事件
+        events_files = [f for f in test_results.get('events_files', []) if os.path.exists(f)]
+        if events_files:
+            test_cases = self._build_test_cases_from_events(
+                events_files, self._load_test_data_yaml(test_config), test_config
+            )
+            if test_cases:
+                return test_cases
+            self.logger.warning("结果通道事件中没有用例记录，改为解析原始输出")
+        
+        # 获取原始输出（按行流式读取）
+        lines = self._iter_output_lines(test_results)
+        if lines is None:
             self.logger.warning("没有找到测试输出数据")
             return self._create_fallback_test_cases(test_results, test_config)
         
@@ -146,7 +300,7 @@ class ReportGenerator:
         login_config = self._load_login_yaml_config()
         
         # 解析测试用例
-        test_cases = self._parse_test_cases_from_output(raw_output, yaml_config, login_config, test_config)
+        test_cases = self._parse_test_cases_from_output(lines, yaml_config, login_config, test_config)
         
         if not test_cases:
             self.logger.warning("从输出中未解析到测试用例，使用备用方案")
@@ -154,6 +308,70 @@ class ReportGenerator:
         
         return test_cases
 
+    def _iter_output_lines(self, test_results):
+        """返回原始输出的逐行迭代器：优先读取输出文件，其次 raw_output 字符串和各轮 output；都没有时返回None"""
+        output_file = test_results.get('output_file')
+        if output_file and os.path.exists(output_file) and os.path.getsize(output_file) > 0:
+            return self._iter_file_lines(output_file)
+        
+        raw_output = test_results.get('raw_output', '')
+        if raw_output:
+            return io.StringIO(raw_output)
+        
+        # 尝试从test_details中获取
+        outputs = [detail.get('output', '') for detail in test_results.get('test_details', []) if detail.get('output')]
+        if outputs:
+            return (line for output in outputs for line in io.StringIO(output))
+        return None
+
+    def _iter_file_lines(self, file_path):
+        """逐行读取输出文件（UTF-8 失败时按 GBK 解码单行）"""
+        with open(file_path, 'rb') as f:
+            for raw in f:
+                try:
+                    yield raw.decode('utf-8')
+                except UnicodeDecodeError:
+                    yield raw.decode('gbk', errors='ignore')
+
+    @staticmethod
+    def _duration_seconds(duration):
+        """把 "12.3秒" / 数字形式的耗时转换成秒数，无法识别返回None"""
+        if isinstance(duration, (int, float)):
+            return float(duration)
+        match = re.match(r'\s*([\d.]+)\s*秒', str(duration or ''))
+        return float(match.group(1)) if match else None
+
+    def _merge_case_run(self, cases, test_case, cycle, key):
+        """合并同一用例在多轮中的执行结果：只保留最近一轮的详情，统计累加
+
+        key 标识同一用例：事件中为 nodeid（各分组测试类继承的同名参数化方法互不合并），
+        文本输出中为 (本轮内第几次出现, 方法名)，同一轮内的多次出现不合并。
+        """
+        previous = cases.get(key)
+        stats = previous['cycle_stats'] if previous else {
+            'runs': 0, 'passed': 0, 'failed': 0, 'error': 0, 'skipped': 0,
+            'total_duration': 0.0, 'timed_runs': 0, 'min_duration': None, 'max_duration': None,
+            'last_failure_cycle': None,
+        }
+        status = test_case['status'].lower()
+        stats['runs'] += 1
+        stats[status if status in stats else 'error'] += 1
+        if status in ('failed', 'error'):
+            stats['last_failure_cycle'] = cycle
+        seconds = self._duration_seconds(test_case.get('duration'))
+        if seconds is not None:
+            stats['total_duration'] += seconds
+            stats['timed_runs'] += 1
+            stats['min_duration'] = seconds if stats['min_duration'] is None else min(stats['min_duration'], seconds)
+            stats['max_duration'] = seconds if stats['max_duration'] is None else max(stats['max_duration'], seconds)
+        stats['pass_rate'] = stats['passed'] / stats['runs'] * 100
+        stats['avg_duration'] = stats['total_duration'] / stats['timed_runs'] if stats['timed_runs'] else None
+        
+        test_case['cycle_stats'] = stats
+        test_case['case_id'] = previous['case_id'] if previous else len(cases) + 1
+        # 已有的键原位替换，保持用例首次出现的顺序
+        cases[key] = test_case
+
     def _load_test_data_yaml(self, test_config):
         """根据测试配置动态加载对应的YAML测试数据"""
         selected_functions = test_config.get('test_function', [])
@@ -206,17 +424,8 @@ class ReportGenerator:
             self.logger.error(f"加载登录测试数据失败: {e}")
             return {}
 
-    def _parse_test_cases_from_output(self, raw_output, yaml_config, login_yaml_config, test_config):
-        """从原始输出解析测试用例"""
-        test_cases = []
-        lines = raw_output.split('\n')
-        
-        current_test_case = None
-        current_execution_details = []
-        
-        self.logger.info(f"开始解析测试输出，共 {len(lines)} 行")
-        
-        # 从测试配置中获取测试类名称
+    def _get_test_class(self, test_config):
+        """从测试配置中获取测试类名称"""
         selected_functions = test_config.get('test_function', ['未知模块'])
         primary_function = selected_functions[0] if selected_functions and len(selected_functions) == 1 else '未知模块'
         class_map = {
@@ -224,20 +433,143 @@ class ReportGenerator:
             'VLAN设置': 'VLAN_TEST',
             '终端分组': 'STA_GROUP_TEST'
         }
-        test_class = class_map.get(primary_function, 'UNKNOWN_TEST')
+        return class_map.get(primary_function, 'UNKNOWN_TEST')
+
+    def _new_test_case(self, method_name, param_desc, yaml_config, test_class, case_id):
+        """根据方法名和参数创建测试用例记录，用例描述优先取自YAML"""
+        yaml_test_case = yaml_config.get('test_cases', {}).get(method_name, {})
+        display_name = yaml_test_case.get('name', f'{method_name} 功能测试')
+
+        # 针对参数化用例，尝试从数据文件获取更详细的描述
+        if param_desc:
+            # 尝试从sta_group.yaml或vlan_data.yaml等文件中查找
+            # 获取YAML数据中的第一个列表，作为测试用例数据源
+            data_list_key = next((k for k, v in yaml_config.items() if isinstance(v, list)), None)
+            if data_list_key:
+                for item in yaml_config[data_list_key]:
+                    if item.get('test_case') == param_desc:
+                        display_name = param_desc
+                        break
+
+        test_case = {
+            'case_id': case_id,
+            'test_class': test_class,
+            'method_name': method_name + (f"[{param_desc}]" if param_desc else ""),
+            'name': display_name,
+            'business_scenario': yaml_test_case.get('business_scenario', '验证功能正确性'),
+            'test_steps': yaml_test_case.get('test_steps', ['1. 执行测试准备', '2. 执行核心操作', '3. 验证结果']),
+            'risk_level': yaml_test_case.get('risk_level', '中等'),
+            'priority': yaml_test_case.get('priority', '中'),
+            'status': 'RUNNING',
+            'execution_details': [],
+            'start_time': '未知',
+            'duration': '计算中...'
+        }
+        self.logger.info(f"发现测试用例: {test_case['method_name']}")
+        return test_case
+
+    def _build_test_cases_from_events(self, events_files, yaml_config, test_config):
+        """由结果通道事件直接构建测试用例，无需逐行匹配原始输出"""
+        test_class = self._get_test_class(test_config)
+        cases = {}
+        state = {'cycle': 0}
+
+        def on_test(record):
+            method_name, _, param_desc = record['name'].partition('[')
+            test_case = self._new_test_case(method_name, param_desc.rstrip(']'), yaml_config, test_class, 0)
+
+            execution_details = [
+                {'type': 'step', 'timestamp': step['timestamp'], 'content': step['content']}
+                for step in record['steps']
+            ]
+            # 只记录重要的系统操作
+            execution_details.extend(
+                {'type': 'system', 'timestamp': log['timestamp'], 'content': log['content']}
+                for log in record['logs']
+                if log.get('level') == 'INFO' and any(keyword in log['content'] for keyword in ['成功', '开始添加', '添加完成', '获取到VLAN'])
+            )
+            execution_details.sort(key=lambda d: d['timestamp'])
+
+            test_case.update({
+                'status': record['status'],
+                'start_time': record['start_time'],
+                'end_time': record['end_time'],
+                'duration': f"{record['duration']:.1f}秒",
+                'execution_details': self._clean_execution_details(execution_details),
+                'execution_summary': self._create_execution_summary(execution_details),
+                'artifacts': record.get('artifacts', []),
+            })
+            if record.get('message'):
+                test_case['error_message'] = record['message']
+            if record.get('profile'):
+                test_case['profile'] = record['profile']
+            self._merge_case_run(cases, test_case, state['cycle'], record['nodeid'])
+
+        # 逐条处理事件，用例结束即合并，不保留全部用例记录
+        collector = ResultCollector(on_test=on_test)
+        for events_file in events_files:
+            # 逐轮子进程模式每个事件文件对应一轮；单进程多轮模式以 cycle_start 事件为准
+            state['cycle'] += 1
+            for event in iter_events(events_file):
+                if event.get('event') == 'cycle_start':
+                    state['cycle'] = event.get('cycle', state['cycle'])
+                collector.handle(event)
+
+        test_cases = list(cases.values())
+        self.logger.info(f"从结果通道事件构建出 {len(test_cases)} 个测试用例（共 {collector.stats['total']} 次执行）")
+        return test_cases
+
+    def _parse_test_cases_from_output(self, lines, yaml_config, login_yaml_config, test_config):
+        """从原始输出解析测试用例
+
+        Args:
+            lines: 输出行的可迭代对象（文件对象、生成器或字符串），逐行处理，不整体载入内存
+        """
+        if isinstance(lines, str):
+            lines = io.StringIO(lines)
+        cases = {}
+        cycle = 1
+        line_count = 0
+        # 本轮内各方法名已出现的次数
+        occurrences = {}
+        
+        current_test_case = None
+        current_execution_details = []
+        seen_contents = set()
+        
+        self.logger.info("开始解析测试输出")
+        
+        test_class = self._get_test_class(test_config)
+
+        def finish_current():
+            current_test_case['execution_details'] = self._clean_execution_details(current_execution_details)
+            current_test_case['execution_summary'] = self._create_execution_summary(current_execution_details)
+            if current_test_case['status'] == 'RUNNING':
+                current_test_case['status'] = 'PASSED'
+            method_name = current_test_case['method_name']
+            index = occurrences.get(method_name, 0)
+            occurrences[method_name] = index + 1
+            self._merge_case_run(cases, current_test_case, cycle, (index, method_name))
 
         for line in lines:
+            line_count += 1
             line = line.strip()
             
+            # 轮次分隔行
+            cycle_match = _CYCLE_HEADER.match(line)
+            if cycle_match:
+                if current_test_case:
+                    finish_current()
+                    current_test_case = None
+                cycle = int(cycle_match.group(1) or cycle_match.group(2))
+                occurrences.clear()
+                continue
+            
             # 检测测试用例开始
             if '[测试开始]' in line:
                 # 保存前一个测试用例
                 if current_test_case:
-                    current_test_case['execution_details'] = self._clean_execution_details(current_execution_details)
-                    current_test_case['execution_summary'] = self._create_execution_summary(current_execution_details)
-                    if current_test_case['status'] == 'RUNNING':
-                        current_test_case['status'] = 'PASSED'
-                    test_cases.append(current_test_case)
+                    finish_current()
                 
                 # 提取测试方法名及参数（支持参数化用例）
                 test_match = re.search(r'\[测试开始\]\s+([a-zA-Z0-9_]+)(?:\[(.*?)\])?', line)
@@ -245,40 +577,12 @@ class ReportGenerator:
                     test_match = re.search(r'\[测试开始\]\s+(\w+)(?:\s*\((.*?)\))?', line)
 
                 if test_match:
-                    method_name = test_match.group(1)
-                    param_desc = test_match.group(2) or ""
-
-                    # 优先从YAML获取用例名称
-                    yaml_test_case = yaml_config.get('test_cases', {}).get(method_name, {})
-                    display_name = yaml_test_case.get('name', f'{method_name} 功能测试')
-
-                    # 针对参数化用例，尝试从数据文件获取更详细的描述
-                    if param_desc:
-                        # 尝试从sta_group.yaml或vlan_data.yaml等文件中查找
-                        # 获取YAML数据中的第一个列表，作为测试用例数据源
-                        data_list_key = next((k for k, v in yaml_config.items() if isinstance(v, list)), None)
-                        if data_list_key:
-                            for item in yaml_config[data_list_key]:
-                                if item.get('test_case') == param_desc:
-                                    display_name = param_desc
-                                    break
-                    
-                    current_test_case = {
-                        'case_id': len(test_cases) + 1,
-                        'test_class': test_class,
-                        'method_name': method_name + (f"[{param_desc}]" if param_desc else ""),
-                        'name': display_name,
-                        'business_scenario': yaml_test_case.get('business_scenario', '验证功能正确性'),
-                        'test_steps': yaml_test_case.get('test_steps', ['1. 执行测试准备', '2. 执行核心操作', '3. 验证结果']),
-                        'risk_level': yaml_test_case.get('risk_level', '中等'),
-                        'priority': yaml_test_case.get('priority', '中'),
-                        'status': 'RUNNING',
-                        'execution_details': [],
-                        'start_time': self._extract_timestamp_from_line(line),
-                        'duration': '计算中...'
-                    }
+                    current_test_case = self._new_test_case(
+                        test_match.group(1), test_match.group(2) or "", yaml_config, test_class, 0
+                    )
+                    current_test_case['start_time'] = self._extract_timestamp_from_line(line)
                     current_execution_details = []
-                    self.logger.info(f"发现测试用例: {current_test_case['method_name']}")
+                    seen_contents = set()
             
             # 收集执行详情（过滤重复）
             if current_test_case:
@@ -288,7 +592,8 @@ class ReportGenerator:
                     timestamp = self._extract_timestamp_from_line(line)
                     
                     # 避免重复记录
-                    if not any(detail.get('content') == step_content for detail in current_execution_details):
+                    if step_content not in seen_contents:
+                        seen_contents.add(step_content)
                         current_execution_details.append({
                             'type': 'step',
                             'timestamp': timestamp,
@@ -302,7 +607,8 @@ class ReportGenerator:
                     
                     # 只记录重要的系统操作
                     if any(keyword in log_content for keyword in ['成功', '开始添加', '添加完成', '获取到VLAN']):
-                        if not any(detail.get('content') == log_content for detail in current_execution_details):
+                        if log_content not in seen_contents:
+                            seen_contents.add(log_content)
                             current_execution_details.append({
                                 'type': 'system',
                                 'timestamp': timestamp,
@@ -329,13 +635,11 @@ class ReportGenerator:
         
         # 添加最后一个测试用例
         if current_test_case:
-            current_test_case['execution_details'] = self._clean_execution_details(current_execution_details)
-            current_test_case['execution_summary'] = self._create_execution_summary(current_execution_details)
-            if current_test_case['status'] == 'RUNNING':
-                current_test_case['status'] = 'PASSED'
-            test_cases.append(current_test_case)
+            finish_current()
         
-        self.logger.info(f"成功解析出 {len(test_cases)} 个测试用例")
+        test_cases = list(cases.values())
+        runs = sum(case['cycle_stats']['runs'] for case in test_cases)
+        self.logger.info(f"成功解析出 {len(test_cases)} 个测试用例（{runs} 次执行，共 {line_count} 行输出）")
         return test_cases
 
     def _clean_execution_details(self, execution_details):
@@ -690,6 +994,24 @@ class ReportGenerator:
         .status-badge.failed { background: #f44336; }
         .status-badge.error { background: #FF9800; }
         
+        .cycle-stats {
+            margin-top: 4px;
+            font-size: 12px;
+            color: #666;
+        }
+        
+        .profile-bar { display: flex; height: 18px; border-radius: 3px; overflow: hidden; margin: 6px 0; }
+        .profile-legend span { display: inline-block; margin-right: 12px; font-size: 12px; }
+        .profile-legend i { display: inline-block; width: 10px; height: 10px; margin-right: 4px; border-radius: 2px; }
+        .flame-row { display: flex; width: 100%; }
+        .flame-node { min-width: 0; overflow: hidden; }
+        .flame-label {
+            font-size: 11px; color: #222; padding: 1px 3px; border: 1px solid #fff;
+            white-space: nowrap; overflow: hidden; text-overflow: ellipsis; cursor: default;
+        }
+        .profile-table { width: 100%; border-collapse: collapse; font-size: 12px; margin-top: 8px; }
+        .profile-table th, .profile-table td { padding: 4px 6px; border-bottom: 1px solid #eee; text-align: left; }
+        
         .details-btn {
             background: #2196F3;
             color: white;
@@ -929,6 +1251,9 @@ class ReportGenerator:
                             {% else %}
                             <span class="status-badge error">错误</span>
                             {% endif %}
+                            {% if test_case.cycle_stats and test_case.cycle_stats.runs > 1 %}
+                            <div class="cycle-stats">通过 {{ test_case.cycle_stats.passed }}/{{ test_case.cycle_stats.runs }} 轮</div>
+                            {% endif %}
                         </td>
                         <td>
                             <button class="details-btn" onclick="showDetails({{ loop.index0 }})">
@@ -1003,6 +1328,62 @@ class ReportGenerator:
                 </div>
             `;
             
+            const cycleStats = testCase.cycle_stats;
+            if (cycleStats && cycleStats.runs > 1) {
+                const seconds = (v) => v === null ? '未知' : `${v.toFixed(1)}秒`;
+                detailsHtml += `
+                <div class="detail-section">
+                    <div class="detail-title">🔁 多轮统计（详情为最后一轮）</div>
+                    <div>
+                        <strong>执行轮次：</strong>${cycleStats.runs}，通过 ${cycleStats.passed}，失败 ${cycleStats.failed}，错误 ${cycleStats.error}<br>
+                        <strong>通过率：</strong>${cycleStats.pass_rate.toFixed(1)}%<br>
+                        <strong>耗时：</strong>平均 ${seconds(cycleStats.avg_duration)}，最短 ${seconds(cycleStats.min_duration)}，最长 ${seconds(cycleStats.max_duration)}<br>
+                        <strong>最近失败轮次：</strong>${cycleStats.last_failure_cycle || '无'}
+                    </div>
+                </div>
+                `;
+            }
+            
+            const profile = testCase.profile;
+            if (profile && profile.profiled_ms > 0) {
+                const colors = {sleep: '#ef9a9a', wait: '#ffcc80', network: '#90caf9', ipc: '#a5d6a7', code: '#ce93d8', other: '#e0e0e0'};
+                const names = {sleep: '固定等待', wait: '条件等待', network: '导航/接口', ipc: 'Playwright调用', code: '页面对象代码', other: '其他'};
+                const secs = (ms) => `${(ms / 1000).toFixed(2)}秒`;
+                const categories = Object.entries(profile.by_category);
+                const renderFlame = (nodes, parentTotal) => `<div class="flame-row">${nodes.map(node => {
+                    const width = parentTotal > 0 ? node.total_ms / parentTotal * 100 : 0;
+                    const title = `${node.name}  总 ${secs(node.total_ms)} / 自身 ${secs(node.self_ms)} / ${node.count}次`;
+                    return `<div class="flame-node" style="flex: 0 0 ${width}%">
+                        <div class="flame-label" style="background: ${colors[node.category] || colors.other}" title="${title}">${node.name}</div>
+                        ${node.children.length ? renderFlame(node.children, node.total_ms) : ''}
+                    </div>`;
+                }).join('')}</div>`;
+                detailsHtml += `
+                <div class="detail-section">
+                    <div class="detail-title">⏱️ 调用剖析</div>
+                    <div>
+                        <strong>用例耗时：</strong>${secs(profile.wall_ms)}，页面对象内 ${secs(profile.profiled_ms)}（${profile.calls} 次调用）
+                    </div>
+                    <div class="profile-bar">
+                        ${categories.map(([c, ms]) => `<div style="flex: 0 0 ${ms / profile.profiled_ms * 100}%; background: ${colors[c]}" title="${names[c]} ${secs(ms)}"></div>`).join('')}
+                    </div>
+                    <div class="profile-legend">
+                        ${categories.map(([c, ms]) => `<span><i style="background: ${colors[c]}"></i>${names[c]} ${secs(ms)}</span>`).join('')}
+                    </div>
+                    <div style="margin-top: 10px">${renderFlame(profile.tree, profile.profiled_ms)}</div>
+                    <table class="profile-table">
+                        <thead><tr><th>页面对象方法</th><th>次数</th><th>总耗时</th><th>其中</th></tr></thead>
+                        <tbody>
+                        ${profile.by_method.map(m => `<tr>
+                            <td>${m.method}</td><td>${m.count}</td><td>${secs(m.total_ms)}</td>
+                            <td>${Object.entries(m.categories).map(([c, ms]) => `${names[c] || c} ${secs(ms)}`).join('，')}</td>
+                        </tr>`).join('')}
+                        </tbody>
+                    </table>
+                </div>
+                `;
+            }
+            
             modalBody.innerHTML = detailsHtml;
             modal.style.display = 'block';
         }
@@ -1027,6 +1408,259 @@ class ReportGenerator:
         });
     </script>
 </body>
+</html>'''
+    
+    def _get_summary_style(self):
+        """多轮汇总、浸泡报告共用的样式"""
+        return '''        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body { font-family: 'Microsoft YaHei', Arial, sans-serif; background: #f5f5f5; color: #333; line-height: 1.6; }
+        .container { max-width: 1600px; margin: 0 auto; padding: 20px; }
+        .header {
+            background: linear-gradient(135deg, #4CAF50, #45a049);
+            color: white; padding: 30px; border-radius: 10px; margin-bottom: 20px;
+            text-align: center; box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+        }
+        .header h1 { font-size: 2.2em; margin-bottom: 10px; }
+        .summary-cards { display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 15px; margin-bottom: 20px; }
+        .summary-card {
+            background: white; padding: 20px; border-radius: 8px; text-align: center;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1); border-left: 4px solid #4CAF50;
+        }
+        .summary-card.failed { border-left-color: #f44336; }
+        .summary-card.total { border-left-color: #2196F3; }
+        .card-title { font-size: 0.9em; color: #666; margin-bottom: 5px; }
+        .card-value { font-size: 2em; font-weight: bold; }
+        .section {
+            background: white; border-radius: 10px; overflow: hidden;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1); margin-bottom: 20px;
+        }
+        .table-header { background: #4CAF50; color: white; padding: 15px 20px; font-size: 1.3em; font-weight: bold; }
+        .section-body { padding: 15px 20px; overflow-x: auto; }
+        table { width: 100%; border-collapse: collapse; font-size: 0.9em; }
+        th, td { padding: 10px 12px; text-align: left; border-bottom: 1px solid #ddd; }
+        thead { background: #45a049; color: white; }
+        tbody tr:nth-child(even) { background-color: #f9f9f9; }
+        .rate-low { color: #f44336; font-weight: bold; }
+        .rate-mid { color: #FF9800; font-weight: bold; }
+        .rate-ok { color: #4CAF50; font-weight: bold; }
+        .grid { border-collapse: separate; border-spacing: 2px; width: auto; }
+        .grid td { padding: 0; border: none; }
+        .grid td.name { padding-right: 10px; white-space: nowrap; font-size: 0.85em; }
+        .cell { width: 12px; height: 16px; display: block; border-radius: 2px; background: #eee; }
+        .cell.passed { background: #4CAF50; }
+        .cell.failed { background: #f44336; }
+        .cell.error { background: #FF9800; }
+        .cell.skipped { background: #bbb; }
+        .bars { display: flex; align-items: flex-end; height: 80px; gap: 2px; }
+        .bar { flex: 1; min-width: 3px; background: #f44336; border-radius: 2px 2px 0 0; }
+        .muted { color: #888; font-size: 0.85em; }
+        code { font-size: 0.85em; word-break: break-all; }
+'''
+    
+    def _get_aggregate_template(self):
+        """多轮汇总报告模板"""
+        return '''<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{{ title }}</title>
+    <style>
+''' + self._get_summary_style() + '''    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>{{ title }}</h1>
+            <div>生成时间：{{ generate_time }} ｜ 路由器：{{ router_ip }} ｜ 测试功能：{{ test_function }}</div>
+        </div>
+
+        <div class="summary-cards">
+            <div class="summary-card total"><div class="card-title">执行轮次</div><div class="card-value">{{ cycles }}</div></div>
+            <div class="summary-card total"><div class="card-title">用例执行次数</div><div class="card-value">{{ total_runs }}</div></div>
+            <div class="summary-card"><div class="card-title">用例数</div><div class="card-value">{{ tests|length }}</div></div>
+            <div class="summary-card failed"><div class="card-title">不稳定/失败用例</div><div class="card-value">{{ unstable_count }}</div></div>
+        </div>
+
+        <div class="section">
+            <div class="table-header">📈 用例跨轮统计</div>
+            <div class="section-body">
+                <table>
+                    <thead>
+                        <tr>
+                            <th>测试用例</th><th>执行</th><th>通过</th><th>失败</th><th>错误</th><th>通过率</th>
+                            <th>最短</th><th>P50</th><th>P95</th><th>最长</th><th>首次失败轮次</th><th>连续失败区间</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {% for test in tests %}
+                        <tr>
+                            <td title="{{ test.nodeid }}">{{ test.name }}</td>
+                            <td>{{ test.runs }}</td>
+                            <td>{{ test.passed }}</td>
+                            <td>{{ test.failed }}</td>
+                            <td>{{ test.error }}</td>
+                            <td class="{% if test.pass_rate < 80 %}rate-low{% elif test.pass_rate < 100 %}rate-mid{% else %}rate-ok{% endif %}">{{ test.pass_rate }}%</td>
+                            <td>{{ test.min }}秒</td>
+                            <td>{{ test.p50 }}秒</td>
+                            <td>{{ test.p95 }}秒</td>
+                            <td>{{ test.max }}秒</td>
+                            <td>{{ test.first_failure_cycle or '-' }}</td>
+                            <td>{% for start, end in test.streaks %}{{ start }}{% if end != start %}-{{ end }}{% endif %}{% if not loop.last %}, {% endif %}{% else %}-{% endfor %}</td>
+                        </tr>
+                        {% endfor %}
+                    </tbody>
+                </table>
+            </div>
+        </div>
+
+        <div class="section">
+            <div class="table-header">🧩 失败分布（行：用例，列：轮次）</div>
+            <div class="section-body">
+                <table class="grid">
+                    {% for test in tests %}
+                    <tr>
+                        <td class="name">{{ test.name }}</td>
+                        {% for cycle in cycle_list %}
+                        <td><span class="cell {{ test.outcomes.get(cycle, '') }}" title="第{{ cycle }}轮: {{ test.outcomes.get(cycle, '未执行') }}"></span></td>
+                        {% endfor %}
+                    </tr>
+                    {% endfor %}
+                </table>
+                {% if cycle_failures %}
+                <div style="margin-top: 15px;">每轮失败用例数（最多 {{ max_cycle_failures }} 个）</div>
+                <div class="bars">
+                    {% for cycle in cycle_list %}
+                    {% set count = cycle_failures.get(cycle, 0) %}
+                    <div class="bar" style="height: {{ (count / max_cycle_failures * 100) if max_cycle_failures else 0 }}%;" title="第{{ cycle }}轮: {{ count }} 个失败"></div>
+                    {% endfor %}
+                </div>
+                {% endif %}
+            </div>
+        </div>
+
+        <div class="section">
+            <div class="table-header">🔍 失败归类</div>
+            <div class="section-body">
+                {% if clusters %}
+                <table>
+                    <thead><tr><th>失败信息（数字已归一）</th><th>次数</th><th>涉及用例</th><th>出现轮次</th></tr></thead>
+                    <tbody>
+                        {% for cluster in clusters %}
+                        <tr>
+                            <td><code>{{ cluster.signature }}</code></td>
+                            <td>{{ cluster.count }}</td>
+                            <td>{{ cluster.tests|join('、') }}</td>
+                            <td>{{ cluster.cycles|join(', ') }}</td>
+                        </tr>
+                        {% endfor %}
+                    </tbody>
+                </table>
+                {% else %}
+                <div>所有轮次均未出现失败 ✅</div>
+                {% endif %}
+            </div>
+        </div>
+
+        <div class="muted">数据来源：{{ results_store }}</div>
+    </div>
+</body>
+</html>'''
+    
+    def _get_soak_template(self):
+        """浸泡测试报告模板"""
+        return '''<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{{ title }}</title>
+    <style>
+''' + self._get_summary_style() + '''    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>{{ title }}</h1>
+            <div>生成时间：{{ generate_time }} ｜ 路由器：{{ router_ip }} ｜ 操作：{{ operations }}</div>
+        </div>
+
+        <div class="summary-cards">
+            <div class="summary-card total"><div class="card-title">持续时长</div><div class="card-value">{{ duration_minutes }}分</div></div>
+            <div class="summary-card total"><div class="card-title">统计窗口</div><div class="card-value">{{ windows }} × {{ window_seconds }}秒</div></div>
+            <div class="summary-card"><div class="card-title">接口调用</div><div class="card-value">{{ ops_summary|sum(attribute='count') }}</div></div>
+            <div class="summary-card failed"><div class="card-title">失败调用</div><div class="card-value">{{ ops_summary|sum(attribute='errors') }}</div></div>
+        </div>
+
+        <div class="section">
+            <div class="table-header">📋 接口汇总（首/尾三分之一窗口 P95 对比）</div>
+            <div class="section-body">
+                <table>
+                    <thead><tr><th>接口</th><th>调用次数</th><th>失败</th><th>错误率</th><th>前段P95</th><th>后段P95</th><th>变化</th></tr></thead>
+                    <tbody>
+                        {% for op in ops_summary %}
+                        <tr>
+                            <td>{{ op.name }}</td>
+                            <td>{{ op.count }}</td>
+                            <td>{{ op.errors }}</td>
+                            <td class="{% if op.error_rate > 0 %}rate-low{% else %}rate-ok{% endif %}">{{ op.error_rate }}%</td>
+                            <td>{{ op.first_p95 }}ms</td>
+                            <td>{{ op.last_p95 }}ms</td>
+                            <td class="{% if op.degraded %}rate-low{% elif op.change > 20 %}rate-mid{% else %}rate-ok{% endif %}">{{ '%+.1f'|format(op.change) }}%{% if op.degraded %} ⚠️ 变慢{% endif %}</td>
+                        </tr>
+                        {% endfor %}
+                    </tbody>
+                </table>
+            </div>
+        </div>
+
+        <div class="section">
+            <div class="table-header">📈 P95 耗时随时间变化</div>
+            <div class="section-body">{{ p95_chart }}</div>
+        </div>
+        <div class="section">
+            <div class="table-header">📉 P50 耗时随时间变化</div>
+            <div class="section-body">{{ p50_chart }}</div>
+        </div>
+        <div class="section">
+            <div class="table-header">❗ 错误率随时间变化</div>
+            <div class="section-body">{{ error_chart }}</div>
+        </div>
+        {% if health_names %}
+        <div class="section">
+            <div class="table-header">🩺 设备状态采样（表行数 / 探测耗时）</div>
+            <div class="section-body">{{ health_chart }}</div>
+        </div>
+        {% endif %}
+
+        <div class="section">
+            <div class="table-header">🗂️ 窗口明细</div>
+            <div class="section-body">
+                <table>
+                    <thead><tr><th>窗口</th><th>开始时间</th><th>接口</th><th>次数</th><th>错误率</th><th>P50</th><th>P95</th><th>最大</th></tr></thead>
+                    <tbody>
+                        {% for record in records %}
+                        {% for name, op in record.ops.items() %}
+                        <tr>
+                            <td>{{ record.window }}</td>
+                            <td>{{ record.time }}</td>
+                            <td>{{ name }}</td>
+                            <td>{{ op.count }}</td>
+                            <td>{{ op.error_rate }}%</td>
+                            <td>{{ op.p50_ms }}ms</td>
+                            <td>{{ op.p95_ms }}ms</td>
+                            <td>{{ op.max_ms }}ms</td>
+                        </tr>
+                        {% endfor %}
+                        {% endfor %}
+                    </tbody>
+                </table>
+            </div>
+        </div>
+
+        <div class="muted">数据来源：{{ time_series_file }}</div>
+    </div>
+</body>
 </html>'''
     
     def _get_chinese_template(self):
@@ -0,0 +1,333 @@
+# 结构化结果通道 - pytest插件以 JSON Lines 输出用例事件，供 TestRunner / GUI / 报告直接消费
+#
+# 用法: python -m pytest -p utils.result_channel --result-channel=reports/outputs/events.jsonl
+#
+# 事件格式（每行一个JSON对象，均包含 event/time/worker 字段）:
+#   session_start                                   会话开始
+#   cycle_start / cycle_end {cycle, cycles, stats}  多轮执行的轮次边界
+#   test_start {nodeid, name}                       用例开始
+#   step {nodeid, content}                          [执行步骤] 日志
+#   log {nodeid, level, content}                    RouterTest 其他日志
+#   profile {nodeid, profile}                       调用剖析分解（开启 profiling 时）
+#   test_end {nodeid, name, outcome, duration, message, artifacts, api}
+#                                                   api 为用例内接口调用耗时 {action: {count, p50_ms, p95_ms, max_ms, errors}}
+#   session_end {exitstatus, stats}                 会话结束
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from utils.cycle_results import percentile
+from utils.log_context import STEP_PREFIX
+from utils.logger import Logger
+
+# 当前进程内激活的通道（未启用时为None，emit/record_artifact 直接忽略）
+_active_channel = None
+
+
+def emit(event: str, **data):
+    """向当前通道写入事件，通道未启用时忽略"""
+    if _active_channel is not None:
+        _active_channel.emit(event, **data)
+
+
+def record_artifact(path, kind: str = "screenshot"):
+    """登记当前用例产生的附件（截图、导出文件等）"""
+    if _active_channel is not None and path:
+        _active_channel.add_artifact(str(path), kind)
+
+
+def record_api_call(action: str, duration_ms: float, ok: bool = True):
+    """登记当前用例内的一次接口调用耗时（RouterApiClient.call 调用）"""
+    if _active_channel is not None:
+        _active_channel.add_api_call(action, duration_ms, ok)
+
+
+def pytest_addoption(parser):
+    parser.addoption("--result-channel", default=None,
+                     help="以JSON Lines格式输出用例事件的文件路径")
+
+
+def _is_xdist_controller(config) -> bool:
+    """xdist 主控进程（-n N）只转发 worker 的报告，在主控中再写一遍事件会重复"""
+    if hasattr(config, "workerinput"):
+        return False
+    return getattr(config.option, "dist", "no") != "no" and not config.option.collectonly
+
+
+def pytest_configure(config):
+    global _active_channel
+    path = config.getoption("result_channel")
+    if path and _active_channel is None and not _is_xdist_controller(config):
+        _active_channel = ResultChannel(path)
+        config.pluginmanager.register(_active_channel, "result_channel_writer")
+
+
+def pytest_unconfigure(config):
+    global _active_channel
+    if _active_channel is not None:
+        _active_channel.close()
+        _active_channel = None
+
+
+class _ChannelLogHandler(logging.Handler):
+    """把 RouterTest 日志转成 step/log 事件"""
+
+    def __init__(self, channel):
+        super().__init__(level=logging.INFO)
+        self.channel = channel
+
+    def emit(self, record):
+        try:
+            message = record.getMessage()
+        except Exception:
+            return
+        if message.startswith(STEP_PREFIX):
+            self.channel.emit("step", nodeid=self.channel.current_nodeid,
+                              content=message[len(STEP_PREFIX):].strip())
+        else:
+            self.channel.emit("log", nodeid=self.channel.current_nodeid,
+                              level=record.levelname, content=message)
+
+
+class ResultChannel:
+    """事件写入端（pytest插件）"""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.worker = os.environ.get("PYTEST_XDIST_WORKER", "master")
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+        self.current_nodeid = None
+        self._reports = {}
+        self._artifacts = []
+        self._api_calls = {}
+        self._stats = {'total': 0, 'passed': 0, 'failed': 0, 'skipped': 0, 'error': 0}
+
+        # 先初始化 Logger 单例（其初始化会清空已有handler），再挂载通道handler
+        self._logger = Logger().get_logger()
+        self._log_handler = _ChannelLogHandler(self)
+        self._logger.addHandler(self._log_handler)
+
+    def emit(self, event: str, **data):
+        record = {'event': event, 'time': round(time.time(), 3), 'worker': self.worker}
+        record.update(data)
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def add_artifact(self, path: str, kind: str):
+        self._artifacts.append({'kind': kind, 'path': path})
+
+    def add_api_call(self, action: str, duration_ms: float, ok: bool):
+        with self._lock:
+            calls = self._api_calls.setdefault(action, {'durations': [], 'errors': 0})
+            calls['durations'].append(duration_ms)
+            if not ok:
+                calls['errors'] += 1
+
+    def _api_summary(self) -> dict:
+        with self._lock:
+            api_calls, self._api_calls = self._api_calls, {}
+        return {
+            action: {
+                'count': len(calls['durations']),
+                'p50_ms': round(percentile(calls['durations'], 50), 1),
+                'p95_ms': round(percentile(calls['durations'], 95), 1),
+                'max_ms': round(max(calls['durations']), 1),
+                'errors': calls['errors'],
+            }
+            for action, calls in api_calls.items()
+        }
+
+    def close(self):
+        self._logger.removeHandler(self._log_handler)
+        with self._lock:
+            self._file.close()
+
+    # ------------------------------------------------------------------
+    # pytest hooks
+    # ------------------------------------------------------------------
+    def pytest_sessionstart(self, session):
+        self.emit("session_start", pid=os.getpid())
+
+    def pytest_runtest_logstart(self, nodeid, location):
+        self.current_nodeid = nodeid
+        self._reports[nodeid] = {'outcome': None, 'duration': 0.0, 'message': ''}
+        self._artifacts = []
+        self._api_calls = {}
+        self.emit("test_start", nodeid=nodeid, name=nodeid.split("::")[-1])
+
+    def pytest_runtest_logreport(self, report):
+        state = self._reports.setdefault(report.nodeid, {'outcome': None, 'duration': 0.0, 'message': ''})
+        state['duration'] += report.duration
+        if report.failed and not state['message']:
+            lines = str(report.longreprtext or "").strip().splitlines()
+            state['message'] = lines[-1] if lines else ""
+
+        if report.when == "setup":
+            if report.failed:
+                state['outcome'] = "error"
+            elif report.skipped:
+                state['outcome'] = "skipped"
+        elif report.when == "call":
+            state['outcome'] = "passed" if report.passed else ("failed" if report.failed else "skipped")
+        elif report.when == "teardown":
+            if report.failed and state['outcome'] in (None, "passed"):
+                state['outcome'] = "error"
+            outcome = state['outcome'] or "error"
+            self._stats['total'] += 1
+            self._stats[outcome] += 1
+            self.emit("test_end", nodeid=report.nodeid, name=report.nodeid.split("::")[-1],
+                      outcome=outcome, duration=round(state['duration'], 3),
+                      message=state['message'], artifacts=list(self._artifacts),
+                      api=self._api_summary())
+            self._reports.pop(report.nodeid, None)
+            self.current_nodeid = None
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        self.emit("session_end", exitstatus=int(exitstatus), stats=dict(self._stats))
+
+
+class ResultCollector:
+    """事件消费端：维护统计和用例记录
+
+    TestRunner 在读取线程中逐条 handle() 事件；
+    ReportGenerator 可直接 from_file() 加载整份事件文件。
+    指定 on_test 时每条用例结束即回调 on_test(test)，不再保存到 tests 列表（多轮长时间运行时内存不随轮次增长）。
+    """
+
+    def __init__(self, on_test=None):
+        self.stats = {'total': 0, 'passed': 0, 'failed': 0, 'skipped': 0, 'error': 0}
+        self.tests = []
+        self.finished = False
+        self.on_test = on_test
+        self._running = {}
+
+    @classmethod
+    def from_file(cls, path):
+        collector = cls()
+        for event in iter_events(path):
+            collector.handle(event)
+        return collector
+
+    @staticmethod
+    def _clock(ts):
+        return datetime.fromtimestamp(ts).strftime('%H:%M:%S') if ts else '未知'
+
+    def handle(self, event: dict):
+        kind = event.get('event')
+        key = (event.get('worker'), event.get('nodeid'))
+        if kind == "test_start":
+            self._running[key] = {
+                'nodeid': event['nodeid'],
+                'name': event.get('name', ''),
+                'start_time': self._clock(event.get('time')),
+                'steps': [],
+                'logs': [],
+            }
+        elif kind in ("step", "log"):
+            test = self._running.get(key)
+            if test is not None:
+                entry = {'timestamp': self._clock(event.get('time')), 'content': event.get('content', '')}
+                if kind == "log":
+                    entry['level'] = event.get('level', 'INFO')
+                    test['logs'].append(entry)
+                else:
+                    test['steps'].append(entry)
+        elif kind == "profile":
+            test = self._running.get(key)
+            if test is not None:
+                test['profile'] = event.get('profile')
+        elif kind == "test_end":
+            test = self._running.pop(key, None) or {
+                'nodeid': event['nodeid'], 'name': event.get('name', ''),
+                'start_time': '未知', 'steps': [], 'logs': [],
+            }
+            outcome = event.get('outcome', 'error')
+            test.update({
+                'outcome': outcome,
+                'status': outcome.upper(),
+                'end_time': self._clock(event.get('time')),
+                'duration': event.get('duration', 0.0),
+                'message': event.get('message', ''),
+                'artifacts': event.get('artifacts', []),
+                'api': event.get('api', {}),
+            })
+            if self.on_test is not None:
+                self.on_test(test)
+            else:
+                self.tests.append(test)
+            self.stats['total'] += 1
+            self.stats[outcome] = self.stats.get(outcome, 0) + 1
+        elif kind == "session_end":
+            self.finished = True
+        return event
+
+
+def iter_events(path):
+    """逐行读取事件文件，跳过写了一半的行"""
+    if not path or not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+class ResultChannelReader(threading.Thread):
+    """后台跟读事件文件，每条事件回调一次 callback(event)"""
+
+    def __init__(self, path, callback, interval: float = 0.1):
+        super().__init__(daemon=True, name="result-channel-reader")
+        self.path = path
+        self.callback = callback
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._offset = 0
+        self._partial = b""
+
+    def _drain(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read()
+            self._offset = f.tell()
+        if not chunk:
+            return
+        lines = (self._partial + chunk).split(b"\n")
+        # 最后一段可能是尚未写完的行，留到下次
+        self._partial = lines.pop()
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                event = json.loads(line.decode("utf-8"))
+            except ValueError:
+                continue
+            try:
+                self.callback(event)
+            except Exception:
+                pass
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self._drain()
+            self._stop_event.wait(self.interval)
+        self._drain()
+
+    def stop(self):
+        """停止跟读并处理剩余事件"""
+        self._stop_event.set()
+        self.join()
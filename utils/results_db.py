@@ -0,0 +1,449 @@
+# 历史结果库 - TestRunner 把每次运行的轮次、用例结果、接口耗时和附件写入本地 SQLite，跨运行查询耗时趋势、最慢用例和回归
+#
+# 开启: config/test_config.yaml -> results_db.enabled（默认写入 reports/results.db）
+# 查询: python -m utils.results_db runs                               最近的运行
+#       python -m utils.results_db trend test_add_vlan                某用例各次运行的结果和耗时
+#       python -m utils.results_db slowest --runs 10                  最近N次运行中平均耗时最长的用例
+#       python -m utils.results_db regressions --threshold 0.2        最新一次运行相对此前运行变慢或新失败的用例
+#       python -m utils.results_db api --action vlan.add              接口耗时（按运行）
+#       python -m utils.results_db import reports/outputs/events_*.jsonl   导入历史事件文件 / 多轮结果文件
+import argparse
+import glob
+import json
+import os
+import re
+import sqlite3
+import statistics
+import threading
+from datetime import datetime
+
+from utils.cycle_results import MESSAGE_LIMIT, iter_records
+from utils.yaml_reader import YamlReader
+
+# 结果库配置默认值，可在 config/test_config.yaml 的 results_db 节点覆盖
+DEFAULT_RESULTS_DB_SETTINGS = {
+    'enabled': True,
+    'path': 'reports/results.db',
+}
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    status TEXT NOT NULL DEFAULT 'running',
+    label TEXT,
+    host TEXT,
+    cycles INTEGER,
+    total INTEGER DEFAULT 0,
+    passed INTEGER DEFAULT 0,
+    failed INTEGER DEFAULT 0,
+    error INTEGER DEFAULT 0,
+    skipped INTEGER DEFAULT 0,
+    success_rate REAL,
+    duration_s REAL,
+    config TEXT
+);
+CREATE TABLE IF NOT EXISTS cycles (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    cycle INTEGER NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    total INTEGER DEFAULT 0,
+    passed INTEGER DEFAULT 0,
+    failed INTEGER DEFAULT 0,
+    error INTEGER DEFAULT 0,
+    skipped INTEGER DEFAULT 0,
+    duration_s REAL DEFAULT 0,
+    PRIMARY KEY (run_id, cycle)
+);
+CREATE TABLE IF NOT EXISTS test_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    cycle INTEGER NOT NULL,
+    nodeid TEXT NOT NULL,
+    name TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    duration REAL NOT NULL,
+    message TEXT,
+    finished_at TEXT
+);
+CREATE TABLE IF NOT EXISTS api_latencies (
+    result_id INTEGER NOT NULL REFERENCES test_results(id),
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    action TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    p50_ms REAL,
+    p95_ms REAL,
+    max_ms REAL,
+    errors INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    result_id INTEGER REFERENCES test_results(id),
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON runs(started_at);
+CREATE INDEX IF NOT EXISTS idx_results_name ON test_results(name, finished_at);
+CREATE INDEX IF NOT EXISTS idx_results_finished ON test_results(finished_at);
+CREATE INDEX IF NOT EXISTS idx_results_run ON test_results(run_id, nodeid);
+CREATE INDEX IF NOT EXISTS idx_api_action ON api_latencies(action, run_id);
+CREATE INDEX IF NOT EXISTS idx_artifacts_run ON artifacts(run_id);
+"""
+
+_OUTCOMES = ('passed', 'failed', 'error', 'skipped')
+_FILE_TIME = re.compile(r"(\d{8}_\d{6})")
+
+
+def results_db_settings() -> dict:
+    cfg = YamlReader().read_yaml("config/test_config.yaml") or {}
+    settings = dict(DEFAULT_RESULTS_DB_SETTINGS)
+    settings.update(cfg.get('results_db') or {})
+    return settings
+
+
+def _now() -> str:
+    return datetime.now().strftime(TIME_FORMAT)
+
+
+def _format_ts(ts) -> str:
+    return datetime.fromtimestamp(ts).strftime(TIME_FORMAT) if ts else _now()
+
+
+class ResultsDB:
+    """历史结果库
+
+    TestRunner 在结果通道读取线程中逐条 record_test()，在主线程 start_run()/finish_run()，
+    连接跨线程共享，写入由锁串行化；每条用例单独提交，运行中途中断也不丢已完成的结果。
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+    def start_run(self, test_config: dict = None, started_at: str = None) -> int:
+        """登记一次运行，返回 run_id"""
+        test_config = test_config or {}
+        functions = test_config.get('test_function') or []
+        if isinstance(functions, str):
+            functions = [functions]
+        # 只保存定位运行所需的配置，不落盘账号密码
+        config = {key: test_config[key] for key in ('test_function', 'cycles', 'parallel_workers', 'run_mode')
+                  if key in test_config}
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (started_at, label, host, cycles, config) VALUES (?, ?, ?, ?, ?)",
+                (started_at or _now(), ",".join(functions), (test_config.get('router') or {}).get('ip'),
+                 test_config.get('cycles', 1), json.dumps(config, ensure_ascii=False)))
+            return cursor.lastrowid
+
+    def record_test(self, run_id: int, cycle: int, event: dict, finished_at: str = None):
+        """写入一条 test_end 事件（含附件和接口耗时），同时累计到轮次统计"""
+        outcome = event.get('outcome', 'error')
+        if outcome not in _OUTCOMES:
+            outcome = 'error'
+        duration = round(float(event.get('duration') or 0.0), 3)
+        finished_at = _format_ts(event['time']) if event.get('time') else finished_at or _now()
+        nodeid = event.get('nodeid', '')
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO test_results (run_id, cycle, nodeid, name, outcome, duration, message, finished_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, cycle, nodeid, event.get('name') or nodeid.split("::")[-1], outcome, duration,
+                 (event.get('message') or "")[:MESSAGE_LIMIT], finished_at))
+            result_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO api_latencies (result_id, run_id, action, count, p50_ms, p95_ms, max_ms, errors) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(result_id, run_id, action, api.get('count', 0), api.get('p50_ms'), api.get('p95_ms'),
+                  api.get('max_ms'), api.get('errors', 0))
+                 for action, api in (event.get('api') or {}).items()])
+            self._conn.executemany(
+                "INSERT INTO artifacts (run_id, result_id, kind, path) VALUES (?, ?, ?, ?)",
+                [(run_id, result_id, artifact.get('kind', 'file'), artifact.get('path'))
+                 for artifact in event.get('artifacts') or [] if artifact.get('path')])
+            self._conn.execute(
+                f"INSERT INTO cycles (run_id, cycle, started_at, finished_at, total, {outcome}, duration_s) "
+                f"VALUES (?, ?, ?, ?, 1, 1, ?) "
+                f"ON CONFLICT(run_id, cycle) DO UPDATE SET finished_at = excluded.finished_at, total = total + 1, "
+                f"{outcome} = {outcome} + 1, duration_s = duration_s + excluded.duration_s",
+                (run_id, cycle, finished_at, finished_at, duration))
+            return result_id
+
+    def add_artifact(self, run_id: int, kind: str, path):
+        """登记运行级附件（报告、输出日志、事件文件等）"""
+        if not path:
+            return
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO artifacts (run_id, kind, path) VALUES (?, ?, ?)",
+                               (run_id, kind, str(path)))
+
+    def finish_run(self, run_id: int, stats: dict = None, duration_s: float = None, status: str = "finished",
+                   finished_at: str = None):
+        """补全运行统计；stats 缺失时按已写入的用例结果计算"""
+        with self._lock, self._conn:
+            if not stats or not stats.get('total'):
+                row = self._conn.execute(
+                    "SELECT COUNT(*) AS total, "
+                    + ", ".join(f"SUM(outcome = '{o}') AS {o}" for o in _OUTCOMES)
+                    + " FROM test_results WHERE run_id = ?", (run_id,)).fetchone()
+                stats = {key: row[key] or 0 for key in row.keys()}
+            total = stats.get('total', 0)
+            success_rate = stats.get('success_rate')
+            if success_rate is None:
+                success_rate = stats.get('passed', 0) / total * 100 if total else 0.0
+            self._conn.execute(
+                "UPDATE runs SET finished_at = ?, status = ?, total = ?, passed = ?, failed = ?, error = ?, "
+                "skipped = ?, success_rate = ?, duration_s = ? WHERE id = ?",
+                (finished_at or _now(), status, total, stats.get('passed', 0), stats.get('failed', 0),
+                 stats.get('error', 0), stats.get('skipped', 0), round(success_rate, 1),
+                 round(duration_s, 1) if duration_s is not None else None, run_id))
+
+    def import_file(self, path) -> int:
+        """导入历史事件文件（events_*.jsonl）或多轮结果文件（cycle_results_*.jsonl），返回 run_id"""
+        records = list(iter_records(path))
+        match = _FILE_TIME.search(os.path.basename(str(path)))
+        file_time = (datetime.strptime(match.group(1), '%Y%m%d_%H%M%S').strftime(TIME_FORMAT) if match
+                     else _format_ts(os.path.getmtime(path)))
+        events = [r for r in records if 'event' in r]
+        times = [r['time'] for r in events if r.get('time')]
+        started_at = _format_ts(min(times)) if times else file_time
+        finished_at = _format_ts(max(times)) if times else file_time
+        cycles = max([r.get('cycle', 1) for r in (events or records) if r.get('cycle')] or [1])
+
+        run_id = self.start_run({'cycles': cycles}, started_at=started_at)
+        if events:
+            cycle = 1
+            for event in events:
+                if event['event'] == 'cycle_start':
+                    cycle = event.get('cycle', cycle)
+                elif event['event'] == 'test_end':
+                    self.record_test(run_id, cycle, event)
+        else:
+            # 多轮结果文件没有时间戳，按文件时间记录
+            for record in records:
+                self.record_test(run_id, record.get('cycle', 1), record, finished_at=file_time)
+        self.add_artifact(run_id, "imported", path)
+        duration = (max(times) - min(times)) if times else None
+        self.finish_run(run_id, duration_s=duration, status="imported", finished_at=finished_at)
+        return run_id
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+    def _query(self, sql: str, params=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def recent_runs(self, limit: int = 20) -> list:
+        return self._query("SELECT * FROM runs ORDER BY started_at DESC, id DESC LIMIT ?", (limit,))
+
+    def _last_run_ids(self, runs: int) -> list:
+        """最近N次有用例结果的运行（含进行中和中途中断的运行）"""
+        rows = self._query("SELECT id FROM runs WHERE EXISTS (SELECT 1 FROM test_results t WHERE t.run_id = runs.id) "
+                           "ORDER BY started_at DESC, id DESC LIMIT ?", (runs,))
+        return [row['id'] for row in rows]
+
+    def trend(self, name: str, limit: int = 20) -> list:
+        """某用例（名称或 nodeid 片段）在最近各次运行中的执行次数、通过数和耗时"""
+        return self._query(
+            "SELECT r.id AS run_id, r.started_at, t.nodeid, COUNT(*) AS runs, "
+            "SUM(t.outcome = 'passed') AS passed, ROUND(AVG(t.duration), 2) AS avg, "
+            "ROUND(MIN(t.duration), 2) AS min, ROUND(MAX(t.duration), 2) AS max "
+            "FROM test_results t JOIN runs r ON r.id = t.run_id "
+            "WHERE t.name = ? OR t.nodeid LIKE ? "
+            "GROUP BY r.id, t.nodeid ORDER BY r.started_at DESC, r.id DESC LIMIT ?",
+            (name, f"%{name}%", limit))
+
+    def slowest(self, runs: int = 10, limit: int = 20) -> list:
+        """最近N次运行中平均耗时最长的用例（不含跳过）"""
+        run_ids = self._last_run_ids(runs)
+        if not run_ids:
+            return []
+        marks = ",".join("?" * len(run_ids))
+        return self._query(
+            f"SELECT nodeid, name, COUNT(*) AS runs, ROUND(AVG(duration), 2) AS avg, ROUND(MAX(duration), 2) AS max, "
+            f"ROUND(SUM(outcome IN ('failed', 'error')) * 100.0 / COUNT(*), 1) AS fail_rate "
+            f"FROM test_results WHERE run_id IN ({marks}) AND outcome != 'skipped' "
+            f"GROUP BY nodeid ORDER BY avg DESC LIMIT ?", (*run_ids, limit))
+
+    def regressions(self, baseline: int = 5, threshold: float = 0.2, min_seconds: float = 1.0) -> dict:
+        """最新一次运行对比此前 baseline 次运行
+
+        变慢: 平均耗时超过基线各次平均耗时的中位数 (1 + threshold) 倍且至少多 min_seconds 秒
+        新失败: 本次失败/错误，而基线中该用例全部通过
+        """
+        run_ids = self._last_run_ids(baseline + 1)
+        if not run_ids:
+            return {'run_id': None, 'baseline_runs': [], 'slower': [], 'new_failures': []}
+        latest, previous = run_ids[0], run_ids[1:]
+        marks = ",".join("?" * len(run_ids))
+        rows = self._query(
+            f"SELECT run_id, nodeid, name, AVG(duration) AS avg, SUM(outcome IN ('failed', 'error')) AS failures, "
+            f"MAX(message) AS message FROM test_results WHERE run_id IN ({marks}) AND outcome != 'skipped' "
+            f"GROUP BY run_id, nodeid", run_ids)
+
+        current, history = {}, {}
+        for row in rows:
+            if row['run_id'] == latest:
+                current[row['nodeid']] = row
+            else:
+                history.setdefault(row['nodeid'], []).append(row)
+
+        slower, new_failures = [], []
+        for nodeid, row in current.items():
+            past = history.get(nodeid)
+            if not past:
+                continue
+            if row['failures'] and not any(p['failures'] for p in past):
+                new_failures.append({'nodeid': nodeid, 'name': row['name'], 'message': row['message']})
+            base = statistics.median(p['avg'] for p in past)
+            if row['avg'] > base * (1 + threshold) and row['avg'] - base >= min_seconds:
+                slower.append({'nodeid': nodeid, 'name': row['name'], 'avg': round(row['avg'], 2),
+                               'baseline': round(base, 2), 'change': round((row['avg'] / base - 1) * 100, 1) if base else None})
+        slower.sort(key=lambda item: item['avg'] - item['baseline'], reverse=True)
+        return {'run_id': latest, 'baseline_runs': previous, 'slower': slower, 'new_failures': new_failures}
+
+    def api_latency(self, action: str = None, runs: int = 10) -> list:
+        """各次运行的接口耗时
+
+        用例内只保存了分位数，无法还原整次运行的真实分位数：
+        avg_p50_ms 为各用例 p50 按调用次数加权的平均值，p95_ms / max_ms 为各用例中的最大值。
+        """
+        run_ids = self._last_run_ids(runs)
+        if not run_ids:
+            return []
+        marks = ",".join("?" * len(run_ids))
+        params = list(run_ids)
+        where = ""
+        if action:
+            where = " AND a.action LIKE ?"
+            params.append(f"{action}%")
+        return self._query(
+            f"SELECT a.run_id, r.started_at, a.action, SUM(a.count) AS calls, SUM(a.errors) AS errors, "
+            f"ROUND(SUM(a.p50_ms * a.count) / SUM(a.count), 1) AS avg_p50_ms, ROUND(MAX(a.p95_ms), 1) AS p95_ms, "
+            f"ROUND(MAX(a.max_ms), 1) AS max_ms "
+            f"FROM api_latencies a JOIN runs r ON r.id = a.run_id WHERE a.run_id IN ({marks}){where} "
+            f"GROUP BY a.run_id, a.action ORDER BY r.started_at DESC, a.run_id DESC, calls DESC", params)
+
+
+# ----------------------------------------------------------------------
+# 命令行
+# ----------------------------------------------------------------------
+def _print_runs(rows):
+    for row in rows:
+        duration = f"{row['duration_s']:.0f}秒" if row['duration_s'] is not None else "-"
+        rate = f"{row['success_rate']:.1f}%" if row['success_rate'] is not None else "-"
+        print(f"#{row['id']:<5} {row['started_at']}  {row['status']:<8} {row['total']:>4} 条 "
+              f"(通过 {row['passed']} / 失败 {row['failed']} / 错误 {row['error']} / 跳过 {row['skipped']})  "
+              f"成功率 {rate:>6}  耗时 {duration:>6}  {row['label'] or ''}")
+
+
+def _print_trend(rows):
+    for row in rows:
+        print(f"#{row['run_id']:<5} {row['started_at']}  {row['nodeid'].split('::')[-1]:<40} "
+              f"通过 {row['passed']}/{row['runs']}  耗时 avg/min/max {row['avg']}/{row['min']}/{row['max']}秒")
+
+
+def _print_slowest(rows):
+    for row in rows:
+        print(f"  {row['name']:<40} 平均 {row['avg']:>7}秒  最长 {row['max']:>7}秒  "
+              f"执行 {row['runs']} 次  失败率 {row['fail_rate']}%")
+
+
+def _print_regressions(result):
+    if result['run_id'] is None:
+        print("结果库中没有运行记录")
+        return
+    baseline = ", ".join(f"#{run_id}" for run_id in result['baseline_runs']) or "无"
+    print(f"运行 #{result['run_id']} 对比基线 {baseline}")
+    print(f"变慢 {len(result['slower'])} 个:")
+    for item in result['slower']:
+        print(f"  {item['name']:<40} {item['baseline']}秒 -> {item['avg']}秒 (+{item['change']}%)")
+    print(f"新失败 {len(result['new_failures'])} 个:")
+    for item in result['new_failures']:
+        print(f"  {item['name']:<40} {item['message'] or ''}")
+
+
+def _print_api(rows):
+    for row in rows:
+        print(f"#{row['run_id']:<5} {row['started_at']}  {row['action']:<30} 调用 {row['calls']:>5} 次  "
+              f"加权平均p50 {row['avg_p50_ms']}ms  最大p95 {row['p95_ms']}ms  max {row['max_ms']}ms  失败 {row['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="查询历史测试结果库")
+    parser.add_argument("--db", help="结果库路径（默认取配置 results_db.path）")
+    parser.add_argument("--json", action="store_true", help="以JSON输出")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    runs = sub.add_parser("runs", help="最近的运行")
+    runs.add_argument("--limit", type=int, default=20)
+
+    trend = sub.add_parser("trend", help="某用例各次运行的结果和耗时")
+    trend.add_argument("name", help="用例名或 nodeid 片段")
+    trend.add_argument("--limit", type=int, default=20)
+
+    slowest = sub.add_parser("slowest", help="最近N次运行中平均耗时最长的用例")
+    slowest.add_argument("--runs", type=int, default=10)
+    slowest.add_argument("--limit", type=int, default=20)
+
+    regressions = sub.add_parser("regressions", help="最新一次运行相对此前运行的耗时回归和新失败")
+    regressions.add_argument("--baseline", type=int, default=5, help="作为基线的此前运行次数")
+    regressions.add_argument("--threshold", type=float, default=0.2, help="变慢比例阈值")
+    regressions.add_argument("--min-seconds", type=float, default=1.0, help="变慢的最小绝对秒数")
+
+    api = sub.add_parser("api", help="接口耗时（按运行）")
+    api.add_argument("--action", help="接口操作前缀，如 vlan 或 vlan.add")
+    api.add_argument("--runs", type=int, default=10)
+
+    imports = sub.add_parser("import", help="导入历史事件文件 / 多轮结果文件")
+    imports.add_argument("files", nargs="+")
+
+    args = parser.parse_args()
+    db = ResultsDB(args.db or results_db_settings()['path'])
+    try:
+        if args.command == "import":
+            for pattern in args.files:
+                for path in sorted(glob.glob(pattern)) or [pattern]:
+                    print(f"导入 {path} -> 运行 #{db.import_file(path)}")
+            return 0
+
+        if args.command == "runs":
+            result, printer = db.recent_runs(args.limit), _print_runs
+        elif args.command == "trend":
+            result, printer = db.trend(args.name, args.limit), _print_trend
+        elif args.command == "slowest":
+            result, printer = db.slowest(args.runs, args.limit), _print_slowest
+        elif args.command == "regressions":
+            result, printer = db.regressions(args.baseline, args.threshold, args.min_seconds), _print_regressions
+        else:
+            result, printer = db.api_latency(args.action, args.runs), _print_api
+
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+        else:
+            printer(result)
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
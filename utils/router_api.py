@@ -0,0 +1,240 @@
+# 路由器 /Action/call 接口客户端
+import json
+import re
+import time
+import requests
+from utils.logger import Logger
+from utils.result_channel import record_api_call
+from utils.yaml_reader import YamlReader
+
+# 接口返回码
+RESULT_SUCCESS_CODES = (0, 30000)
+RESULT_ALREADY_EXISTS = 30001
+
+
+def vlan_mac(vlan_id) -> str:
+    """根据VLAN ID生成唯一的MAC地址（与批量创建保持一致）"""
+    vlan_id = int(vlan_id)
+    return f"00:b7:21:ef:{(vlan_id // 256):02x}:{(vlan_id % 256):02x}"
+
+
+class RouterApiError(Exception):
+    """接口调用失败（HTTP错误、非JSON响应或Result码非成功）"""
+
+    def __init__(self, func_name: str, action: str, message: str, result=None, response=None):
+        self.func_name = func_name
+        self.action = action
+        self.result = result
+        self.response = response
+        super().__init__(f"{func_name}.{action} 调用失败: {message} (Result={result})")
+
+
+class RouterApiClient:
+    """路由器 JSON-RPC 接口客户端
+
+    所有操作都通过 POST /Action/call 完成，请求体格式为
+    {"func_name": ..., "action": ..., "param": {...}}。
+    会话复用浏览器登录后的 Cookie（sess_key 等），可直接用于测试的
+    前置数据准备、清理以及结果校验。
+    """
+
+    def __init__(self, host: str = None, cookies=None, timeout: float = 10):
+        self.logger = Logger().get_logger()
+        if host is None:
+            cfg = YamlReader().read_yaml("config/test_config.yaml") or {}
+            host = cfg.get("router", {}).get("ip", "10.66.0.40")
+        self.host = host
+        self.base_url = f"http://{host}"
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            "accept": "application/json, text/plain, */*",
+            "content-type": "application/json;charset=UTF-8",
+            "referer": f"{self.base_url}/",
+        })
+        if cookies:
+            self.set_cookies(cookies)
+
+    @classmethod
+    def from_context(cls, context, host: str = None, **kwargs):
+        """从 Playwright BrowserContext 的 Cookie 创建客户端"""
+        return cls(host=host, cookies=context.cookies(), **kwargs)
+
+    @classmethod
+    def from_page(cls, page, **kwargs):
+        """从已登录的 Playwright Page 创建客户端，host 取自当前页面URL"""
+        host = kwargs.pop('host', None)
+        host_match = re.search(r'https?://([^/#?]+)', page.url or "")
+        if host is None and host_match:
+            host = host_match.group(1)
+        return cls.from_context(page.context, host=host, **kwargs)
+
+    @classmethod
+    def from_login_page(cls, login_page, **kwargs):
+        """从已完成登录的 LoginPage 创建客户端"""
+        return cls.from_page(login_page.page, **kwargs)
+
+    def set_cookies(self, cookies):
+        """设置会话Cookie，支持 Playwright cookies() 列表或 {name: value} 字典"""
+        if isinstance(cookies, dict):
+            cookies = [{'name': k, 'value': v} for k, v in cookies.items()]
+        for cookie in cookies:
+            self.session.cookies.set(cookie['name'], cookie['value'])
+
+    def clone(self):
+        """复制一个共享登录Cookie、但使用独立连接的客户端（用于多线程）"""
+        client = type(self)(host=self.host, timeout=self.timeout)
+        client.session.cookies.update(self.session.cookies)
+        return client
+
+    def close(self):
+        self.session.close()
+
+    # ------------------------------------------------------------------
+    # 基础调用
+    # ------------------------------------------------------------------
+    @staticmethod
+    def decode_result(resp_json) -> str:
+        """解析Result码: success / exists / error"""
+        code = resp_json.get("Result") if isinstance(resp_json, dict) else None
+        if code in RESULT_SUCCESS_CODES:
+            return "success"
+        if code == RESULT_ALREADY_EXISTS:
+            return "exists"
+        return "error"
+
+    def call(self, func_name: str, action: str, param: dict = None, check: bool = True, allow_exists: bool = False):
+        """调用 /Action/call，返回响应JSON
+
+        Args:
+            check: Result码非成功时抛出 RouterApiError
+            allow_exists: 30001(已存在)视为成功
+        """
+        payload = {"func_name": func_name, "action": action, "param": param or {}}
+        name = f"{func_name}.{action}"
+        start = time.perf_counter()
+        try:
+            response = self.session.post(
+                f"{self.base_url}/Action/call",
+                data=json.dumps(payload),
+                timeout=self.timeout
+            )
+        except requests.RequestException as e:
+            record_api_call(name, (time.perf_counter() - start) * 1000, ok=False)
+            raise RouterApiError(func_name, action, f"请求异常: {e}")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if response.status_code != 200:
+            record_api_call(name, elapsed_ms, ok=False)
+            raise RouterApiError(func_name, action, f"HTTP {response.status_code}", response=response)
+
+        try:
+            data = response.json()
+        except ValueError:
+            # 会话失效时路由器返回登录页HTML
+            record_api_call(name, elapsed_ms, ok=False)
+            raise RouterApiError(func_name, action, "响应不是JSON，会话可能已失效", response=response)
+
+        status = self.decode_result(data)
+        record_api_call(name, elapsed_ms, ok=status != "error")
+        self.logger.debug(f"[API] {name} -> {data.get('Result')} {data.get('ErrMsg', '')}",
+                          extra={'action': name, 'duration_ms': elapsed_ms})
+        if check and status != "success" and not (allow_exists and status == "exists"):
+            raise RouterApiError(func_name, action, data.get("ErrMsg", "未知错误"), result=data.get("Result"), response=response)
+        return data
+
+    def show(self, func_name: str, keywords: str = None, finds: str = None, page_size: int = 500, extra_param: dict = None):
+        """分页读取全部数据行，返回 Data.data 合并后的列表"""
+        rows = []
+        offset = 0
+        while True:
+            param = {"TYPE": "total,data", "limit": f"{offset},{page_size}", "ORDER_BY": "", "ORDER": ""}
+            if keywords:
+                param["FINDS"] = finds or ""
+                param["KEYWORDS"] = keywords
+            if extra_param:
+                param.update(extra_param)
+
+            data = self.call(func_name, "show", param).get("Data") or {}
+            page_rows = data.get("data") or []
+            rows.extend(page_rows)
+            total = int(data.get("total") or 0)
+            offset += page_size
+            if not page_rows or offset >= total:
+                break
+        return rows
+
+    @staticmethod
+    def _join_ids(ids) -> str:
+        return ",".join(str(i) for i in ids)
+
+    # ------------------------------------------------------------------
+    # VLAN
+    # ------------------------------------------------------------------
+    def show_vlans(self, keywords: str = None):
+        """查询VLAN列表，keywords 对应页面搜索框"""
+        return self.show("vlan", keywords=keywords, finds="vlan_id,vlan_name,ip_addr,comment")
+
+    def find_vlan(self, vlan_id):
+        """按 vlan_id 精确查找单条VLAN，不存在返回None"""
+        for row in self.show_vlans(keywords=str(vlan_id)):
+            if str(row.get("vlan_id")) == str(vlan_id):
+                return row
+        return None
+
+    def add_vlan(self, vlan_id, vlan_name: str, ip_addr: str, comment: str = "", netmask: str = "255.255.255.0",
+                 interface: str = "lan1", mac: str = None, enabled: str = "yes", allow_exists: bool = True):
+        """新增VLAN，返回响应JSON（已存在时 Result=30001）"""
+        param = {
+            "vlan_id": str(vlan_id),
+            "vlan_name": vlan_name,
+            "ip_addr": ip_addr,
+            "mac": mac or vlan_mac(vlan_id),
+            "ip_mask": "",
+            "interface": interface,
+            "netmask": netmask,
+            "comment": comment,
+            "enabled": enabled,
+        }
+        return self.call("vlan", "add", param, allow_exists=allow_exists)
+
+    def edit_vlan(self, vlan_id, **changes):
+        """修改VLAN字段，字段名与接口一致（vlan_name/ip_addr/netmask/interface/comment...）"""
+        row = self.find_vlan(vlan_id)
+        if row is None:
+            raise RouterApiError("vlan", "edit", f"VLAN{vlan_id}不存在")
+        param = dict(row)
+        param.update(changes)
+        return self.call("vlan", "edit", param)
+
+    def enable_vlans(self, row_ids):
+        """启用VLAN（row_ids 为接口返回的行 id）"""
+        return self.call("vlan", "up", {"id": self._join_ids(row_ids)})
+
+    def disable_vlans(self, row_ids):
+        """停用VLAN（row_ids 为接口返回的行 id）"""
+        return self.call("vlan", "down", {"id": self._join_ids(row_ids)})
+
+    def delete_vlans(self, row_ids):
+        """删除VLAN（row_ids 为接口返回的行 id）"""
+        if not row_ids:
+            return None
+        return self.call("vlan", "del", {"id": self._join_ids(row_ids)})
+
+    def delete_vlans_by_vlan_id(self, vlan_ids):
+        """按 vlan_id 删除VLAN，返回实际删除的数量"""
+        wanted = {str(v) for v in vlan_ids}
+        row_ids = [row["id"] for row in self.show_vlans() if str(row.get("vlan_id")) in wanted]
+        self.delete_vlans(row_ids)
+        return len(row_ids)
+
+    def delete_all_vlans(self):
+        """删除全部VLAN，返回删除数量"""
+        row_ids = [row["id"] for row in self.show_vlans()]
+        self.delete_vlans(row_ids)
+        return len(row_ids)
+
+    def export_vlans(self, fmt: str = "csv"):
+        """触发VLAN导出，返回路由器生成的文件名"""
+        return self.call("vlan", "EXPORT", {"format": fmt}).get("Filename")
@@ -1,16 +1,186 @@
-# 截图工具
+# 截图工具 - 测试线程只负责抓取，去重、编码和写盘在后台线程完成，并按本次运行的磁盘预算淘汰最早的截图
+import atexit
+import hashlib
+import io
+import queue
+import threading
+from collections import OrderedDict
 from playwright.sync_api import Page
 from pathlib import Path
 from datetime import datetime
+from utils.result_channel import record_artifact
+from utils.yaml_reader import YamlReader
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# 截图配置默认值，可在 config/test_config.yaml 的 screenshot 节点覆盖
+DEFAULT_SCREENSHOT_SETTINGS = {
+    'dir': 'screenshots',
+    'format': 'jpeg',         # jpeg / png / webp（webp 需要 Pillow，缺失时按 jpeg 保存）
+    'quality': 70,            # jpeg/webp 质量 1-100
+    'full_page': False,       # 只截可视区域
+    'dedup': True,            # 与上一张截图内容相同时不重复保存
+    'async_write': True,      # 后台线程编码和写盘
+    'max_total_mb': 200,      # 本次运行截图占用的磁盘上限，超出时删除最早的截图
+    'queue_size': 100,
+}
+
+_SUFFIXES = {'jpeg': '.jpg', 'png': '.png', 'webp': '.webp'}
+
+
+class ScreenshotWriter:
+    """截图写入（单例）
+
+    save() 在测试线程计算哈希并确定文件路径，图片数据放入队列后立即返回；
+    后台线程完成 WebP 转码、写盘和磁盘预算淘汰。
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if hasattr(self, 'initialized'):
+            return
+        self.initialized = True
+        cfg = YamlReader().read_yaml("config/test_config.yaml") or {}
+        self.settings = dict(DEFAULT_SCREENSHOT_SETTINGS)
+        self.settings.update(cfg.get('screenshot') or {})
+        self.budget = int(self.settings['max_total_mb'] * 1024 * 1024)
+
+        self.saved = 0
+        self.skipped = 0
+        self.evicted = 0
+        self.total_bytes = 0
+        self._files = OrderedDict()
+        self._last_hash = None
+        self._last_path = None
+        self._queue = queue.Queue(maxsize=self.settings['queue_size'])
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def capture_options(self) -> dict:
+        """传给 page.screenshot() / element.screenshot() 的参数"""
+        options = {'type': 'png' if self.settings['format'] == 'png' else 'jpeg'}
+        if options['type'] == 'jpeg':
+            # webp 先以最高质量 jpeg 抓取，转码时再按配置质量压缩
+            options['quality'] = 100 if self.settings['format'] == 'webp' else int(self.settings['quality'])
+        return options
+
+    def target_format(self) -> str:
+        fmt = self.settings['format']
+        return 'jpeg' if fmt == 'webp' and Image is None else fmt
+
+    # ------------------------------------------------------------------
+    # 生产端（测试线程）
+    # ------------------------------------------------------------------
+    def save(self, data: bytes, directory: Path, name: str):
+        """保存截图数据，返回文件路径；与上一张相同时返回上一张的路径"""
+        digest = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            if self.settings['dedup'] and digest == self._last_hash and self._last_path is not None:
+                self.skipped += 1
+                return self._last_path, False
+            path = Path(directory) / f"{name}{_SUFFIXES[self.target_format()]}"
+            self._last_hash, self._last_path = digest, path
+
+        if not self.settings['async_write']:
+            self._write(data, path)
+            return path, True
+        self._ensure_writer()
+        try:
+            self._queue.put(("write", (data, path)), timeout=5)
+        except queue.Full:
+            # 写盘跟不上时退回同步写入，不丢截图
+            self._write(data, path)
+        return path, True
+
+    # ------------------------------------------------------------------
+    # 后台写入
+    # ------------------------------------------------------------------
+    def _ensure_writer(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="screenshot-writer")
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _encode(self, data: bytes) -> bytes:
+        if self.target_format() != 'webp':
+            return data
+        output = io.BytesIO()
+        Image.open(io.BytesIO(data)).save(output, format="WEBP", quality=int(self.settings['quality']))
+        return output.getvalue()
+
+    def _write(self, data: bytes, path: Path):
+        data = self._encode(data)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        with self._lock:
+            # 同名截图被覆盖时按最新写入计
+            self.total_bytes -= self._files.pop(path, 0)
+            self._files[path] = len(data)
+            self.total_bytes += len(data)
+            self.saved += 1
+            evict = []
+            while self.total_bytes > self.budget and len(self._files) > 1:
+                old_path, size = self._files.popitem(last=False)
+                self.total_bytes -= size
+                evict.append(old_path)
+        for old_path in evict:
+            try:
+                old_path.unlink()
+                self.evicted += 1
+            except OSError:
+                pass
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    break
+                data, path = job[1]
+                self._write(data, path)
+            except Exception:
+                pass
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """等待已入队的截图全部写入磁盘"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """写完剩余截图（进程退出时自动调用）"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout=10)
+
+    def stats(self) -> dict:
+        return {'saved': self.saved, 'skipped': self.skipped, 'evicted': self.evicted,
+                'total_mb': round(self.total_bytes / 1024 / 1024, 1)}
+
 
 class ScreenshotHelper:
     """截图助手类"""
-    
+
     def __init__(self, page: Page):
         self.page = page
-        self.screenshot_dir = Path("screenshots")
+        self.writer = ScreenshotWriter()
+        self.screenshot_dir = Path(self.writer.settings['dir'])
         self.screenshot_dir.mkdir(exist_ok=True)
-        
+
         # 简单的日志记录
         try:
             from utils.logger import Logger
@@ -18,23 +188,31 @@ class ScreenshotHelper:
         except:
             import logging
             self.logger = logging.getLogger("screenshot")
-    
-    def take_screenshot(self, name: str = None):
-        """截图"""
+
+    def _save(self, data: bytes, name: str, label: str = "截图"):
+        path, written = self.writer.save(data, self.screenshot_dir, name)
+        if written:
+            self.logger.info(f"{label}保存: {path}")
+        else:
+            self.logger.info(f"{label}与上一张相同，跳过保存: {path}")
+        record_artifact(path)
+        return str(path)
+
+    def take_screenshot(self, name: str = None, full_page: bool = None):
+        """截图（默认只截可视区域，full_page=True 时截整页）"""
         try:
             if name is None:
                 name = f"screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]}"
-            
-            screenshot_path = self.screenshot_dir / f"{name}.png"
-            self.page.screenshot(path=str(screenshot_path), full_page=True)
-            
-            self.logger.info(f"截图保存: {screenshot_path}")
-            return str(screenshot_path)
-            
+
+            if full_page is None:
+                full_page = self.writer.settings['full_page']
+            data = self.page.screenshot(full_page=full_page, **self.writer.capture_options())
+            return self._save(data, name)
+
         except Exception as e:
             self.logger.error(f"截图失败: {e}")
             return None
-    
+
     def take_element_screenshot(self, selector: str, name: str = None):
         """元素截图"""
         try:
@@ -42,16 +220,13 @@ class ScreenshotHelper:
             if not element:
                 self.logger.error(f"元素不存在: {selector}")
                 return None
-            
+
             if name is None:
                 name = f"element_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]}"
-            
-            screenshot_path = self.screenshot_dir / f"{name}.png"
-            element.screenshot(path=str(screenshot_path))
-            
-            self.logger.info(f"元素截图保存: {screenshot_path}")
-            return str(screenshot_path)
-            
+
+            data = element.screenshot(**self.writer.capture_options())
+            return self._save(data, name, "元素截图")
+
         except Exception as e:
             self.logger.error(f"元素截图失败: {e}")
-            return None
\ No newline at end of file
+            return None
@@ -0,0 +1,166 @@
+# 登录状态持久化 - 跨 pytest 进程复用 sess_key，失效时才走UI登录
+import json
+import os
+import time
+from pathlib import Path
+from utils.logger import Logger
+from utils.router_api import RouterApiClient, RouterApiError
+from utils.yaml_reader import YamlReader
+
+# 登录状态默认保存目录
+AUTH_DIR = Path(__file__).parent.parent / "reports" / ".auth"
+
+
+class SessionStore:
+    """按路由器地址保存 Playwright storage state
+
+    - save(): 登录成功后保存 Cookie（sess_key/username/login）到磁盘
+    - load_valid(): 读取已保存的状态，并用一次 show 接口调用确认会话仍有效
+    - 锁文件保证并行 worker 中只有一个执行UI登录
+    """
+
+    def __init__(self, host: str = None, auth_dir: Path = None):
+        self.logger = Logger().get_logger()
+        cfg = YamlReader().read_yaml("config/test_config.yaml") or {}
+        if host is None:
+            host = cfg.get("router", {}).get("ip", "10.66.0.40")
+        session_cfg = cfg.get("session") or {}
+        self.host = host
+        self.enabled = session_cfg.get("persist_login", True)
+        self.max_age = session_cfg.get("max_age_hours", 12) * 3600
+
+        self.auth_dir = Path(auth_dir) if auth_dir else AUTH_DIR
+        self.auth_dir.mkdir(parents=True, exist_ok=True)
+        safe_host = host.replace(":", "_").replace("/", "_")
+        self.state_file = self.auth_dir / f"login_state_{safe_host}.json"
+        self.lock_file = self.auth_dir / f"login_state_{safe_host}.lock"
+
+    # ------------------------------------------------------------------
+    # 读写
+    # ------------------------------------------------------------------
+    def load(self):
+        """读取未过期的登录状态，不存在或过期返回None"""
+        if not self.enabled or not self.state_file.exists():
+            return None
+        if time.time() - self.state_file.stat().st_mtime > self.max_age:
+            self.logger.info("已保存的登录状态超过有效期，需要重新登录")
+            return None
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"读取登录状态失败: {e}")
+            return None
+
+    def save(self, context):
+        """保存浏览器上下文的登录状态（先写临时文件再替换，避免读到半个文件）"""
+        if not self.enabled:
+            return None
+        tmp_file = self.state_file.with_suffix(".tmp")
+        context.storage_state(path=str(tmp_file))
+        os.replace(tmp_file, self.state_file)
+        self.logger.info(f"登录状态已保存: {self.state_file}")
+        return self.state_file
+
+    def clear(self):
+        """删除已保存的登录状态"""
+        try:
+            self.state_file.unlink()
+        except OSError:
+            pass
+
+    def is_valid(self, state) -> bool:
+        """用一次 show 接口调用确认 Cookie 中的会话仍然有效"""
+        cookies = (state or {}).get("cookies") or []
+        if not any(c.get("name") == "sess_key" for c in cookies):
+            return False
+        client = RouterApiClient(host=self.host, cookies=cookies, timeout=5)
+        try:
+            client.call("vlan", "show", {"TYPE": "total", "limit": "0,1"})
+            return True
+        except RouterApiError as e:
+            self.logger.info(f"已保存的登录状态已失效: {e}")
+            return False
+        finally:
+            client.close()
+
+    def load_valid(self):
+        """读取并校验登录状态，有效时返回 storage state，否则返回None"""
+        state = self.load()
+        if state and self.is_valid(state):
+            return state
+        return None
+
+    def api_client(self, username: str = None, password: str = None, timeout: float = 10):
+        """返回带有效会话的接口客户端（不依赖 pytest），无有效状态时用无头浏览器登录一次并保存
+
+        供浸泡测试、压测等脚本使用。
+        """
+        state = self.load_valid()
+        if state is None:
+            state = self._login_headless(username, password)
+        return RouterApiClient(host=self.host, cookies=state.get("cookies", []), timeout=timeout)
+
+    def login_cookies(self, username: str = None, password: str = None, fresh: bool = False) -> dict:
+        """返回 {name: value} 形式的会话Cookie
+
+        fresh=True 时总是用无头浏览器重新登录一次且不覆盖已保存的状态，用于压测中每个虚拟用户持有独立会话。
+        """
+        state = None if fresh else self.load_valid()
+        if state is None:
+            state = self._login_headless(username, password, save=not fresh)
+        return {c["name"]: c["value"] for c in state.get("cookies", [])}
+
+    def _login_headless(self, username: str = None, password: str = None, save: bool = True):
+        from playwright.sync_api import sync_playwright
+        from pages.login_page import LoginPage
+
+        router_cfg = (YamlReader().read_yaml("config/test_config.yaml") or {}).get("router", {})
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            try:
+                context = browser.new_context()
+                login_page = LoginPage(context.new_page())
+                login_page.login_url = f"http://{self.host}/login#/login"
+                if not login_page.login(username or router_cfg.get("username", "admin"),
+                                        password or router_cfg.get("password", "admin123")):
+                    raise RouterApiError("login", "ui", "无头浏览器登录失败")
+                state = context.storage_state()
+                if save and self.enabled:
+                    self.save(context)
+                return state
+            finally:
+                browser.close()
+
+    # ------------------------------------------------------------------
+    # 并行登录锁
+    # ------------------------------------------------------------------
+    def acquire_lock(self, stale_after: float = 120) -> bool:
+        """抢占登录锁，锁文件超过 stale_after 秒视为持有者已退出"""
+        try:
+            if time.time() - self.lock_file.stat().st_mtime > stale_after:
+                self.lock_file.unlink()
+        except OSError:
+            pass
+        try:
+            fd = os.open(str(self.lock_file), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.write(fd, str(os.getpid()).encode())
+            os.close(fd)
+            return True
+        except FileExistsError:
+            return False
+
+    def release_lock(self):
+        try:
+            self.lock_file.unlink()
+        except OSError:
+            pass
+
+    def wait_for_login(self, timeout: float = 120):
+        """等待持锁进程完成登录，返回新的有效状态，超时返回None"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if not self.lock_file.exists():
+                return self.load_valid()
+            time.sleep(0.5)
+        return None
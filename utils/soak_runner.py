@@ -0,0 +1,255 @@
+# 浸泡测试 - 持续执行 VLAN 增删，按时间窗口记录接口耗时和错误率，用于发现固件变慢或泄漏
+#
+# 用法（在项目根目录执行）:
+#   python -m utils.soak_runner --minutes 60 --window 60 --ops vlan_churn
+# 参数默认值取自 config/test_config.yaml 的 soak 段；时间序列写入 reports/outputs/soak_<ts>.jsonl
+import argparse
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from utils.cycle_results import percentile
+from utils.logger import Logger
+from utils.router_api import RouterApiClient, RouterApiError
+from utils.yaml_reader import YamlReader
+
+DEFAULT_SOAK_SETTINGS = {
+    'duration_minutes': 60,
+    'window_seconds': 60,
+    'operations': ['vlan_churn'],
+    'vlan_id_start': 3500,
+    'vlan_id_count': 100,
+    'pause_ms': 0,
+    'health_calls': [],
+}
+
+
+def soak_settings(overrides: dict = None) -> dict:
+    cfg = YamlReader().read_yaml("config/test_config.yaml") or {}
+    settings = dict(DEFAULT_SOAK_SETTINGS)
+    settings.update(cfg.get('soak') or {})
+    settings.update({k: v for k, v in (overrides or {}).items() if v is not None})
+    return settings
+
+
+class SoakWindow:
+    """单个时间窗口内各接口的耗时样本和错误计数"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.start = time.time()
+        self.samples = {}
+        self.errors = {}
+        self.result_codes = {}
+
+    def record(self, op: str, latency_ms: float, ok: bool, result=None):
+        self.samples.setdefault(op, []).append(latency_ms)
+        if not ok:
+            self.errors[op] = self.errors.get(op, 0) + 1
+            key = f"{op}:{result}"
+            self.result_codes[key] = self.result_codes.get(key, 0) + 1
+
+    def to_record(self, started_at: float, health: dict) -> dict:
+        ops = {}
+        for op, samples in self.samples.items():
+            errors = self.errors.get(op, 0)
+            ops[op] = {
+                'count': len(samples),
+                'errors': errors,
+                'error_rate': round(errors / len(samples) * 100, 2),
+                'p50_ms': round(percentile(samples, 50), 1),
+                'p95_ms': round(percentile(samples, 95), 1),
+                'max_ms': round(max(samples), 1),
+                'mean_ms': round(sum(samples) / len(samples), 1),
+            }
+        return {
+            'window': self.index,
+            'time': datetime.fromtimestamp(self.start).strftime('%Y-%m-%d %H:%M:%S'),
+            'elapsed_s': round(self.start - started_at, 1),
+            'duration_s': round(time.time() - self.start, 1),
+            'ops': ops,
+            'result_codes': self.result_codes,
+            'health': health,
+        }
+
+
+class SoakRunner:
+    """在给定时长内循环执行选定的增删操作
+
+    - vlan_churn: 新增VLAN -> 按ID查询 -> 删除
+    每次 /Action/call 的耗时和结果按 "func_name.action" 计入当前窗口，
+    窗口结束时连同设备状态采样写入时间序列文件一行。
+    """
+
+    OPERATIONS = ('vlan_churn',)
+    # 每个窗口采样行数的表（残留数据持续增长说明删除未生效）
+    HEALTH_TABLES = ('vlan',)
+
+    def __init__(self, client: RouterApiClient, settings: dict = None, output_file=None,
+                 log_callback=None, stop_check=None):
+        self.logger = Logger().get_logger()
+        self.client = client
+        self.settings = settings or soak_settings()
+        self.log_callback = log_callback
+        self.stop_check = stop_check or (lambda: False)
+        self.output_file = Path(output_file or f"reports/outputs/soak_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+        self.output_file.parent.mkdir(parents=True, exist_ok=True)
+
+        unknown = [op for op in self.settings['operations'] if op not in self.OPERATIONS]
+        if unknown:
+            raise ValueError(f"不支持的浸泡操作: {unknown}")
+
+        self._window = None
+        self._iteration = 0
+        self._original_call = client.call
+        client.call = self._timed_call
+
+    def _log(self, message: str):
+        self.logger.info(message)
+        if self.log_callback:
+            self.log_callback(message)
+
+    def _timed_call(self, func_name: str, action: str, param: dict = None, **kwargs):
+        """记录每次接口调用的耗时和结果码"""
+        start = time.perf_counter()
+        ok, result = True, None
+        try:
+            return self._original_call(func_name, action, param, **kwargs)
+        except RouterApiError as e:
+            ok, result = False, e.result
+            raise
+        finally:
+            if self._window is not None:
+                self._window.record(f"{func_name}.{action}", (time.perf_counter() - start) * 1000, ok, result)
+
+    # ------------------------------------------------------------------
+    # 操作
+    # ------------------------------------------------------------------
+    def _next_vlan_id(self) -> int:
+        return self.settings['vlan_id_start'] + self._iteration % self.settings['vlan_id_count']
+
+    def op_vlan_churn(self):
+        vlan_id = self._next_vlan_id()
+        self.client.add_vlan(vlan_id, f"soak{vlan_id}", f"10.{vlan_id // 256}.{vlan_id % 256}.1", comment="soak")
+        row = self.client.find_vlan(vlan_id)
+        if row is None:
+            raise RouterApiError("vlan", "show", f"新增后未查询到VLAN{vlan_id}")
+        self.client.delete_vlans([row["id"]])
+
+    # ------------------------------------------------------------------
+    # 设备状态采样
+    # ------------------------------------------------------------------
+    def sample_health(self) -> dict:
+        """采样各表行数和探测调用耗时；health_calls 中配置的接口记录其 Data 中的数值字段"""
+        health = {}
+        for func_name in self.HEALTH_TABLES:
+            start = time.perf_counter()
+            try:
+                data = self._original_call(func_name, "show", {"TYPE": "total", "limit": "0,1"}).get("Data") or {}
+                health[f"{func_name}_rows"] = int(data.get("total") or 0)
+            except RouterApiError:
+                health[f"{func_name}_rows"] = None
+            health[f"{func_name}_probe_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+        for call in self.settings.get('health_calls') or []:
+            name = call.get('name') or f"{call.get('func_name')}.{call.get('action')}"
+            try:
+                data = self._original_call(call['func_name'], call['action'], call.get('param') or {}).get("Data") or {}
+            except (RouterApiError, KeyError):
+                health[name] = None
+                continue
+            if isinstance(data, dict):
+                health[name] = {k: v for k, v in data.items() if isinstance(v, (int, float))}
+        return health
+
+    # ------------------------------------------------------------------
+    def _close_window(self, out, started_at: float) -> dict:
+        record = self._window.to_record(started_at, self.sample_health())
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+        summary = ", ".join(f"{op} p95={s['p95_ms']}ms 错误率={s['error_rate']}%" for op, s in record['ops'].items())
+        self._log(f"⏱️ 浸泡窗口{record['window']} ({record['elapsed_s']:.0f}s): {summary or '无调用'}")
+        return record
+
+    def cleanup(self):
+        """删除浸泡过程中可能残留的数据"""
+        try:
+            start = self.settings['vlan_id_start']
+            self.client.delete_vlans_by_vlan_id(range(start, start + self.settings['vlan_id_count']))
+        except RouterApiError as e:
+            self.logger.warning(f"清理浸泡测试数据失败: {e}")
+
+    def run(self) -> dict:
+        """执行浸泡测试，返回 {'output_file', 'windows', 'iterations', 'errors', 'stopped'}"""
+        settings = self.settings
+        duration = settings['duration_minutes'] * 60
+        window_seconds = settings['window_seconds']
+        operations = [getattr(self, f"op_{name}") for name in settings['operations']]
+        self._log(f"🔁 开始浸泡测试: {', '.join(settings['operations'])}，时长 {settings['duration_minutes']} 分钟，"
+                  f"窗口 {window_seconds} 秒")
+
+        self.cleanup()
+        started_at = time.time()
+        windows, errors, stopped = 0, 0, False
+        try:
+            with open(self.output_file, "w", encoding="utf-8") as out:
+                self._window = SoakWindow(0)
+                while time.time() - started_at < duration:
+                    if self.stop_check():
+                        stopped = True
+                        break
+                    for operation in operations:
+                        try:
+                            operation()
+                        except RouterApiError as e:
+                            errors += 1
+                            self.logger.debug(f"浸泡操作失败: {e}")
+                    self._iteration += 1
+                    if settings['pause_ms']:
+                        time.sleep(settings['pause_ms'] / 1000)
+                    if time.time() - self._window.start >= window_seconds:
+                        self._close_window(out, started_at)
+                        windows += 1
+                        self._window = SoakWindow(windows)
+                if self._window.samples:
+                    self._close_window(out, started_at)
+                    windows += 1
+        finally:
+            self._window = None
+            self.client.call = self._original_call
+        self.cleanup()
+        self._log(f"✅ 浸泡测试结束: {self._iteration} 轮操作，{errors} 次失败，时间序列: {self.output_file}")
+        return {'output_file': str(self.output_file), 'windows': windows, 'iterations': self._iteration,
+                'errors': errors, 'stopped': stopped}
+
+
+def load_time_series(path):
+    """读取浸泡时间序列文件"""
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="路由器浸泡（长时间稳定性）测试")
+    parser.add_argument("--minutes", type=float, help="持续时长(分钟)")
+    parser.add_argument("--window", type=int, help="统计窗口(秒)")
+    parser.add_argument("--ops", nargs="+", choices=SoakRunner.OPERATIONS, help="执行的操作")
+    args = parser.parse_args()
+
+    from utils.test_runner import TestRunner
+    result = TestRunner().run_soak({'soak': {'duration_minutes': args.minutes, 'window_seconds': args.window,
+                                             'operations': args.ops}}, log_callback=print)
+    return 0 if result.get('success') else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
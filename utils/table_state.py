@@ -0,0 +1,120 @@
+# 表格状态模型 - 快照一次表格，记录已知变更，只校验受影响的行并给出结构化差异
+class TableState:
+    """页面表格的期望状态
+
+    用法:
+        state = TableState(rows, key='id')        # 快照（一次整表读取）
+        state.expect_add({'id': '36', 'name': 'vlan36'})
+        state.expect_edit('36', {'comment': '新备注'})
+        state.expect_delete('201')                # 全部删除用 expect_clear()
+        diff = state.diff(actual_rows)            # actual_rows 只需包含 state.pending 中的行
+        state.is_clean(diff) / state.format_diff(diff)
+
+    normalizers 可为字段指定比较前的标准化函数（如地址列表去备注、MAC统一大小写）。
+    """
+
+    def __init__(self, rows=None, key: str = 'id', normalizers: dict = None):
+        self.key = key
+        self.normalizers = normalizers or {}
+        self.rows = {}
+        self.pending = set()
+        if rows is not None:
+            self.snapshot(rows)
+
+    def snapshot(self, rows):
+        """以实际读取的行重置期望状态"""
+        self.rows = {str(row[self.key]): dict(row) for row in rows if row.get(self.key)}
+        self.pending.clear()
+        return self
+
+    # ------------------------------------------------------------------
+    # 已知变更
+    # ------------------------------------------------------------------
+    def expect_add(self, row: dict):
+        key = str(row[self.key])
+        self.rows[key] = dict(row)
+        self.pending.add(key)
+
+    def expect_edit(self, key, changes: dict):
+        key = str(key)
+        new_key = str(changes.get(self.key, key))
+        row = self.rows.pop(key, {self.key: key})
+        row.update(changes)
+        self.rows[new_key] = row
+        self.pending.update({key, new_key})
+
+    def expect_delete(self, key):
+        key = str(key)
+        self.rows.pop(key, None)
+        self.pending.add(key)
+
+    def expect_clear(self):
+        """全部删除：快照中的所有行都应消失"""
+        self.pending.update(self.rows)
+        self.rows.clear()
+
+    def expected(self, key):
+        return self.rows.get(str(key))
+
+    # ------------------------------------------------------------------
+    # 校验
+    # ------------------------------------------------------------------
+    def _normalize(self, field, value):
+        fn = self.normalizers.get(field)
+        if fn is not None:
+            return fn(value)
+        return "" if value is None else str(value).strip()
+
+    def diff(self, actual_rows, keys=None) -> dict:
+        """对比受影响行的期望与实际
+
+        Args:
+            actual_rows: 实际行列表或 {key: row} 字典
+            keys: 要校验的行，默认为所有待校验的变更行
+        Returns:
+            {'missing': [...], 'unexpected': [...], 'mismatched': {key: {field: {'expected', 'actual'}}}}
+        """
+        if not isinstance(actual_rows, dict):
+            actual_rows = {str(row.get(self.key)): row for row in actual_rows}
+        keys = self.pending if keys is None else {str(k) for k in keys}
+
+        diff = {'missing': [], 'unexpected': [], 'mismatched': {}}
+        for key in sorted(keys):
+            expected, actual = self.rows.get(key), actual_rows.get(key)
+            if expected is None:
+                if actual is not None:
+                    diff['unexpected'].append(key)
+                continue
+            if actual is None:
+                diff['missing'].append(key)
+                continue
+            fields = {}
+            for field, value in expected.items():
+                if self._normalize(field, value) != self._normalize(field, actual.get(field)):
+                    fields[field] = {'expected': value, 'actual': actual.get(field)}
+            if fields:
+                diff['mismatched'][key] = fields
+        return diff
+
+    @staticmethod
+    def is_clean(diff: dict) -> bool:
+        return not (diff['missing'] or diff['unexpected'] or diff['mismatched'])
+
+    def commit(self, keys=None):
+        """校验通过后清除待校验标记"""
+        if keys is None:
+            self.pending.clear()
+        else:
+            self.pending.difference_update(str(k) for k in keys)
+
+    @staticmethod
+    def format_diff(diff: dict) -> str:
+        lines = []
+        if diff['missing']:
+            lines.append(f"缺少行: {', '.join(diff['missing'])}")
+        if diff['unexpected']:
+            lines.append(f"应已删除但仍存在: {', '.join(diff['unexpected'])}")
+        for key, fields in diff['mismatched'].items():
+            detail = ", ".join(f"{f}: 期望 {v['expected']!r}, 实际 {v['actual']!r}" for f, v in fields.items())
+            lines.append(f"行 {key} 字段不一致 - {detail}")
+        return "\n".join(lines) if lines else "无差异"
@@ -8,11 +8,21 @@ import threading
 import queue
 import time
 import re
+from collections import deque
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 from utils.logger import Logger
 from utils.yaml_reader import YamlReader
 from utils.report_generator import ReportGenerator
+from utils.cycle_plugin import CYCLE_START_MARKER, CYCLE_END_MARKER
+from utils.result_channel import ResultCollector, ResultChannelReader
+from utils.cycle_results import CycleResultStore
+from utils.results_db import ResultsDB, results_db_settings
+from utils.session_store import SessionStore
+from utils.soak_runner import SoakRunner, soak_settings
+
+# 每轮只在内存中保留最后若干行输出（用于通道不可用时解析统计），完整输出写入落盘文件
+OUTPUT_TAIL_LINES = 300
 
 class TestRunner:
     """测试执行器 - 优化版"""
@@ -24,6 +34,11 @@ class TestRunner:
         self._stop_requested = False
         self._current_process = None
         self._show_detail_logs = True  # 默认显示详细日志
+        self._output_spool = None  # 本次执行的完整输出文件
+        self._results_store = None  # 多轮结果存储（每次用例执行一行）
+        self._current_cycle = 1
+        self._results_db = None  # 历史结果库（SQLite）
+        self._run_id = None
         
     def set_detail_logs(self, show_detail):
         """设置是否显示详细日志"""
@@ -65,9 +80,12 @@ class TestRunner:
             
             end_time = datetime.now()
             duration = end_time - start_time
+            for events_file in results.get('events_files', []):
+                self._add_run_artifact("events", events_file)
             
             # 生成中文测试报告
             chinese_report_file = None
+            aggregate_report_file = None
             try:
                 if log_callback:
                     log_callback("📊 正在生成中文测试报告...")
@@ -82,18 +100,32 @@ class TestRunner:
                         'total_duration': str(duration).split('.')[0],
                         'test_details': results.get('test_details', []),
                         'summary': results.get('summary', ''),
-                        'raw_output': results.get('raw_output', '')
+                        'output_file': results.get('output_file'),
+                        'events_files': results.get('events_files', [])
                     },
                     test_config=test_config
                 )
                 
                 if chinese_report_file and log_callback:
                     log_callback(f"✅ 中文测试报告生成成功：{chinese_report_file}")
+                self._add_run_artifact("report", chinese_report_file)
+                
+                # 多轮执行时额外生成跨轮汇总报告
+                if test_config.get('cycles', 1) > 1 and results.get('results_store'):
+                    aggregate_report_file = report_generator.generate_aggregate_report(
+                        results['results_store'], test_config=test_config
+                    )
+                    if aggregate_report_file and log_callback:
+                        log_callback(f"✅ 多轮汇总报告生成成功：{aggregate_report_file}")
+                    self._add_run_artifact("aggregate_report", aggregate_report_file)
                     
             except Exception as e:
                 if log_callback:
                     log_callback(f"❌ 生成中文报告失败: {e}")
             
+            results_db = self._finish_results_db(results.get('statistics', {}), duration.total_seconds(),
+                                                 "stopped" if self._stop_requested else "finished")
+            
             # 整理结果
             final_results = {
                 'success': results.get('success', False),
@@ -106,7 +138,10 @@ class TestRunner:
                 'summary': results.get('summary', ''),
                 'report_file': chinese_report_file or report_file,
                 'pytest_report_file': report_file,
-                'raw_output': results.get('raw_output', '')
+                'aggregate_report_file': aggregate_report_file,
+                'results_store': results.get('results_store'),
+                'results_db': results_db,
+                'output_file': results.get('output_file')
             }
             
             if log_callback:
@@ -118,6 +153,7 @@ class TestRunner:
             self.logger.error(f"测试执行失败: {e}")
             if log_callback:
                 log_callback(f"❌ 测试执行失败: {e}")
+            self._finish_results_db(None, (datetime.now() - start_time).total_seconds(), "error")
             return {
                 'success': False,
                 'message': f'测试执行失败: {e}',
@@ -128,13 +164,73 @@ class TestRunner:
                 'test_details': [],
                 'summary': f'执行失败: {e}',
                 'report_file': None,
-                'raw_output': ''
+                'output_file': None
             }
     
+    def run_soak(self, test_config, progress_callback=None, log_callback=None):
+        """浸泡测试模式：在设定时长内持续执行 VLAN/分组增删，按时间窗口记录接口耗时、错误率和设备状态"""
+        self._stop_requested = False
+        start_time = datetime.now()
+        settings = soak_settings(test_config.get('soak'))
+        router = test_config.get('router') or {}
+        
+        try:
+            if log_callback:
+                log_callback("🔑 获取接口会话...")
+            client = SessionStore(host=router.get('ip')).api_client(router.get('username'), router.get('password'))
+            
+            duration = settings['duration_minutes'] * 60
+            def on_log(message):
+                if log_callback:
+                    log_callback(message)
+                if progress_callback:
+                    elapsed = (datetime.now() - start_time).total_seconds()
+                    progress_callback(f"执行进度: {min(int(elapsed / duration * 100), 99) if duration else 99}%")
+            
+            try:
+                result = SoakRunner(client, settings, log_callback=on_log,
+                                    stop_check=lambda: self._stop_requested).run()
+            finally:
+                client.close()
+            
+            report_file = ReportGenerator().generate_soak_report(result['output_file'], settings, test_config)
+            if report_file and log_callback:
+                log_callback(f"✅ 浸泡测试报告生成成功：{report_file}")
+            if progress_callback:
+                progress_callback("执行进度: 100%")
+            
+            end_time = datetime.now()
+            return {
+                'success': result['errors'] == 0,
+                'message': f"浸泡测试完成，{result['iterations']} 轮操作，{result['errors']} 次失败"
+                           + ("（已手动停止）" if result['stopped'] else ""),
+                'start_time': start_time.strftime('%Y-%m-%d %H:%M:%S'),
+                'end_time': end_time.strftime('%Y-%m-%d %H:%M:%S'),
+                'total_duration': str(end_time - start_time).split('.')[0],
+                'report_file': report_file,
+                'time_series_file': result['output_file'],
+                'soak': result,
+            }
+        except Exception as e:
+            self.logger.error(f"浸泡测试执行失败: {e}")
+            if log_callback:
+                log_callback(f"❌ 浸泡测试执行失败: {e}")
+            return {
+                'success': False,
+                'message': f'浸泡测试执行失败: {e}',
+                'start_time': start_time.strftime('%Y-%m-%d %H:%M:%S'),
+                'end_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'report_file': None,
+                'time_series_file': None,
+            }
+        
     def _update_test_config(self, test_config):
         """更新测试配置文件"""
         try:
-            config_data = {
+            # 保留配置文件中GUI不管理的节点（如 waits 等待层配置）
+            config_data = self.yaml_reader.read_yaml("config/test_config.yaml") or {}
+            existing_settings = config_data.get('test_settings', {})
+            config_data.update({
                 'router': test_config['router'],
                 'browser': {
                     'headless': test_config['browser']['headless'],
@@ -145,8 +241,9 @@ class TestRunner:
                 'test_settings': {
                     'screenshot_on_failure': test_config['browser']['screenshot_on_failure'],
                     'video_on_failure': test_config['browser']['video_on_failure'],
-                    'parallel_workers': 1,
-                    'retry_failed': 1
+                    'parallel_workers': existing_settings.get('parallel_workers', 1),
+                    'retry_failed': existing_settings.get('retry_failed', 1),
+                    'run_mode': existing_settings.get('run_mode', 'in_process')
                 },
                 'report': {
                     'title': '路由器自动化测试报告',
@@ -154,7 +251,7 @@ class TestRunner:
                     'include_screenshots': True,
                     'include_logs': True
                 }
-            }
+            })
             
             self.yaml_reader.write_yaml("config/test_config.yaml", config_data)
             self.logger.info("测试配置更新成功")
@@ -181,6 +278,11 @@ class TestRunner:
             # 移除重复的日志配置
         ]
         
+        # 并行执行：每个 worker 独立浏览器上下文，同一测试类固定在同一 worker
+        workers = self._get_parallel_workers(test_config)
+        if workers > 1:
+            pytest_args.extend(["-n", str(workers), "--dist", "loadgroup"])
+        
         # 根据测试功能选择测试文件（支持多选）
         selected_functions = test_config.get('test_function', ['全部功能'])
         if isinstance(selected_functions, str):
@@ -216,35 +318,71 @@ class TestRunner:
         
         return pytest_args, report_file
     
+    def _get_parallel_workers(self, test_config):
+        """读取并行 worker 数，未安装 pytest-xdist 时退回串行"""
+        settings = test_config.get('test_settings') or {}
+        workers = settings.get('parallel_workers')
+        if workers is None:
+            config_data = self.yaml_reader.read_yaml("config/test_config.yaml") or {}
+            workers = config_data.get('test_settings', {}).get('parallel_workers', 1)
+        try:
+            workers = int(workers)
+        except (TypeError, ValueError):
+            workers = 1
+        if workers > 1:
+            try:
+                import xdist  # noqa: F401
+            except ImportError:
+                self.logger.warning("未安装 pytest-xdist，并行执行退回串行模式")
+                return 1
+        return max(workers, 1)
+    
     def _execute_tests(self, pytest_args, test_config, progress_callback, log_callback, result_callback, report_file):
         """执行测试"""
         cycles = test_config.get('cycles', 1)
         all_results = []
         total_stats = {'total': 0, 'passed': 0, 'failed': 0, 'skipped': 0, 'error': 0}
-        combined_output = []
         
-        for cycle in range(cycles):
-            if self._stop_requested:
-                break
-                
-            if log_callback:
-                log_callback(f"🔄 开始第 {cycle + 1}/{cycles} 轮测试")
-            
-            if progress_callback:
-                progress = int((cycle / cycles) * 90)
-                progress_callback(f"执行进度: {progress}%")
-            
-            # 执行单轮测试
-            cycle_result = self._run_single_cycle(pytest_args, cycle + 1, log_callback, result_callback)
-            all_results.append(cycle_result)
-            
-            # 收集输出
-            cycle_output = cycle_result.get('output', '')
-            if cycle_output:
-                combined_output.append(f"=== 第{cycle + 1}轮测试输出 ===")
-                combined_output.append(cycle_output)
-                combined_output.append("")
-            
+        # 全部轮次的原始输出逐行写入文件，报告生成时按流读取，不在内存中拼接
+        output_file = self.project_root / f"reports/outputs/output_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        self._output_spool = open(output_file, "w", encoding="utf-8")
+        results_store = self.project_root / f"reports/outputs/cycle_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        self._results_store = CycleResultStore(results_store)
+        self._current_cycle = 1
+        self._open_results_db(test_config, log_callback)
+        
+        try:
+            if cycles > 1 and self._use_in_process_cycles(test_config):
+                # 同一pytest进程内执行全部轮次，浏览器和登录会话保持
+                all_results = self._run_cycles_in_process(pytest_args, cycles, progress_callback, log_callback, result_callback)
+            else:
+                for cycle in range(cycles):
+                    if self._stop_requested:
+                        break
+                        
+                    if log_callback:
+                        log_callback(f"🔄 开始第 {cycle + 1}/{cycles} 轮测试")
+                    
+                    if progress_callback:
+                        progress = int((cycle / cycles) * 90)
+                        progress_callback(f"执行进度: {progress}%")
+                    
+                    # 执行单轮测试
+                    self._output_spool.write(f"=== 第{cycle + 1}轮测试输出 ===\n")
+                    self._current_cycle = cycle + 1
+                    all_results.append(self._run_single_cycle(pytest_args, cycle + 1, log_callback, result_callback))
+        finally:
+            self._output_spool.close()
+            self._output_spool = None
+            self._results_store.close()
+            self._results_store = None
+        
+        self._add_run_artifact("pytest_report", report_file)
+        self._add_run_artifact("output", output_file)
+        self._add_run_artifact("cycle_results", results_store)
+        
+        for cycle_result in all_results:
             # 累计统计
             cycle_stats = cycle_result.get('statistics', {})
             for key in total_stats:
@@ -279,7 +417,9 @@ class TestRunner:
             'test_details': all_results,
             'summary': self._generate_summary(all_results, total_stats),
             'report_file': report_file,
-            'raw_output': '\n'.join(combined_output)
+            'output_file': str(output_file),
+            'results_store': str(results_store),
+            'events_files': list(dict.fromkeys(r['events_file'] for r in all_results if r.get('events_file')))
         }
     
     def _decode_with_fallback(self, data_bytes):
@@ -306,52 +446,274 @@ class TestRunner:
             # 最后的保险措施
             return str(data_bytes, errors='ignore')
     
+    def _stream_pytest(self, pytest_args, log_callback, line_handler=None, result_callback=None, event_handler=None):
+        """启动pytest子进程并实时读取输出，返回 (退出码, 最后若干行输出, 事件收集器)
+        
+        用例事件通过结果通道(JSON Lines)传递，统计和步骤日志直接取自事件；
+        标准输出仅用于展示pytest自身信息，并作为通道不可用时的备用解析来源。
+        完整输出逐行写入本次执行的输出文件，内存中只保留最后 OUTPUT_TAIL_LINES 行。
+        line_handler 逐行处理标准输出（返回 True 表示已消费）；event_handler 在通道读取线程中逐条处理事件。
+        """
+        events_file = f"reports/outputs/events_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.jsonl"
+        # 只需要统计，用例记录交给报告生成器从事件文件流式读取
+        collector = ResultCollector(on_test=lambda test: None)
+        collector.events_file = events_file
+        
+        def on_event(event):
+            collector.handle(event)
+            self._record_result(event)
+            self._dispatch_event(event, log_callback, result_callback)
+            if event_handler:
+                event_handler(event)
+        
+        reader = ResultChannelReader(str(self.project_root / events_file), on_event)
+        reader.start()
+        
+        # 使用实时输出的方式运行pytest
+        cmd = [sys.executable, "-m", "pytest", "-p", "utils.result_channel",
+               f"--result-channel={events_file}"] + pytest_args
+        
+        # 启动进程 - 使用兼容的编码处理
+        self._current_process = subprocess.Popen(
+            cmd,
+            cwd=self.project_root,
+            # 结构化日志的 cycle 字段（同进程多轮时由 cycle_plugin 按轮设置）
+            env=dict(os.environ, ROUTER_TEST_CYCLE=str(self._current_cycle)),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=False,  # 使用二进制模式，稍后手动处理编码
+            bufsize=1
+        )
+        
+        # 实时读取输出
+        output_lines = deque(maxlen=OUTPUT_TAIL_LINES)
+        
+        while True:
+            if self._stop_requested:
+                self._current_process.terminate()
+                break
+                
+            output_bytes = self._current_process.stdout.readline()
+            if output_bytes == b'' and self._current_process.poll() is not None:
+                break
+                
+            if output_bytes:
+                # 尝试多种编码方式解码
+                output = self._decode_with_fallback(output_bytes)
+                output = output.strip()
+                output_lines.append(output)
+                if self._output_spool is not None:
+                    self._output_spool.write(output + "\n")
+                
+                if line_handler and line_handler(output):
+                    continue
+                
+                # RouterTest 日志已通过结果通道按级别推送，不再从标准输出重复解析
+                if " - RouterTest - " in output:
+                    continue
+                
+                if log_callback and output:
+                    # 根据设置决定是否显示详细日志
+                    formatted_output = self._format_log_output(output)
+                    if formatted_output:
+                        log_callback(formatted_output)
+        
+        # 等待进程完成
+        return_code = self._current_process.wait() if not self._stop_requested else -1
+        reader.stop()
+        return return_code, list(output_lines), collector
+    
+    def _record_result(self, event):
+        """把用例结束事件写入多轮结果存储；单进程多轮模式的轮次取自 cycle_start 事件"""
+        if self._results_store is None:
+            return
+        kind = event.get('event')
+        if kind == 'cycle_start':
+            self._current_cycle = event.get('cycle', self._current_cycle)
+        elif kind == 'test_end':
+            self._results_store.record(self._current_cycle, event.get('nodeid', ''), event.get('outcome', 'error'),
+                                       event.get('duration', 0.0), event.get('message', ''))
+            if self._results_db is not None:
+                try:
+                    self._results_db.record_test(self._run_id, self._current_cycle, event)
+                except Exception as e:
+                    self.logger.warning(f"写入历史结果库失败: {e}")
+    
+    def _open_results_db(self, test_config, log_callback=None):
+        """打开历史结果库并登记本次运行（未开启或打开失败时不影响测试执行）"""
+        self._results_db = None
+        self._run_id = None
+        settings = results_db_settings()
+        if not settings['enabled']:
+            return
+        try:
+            self._results_db = ResultsDB(self.project_root / settings['path'])
+            self._run_id = self._results_db.start_run(test_config)
+        except Exception as e:
+            self._results_db = None
+            self.logger.warning(f"打开历史结果库失败: {e}")
+            if log_callback:
+                log_callback(f"⚠️ 历史结果库不可用，本次结果不入库: {e}")
+    
+    def _add_run_artifact(self, kind, path):
+        if self._results_db is None or not path:
+            return
+        try:
+            self._results_db.add_artifact(self._run_id, kind, path)
+        except Exception as e:
+            self.logger.warning(f"写入历史结果库失败: {e}")
+    
+    def _finish_results_db(self, stats, duration_s, status):
+        """补全本次运行的统计并关闭历史结果库，返回结果库路径"""
+        db, self._results_db = self._results_db, None
+        if db is None:
+            return None
+        try:
+            db.finish_run(self._run_id, stats, duration_s, status)
+            return db.path
+        except Exception as e:
+            self.logger.warning(f"写入历史结果库失败: {e}")
+            return None
+        finally:
+            db.close()
+    
+    def _dispatch_event(self, event, log_callback, result_callback):
+        """把结果通道事件转为GUI日志和结果行"""
+        kind = event.get('event')
+        if kind == 'step':
+            if log_callback:
+                log_callback(f"[执行步骤] {event.get('content', '')}")
+        elif kind == 'log':
+            if log_callback:
+                level = event.get('level', 'INFO')
+                prefix = {'WARNING': '⚠️ [日志]', 'ERROR': '❌ [日志]', 'CRITICAL': '❌ [日志]'}.get(level, '[日志]')
+                log_callback(f"{prefix} {event.get('content', '')}")
+        elif kind == 'test_end':
+            if result_callback:
+                end_time = datetime.fromtimestamp(event.get('time', time.time()))
+                duration = event.get('duration', 0.0)
+                result_callback({
+                    'test_case': event.get('name', ''),
+                    'status': event.get('outcome', 'error').upper(),
+                    'start_time': (end_time - timedelta(seconds=duration)).strftime('%H:%M:%S'),
+                    'end_time': end_time.strftime('%H:%M:%S'),
+                    'duration': f"{duration:.1f}秒",
+                    'message': event.get('message', '')
+                })
+    
+    def _use_in_process_cycles(self, test_config):
+        """多轮测试是否在同一进程内执行（test_settings.run_mode: in_process / subprocess）"""
+        settings = test_config.get('test_settings') or {}
+        run_mode = test_config.get('run_mode') or settings.get('run_mode')
+        if run_mode is None:
+            config_data = self.yaml_reader.read_yaml("config/test_config.yaml") or {}
+            run_mode = config_data.get('test_settings', {}).get('run_mode', 'in_process')
+        # 并行模式下由 xdist 调度，每轮仍使用独立进程
+        return run_mode == 'in_process' and self._get_parallel_workers(test_config) <= 1
+    
+    def _run_cycles_in_process(self, pytest_args, cycles, progress_callback, log_callback, result_callback):
+        """单个pytest进程执行全部轮次
+
+        每轮统计取自结果通道的 cycle_start / cycle_end 事件；
+        标准输出中的轮次边界标记只用于切分每轮的文本输出（报告的文本备用来源）。
+        """
+        # maxfail 改为按轮生效，与逐轮子进程模式保持一致
+        maxfail = next((int(arg.split("=", 1)[1]) for arg in pytest_args if arg.startswith("--maxfail=")), 0)
+        args = [arg for arg in pytest_args if not arg.startswith("--maxfail=")]
+        args = ["-p", "utils.cycle_plugin", f"--cycles={cycles}", f"--cycle-maxfail={maxfail}"] + args
+        
+        results = []
+        cycle_starts = {}
+        outputs = {}
+        current = {'cycle': 0, 'lines': deque(maxlen=OUTPUT_TAIL_LINES)}
+        
+        def handle_event(event):
+            kind = event.get('event')
+            if kind == 'cycle_start':
+                cycle_num = event.get('cycle', len(results) + 1)
+                cycle_starts[cycle_num] = event.get('time')
+                if log_callback:
+                    log_callback(f"🔄 开始第 {cycle_num}/{cycles} 轮测试")
+                if progress_callback:
+                    progress_callback(f"执行进度: {int(((cycle_num - 1) / cycles) * 90)}%")
+            elif kind == 'cycle_end':
+                cycle_num = event.get('cycle', len(results) + 1)
+                stats = dict(event.get('stats') or {})
+                duration = stats.pop('duration', 0)
+                passed = stats.get('failed', 0) == 0 and stats.get('error', 0) == 0
+                results.append({
+                    'cycle': cycle_num,
+                    'returncode': 0 if passed else 1,
+                    'statistics': stats,
+                    'output': ''
+                })
+                if result_callback:
+                    start_ts = cycle_starts.get(cycle_num)
+                    result_callback({
+                        'test_case': f'第{cycle_num}轮测试',
+                        'status': 'PASSED' if passed else 'FAILED',
+                        'start_time': datetime.fromtimestamp(start_ts).strftime('%H:%M:%S') if start_ts else '',
+                        'end_time': datetime.fromtimestamp(event.get('time', time.time())).strftime('%H:%M:%S'),
+                        'duration': f'{duration}秒',
+                        'message': f'用例总数: {stats.get("total", 0)}, 失败: {stats.get("failed", 0)}, '
+                                   f'错误: {stats.get("error", 0)}'
+                    })
+                if log_callback:
+                    if passed:
+                        log_callback(f"✅ 第 {cycle_num} 轮测试成功完成")
+                    else:
+                        log_callback(f"❌ 第 {cycle_num} 轮测试失败: {stats.get('failed', 0)} 失败, "
+                                     f"{stats.get('error', 0)} 错误")
+        
+        def handle_line(line):
+            # 只按标记切分每轮的文本输出，统计以通道事件为准
+            if line.startswith(CYCLE_START_MARKER):
+                current.update({'cycle': int(line[len(CYCLE_START_MARKER):].split("/")[0]),
+                                'lines': deque(maxlen=OUTPUT_TAIL_LINES)})
+                return True
+            if line.startswith(CYCLE_END_MARKER):
+                outputs[current['cycle']] = '\n'.join(current['lines'])
+                current['lines'] = deque(maxlen=OUTPUT_TAIL_LINES)
+                return True
+            current['lines'].append(line)
+            return False
+        
+        try:
+            return_code, output_lines, collector = self._stream_pytest(args, log_callback, handle_line, result_callback,
+                                                                       event_handler=handle_event)
+        except Exception as e:
+            if log_callback:
+                log_callback(f"❌ 多轮测试进程出错: {e}")
+            return_code, output_lines, collector = -1, [str(e)], None
+        
+        if not results:
+            # 进程在第一轮结束前退出（收集错误、被停止等），按整体输出统计
+            all_output = '\n'.join(output_lines)
+            results.append({
+                'cycle': 1,
+                'returncode': return_code,
+                'statistics': collector.stats if collector and collector.finished else self._parse_pytest_output(all_output),
+                'output': all_output
+            })
+        else:
+            for result in results:
+                result['output'] = outputs.get(result['cycle'], '')
+            if current['lines']:
+                # 最后一轮之后的汇总输出（失败详情、短摘要）归入最后一轮
+                results[-1]['output'] += '\n' + '\n'.join(current['lines'])
+        if collector:
+            for result in results:
+                result['events_file'] = collector.events_file
+        return results
+    
     def _run_single_cycle(self, pytest_args, cycle_num, log_callback, result_callback):
         """运行单轮测试"""
         try:
-            # 使用实时输出的方式运行pytest
-            cmd = [sys.executable, "-m", "pytest"] + pytest_args
-            
-            # 启动进程 - 使用兼容的编码处理
-            self._current_process = subprocess.Popen(
-                cmd,
-                cwd=self.project_root,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=False,  # 使用二进制模式，稍后手动处理编码
-                bufsize=1
-            )
-            
-            # 实时读取输出
-            output_lines = []
+            return_code, output_lines, collector = self._stream_pytest(pytest_args, log_callback, result_callback=result_callback)
             
-            while True:
-                if self._stop_requested:
-                    self._current_process.terminate()
-                    break
-                    
-                output_bytes = self._current_process.stdout.readline()
-                if output_bytes == b'' and self._current_process.poll() is not None:
-                    break
-                    
-                if output_bytes:
-                    # 尝试多种编码方式解码
-                    output = self._decode_with_fallback(output_bytes)
-                    output = output.strip()
-                    output_lines.append(output)
-                    
-                    if log_callback and output:
-                        # 根据设置决定是否显示详细日志
-                        formatted_output = self._format_log_output(output)
-                        if formatted_output:
-                            log_callback(formatted_output)
-            
-            # 等待进程完成
-            return_code = self._current_process.wait() if not self._stop_requested else -1
-            
-            # 解析pytest输出
+            # 统计优先取自结果通道事件，通道未完成时再解析pytest输出
             all_output = '\n'.join(output_lines)
-            stats = self._parse_pytest_output(all_output)
+            stats = collector.stats if collector.finished else self._parse_pytest_output(all_output)
             
             # 记录结果
             if result_callback:
@@ -374,7 +736,8 @@ class TestRunner:
                 'cycle': cycle_num,
                 'returncode': return_code,
                 'statistics': stats,
-                'output': all_output
+                'output': all_output,
+                'events_file': collector.events_file
             }
             
         except Exception as e:
@@ -477,6 +840,10 @@ class TestRunner:
                             elif 'error' in next_part:
                                 stats['error'] = count
                 
+                # 并行模式：gw0 [N items] / N workers [N items]
+                elif re.search(r'\[(\d+) items?\]', line) and not stats['total']:
+                    stats['total'] = int(re.search(r'\[(\d+) items?\]', line).group(1))
+                
                 # 查找收集的测试数量
                 elif 'collected' in line and 'item' in line:
                     parts = line.split()
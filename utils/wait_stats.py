@@ -0,0 +1,91 @@
+# 等待统计工具 - 记录事件驱动等待替代固定sleep后节省的时间
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+
+
+class WaitStats:
+    """等待统计（单例）
+
+    每次 BasePage.settle() 都会记录两项数据：
+        budget: 原来固定 sleep 的秒数（即等待上限）
+        actual: 条件满足时实际花费的秒数
+    二者之差即为本次被消除的空等时间，按测试用例汇总。
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            self.initialized = True
+            self._lock = threading.Lock()
+            self._current_test = "session"
+            self._tests = {}
+
+    def _empty_record(self):
+        return {'count': 0, 'budget': 0.0, 'actual': 0.0, 'by_kind': {}}
+
+    def begin_test(self, test_id: str):
+        """开始统计一个测试用例"""
+        with self._lock:
+            self._current_test = test_id
+            self._tests[test_id] = self._empty_record()
+
+    def end_test(self):
+        """结束当前用例统计，返回该用例的汇总"""
+        with self._lock:
+            test_id = self._current_test
+            record = self._tests.get(test_id, self._empty_record())
+            self._current_test = "session"
+        return self._summarize(test_id, record)
+
+    def record(self, budget: float, actual: float, kind: str = "settle"):
+        """记录一次等待"""
+        with self._lock:
+            record = self._tests.setdefault(self._current_test, self._empty_record())
+            record['count'] += 1
+            record['budget'] += budget
+            record['actual'] += actual
+            kind_record = record['by_kind'].setdefault(kind, {'count': 0, 'budget': 0.0, 'actual': 0.0})
+            kind_record['count'] += 1
+            kind_record['budget'] += budget
+            kind_record['actual'] += actual
+
+    def _summarize(self, test_id, record):
+        return {
+            'test_id': test_id,
+            'count': record['count'],
+            'budget': round(record['budget'], 3),
+            'actual': round(record['actual'], 3),
+            'saved': round(max(record['budget'] - record['actual'], 0.0), 3),
+            'by_kind': record['by_kind'],
+        }
+
+    def summary(self):
+        """返回所有用例的汇总列表"""
+        with self._lock:
+            return [self._summarize(test_id, record) for test_id, record in self._tests.items()]
+
+    def dump(self, output_dir: str = "reports/outputs"):
+        """将统计结果写入JSON文件，返回文件路径"""
+        summaries = [s for s in self.summary() if s['count']]
+        if not summaries:
+            return None
+
+        out_dir = Path(output_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        file_path = out_dir / f"wait_savings_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        data = {
+            'total_budget': round(sum(s['budget'] for s in summaries), 3),
+            'total_actual': round(sum(s['actual'] for s in summaries), 3),
+            'total_saved': round(sum(s['saved'] for s in summaries), 3),
+            'tests': summaries,
+        }
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return file_path
@@ -0,0 +1,157 @@
+# 并行执行沙箱 - 为每个 xdist worker 分配互不重叠的 VLAN ID / 分组名称
+import copy
+import os
+import re
+from utils.yaml_reader import YamlReader
+
+# 中文序号，用于保持中文分组名称的字符类型不变
+_CN_DIGITS = "零一二三四五六七八九"
+
+# 需要按 VLAN ID 映射的字段
+_VLAN_ID_KEYS = {'id', 'vlan_id', 'start_id'}
+# 需要映射的 VLAN 测试数据节点，其余节点（用例说明、校验规则等）保持原样
+_VLAN_DATA_SECTIONS = ('basic_vlans', 'batch_vlans', 'workflow_vlans', 'invalid_vlans',
+                       'edit_test_data', 'search_test_data', 'pagination_test')
+# 需要映射的分组名称字段
+_GROUP_NAME_KEYS = ('name', 'original_name', 'new_name')
+# 测试数据中的 192.168.x.y 地址（含 "192.168.20" 这类搜索前缀），不规范的地址（校验用例）不匹配
+_TEST_SUBNET = re.compile(r'192\.168((?:\.\d{1,3}){0,2})')
+
+
+def current_worker_id() -> str:
+    """当前 xdist worker 标识（gw0/gw1...），串行执行时为 master"""
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+def current_worker_count() -> int:
+    """xdist worker 总数，串行执行时为 1"""
+    return int(os.environ.get("PYTEST_XDIST_WORKER_COUNT") or 1)
+
+
+class WorkerSandbox:
+    """并行 worker 的数据沙箱
+
+    串行执行时使用 YAML 中的原始数据；并行时 VLAN ID 1~4090 按 worker 数均分，
+    每个 worker 的 VLAN ID 落在自己的区间内（gw0 区间从 1 开始，数据通常不变），
+    gw1 起把 192.168.x.y 网段移到私网 10.<序号>.x.y 并给分组名加后缀，
+    使多个 worker 同时操作同一台路由器时不会互相覆盖数据。
+    """
+
+    VLAN_ID_MIN = 1
+    VLAN_ID_MAX = 4090     # 页面校验范围 1~4090
+    GROUP_NAME_MAX = 20    # 页面校验：字符区间1-20
+
+    def __init__(self, worker_id: str = None, vlan_id_stride: int = None, worker_count: int = None):
+        self.worker_id = worker_id or current_worker_id()
+        match = re.search(r'(\d+)$', self.worker_id)
+        self.index = int(match.group(1)) if match else 0
+        self.worker_count = max(worker_count or current_worker_count(), self.index + 1)
+
+        if vlan_id_stride is None:
+            cfg = YamlReader().read_yaml("config/test_config.yaml") or {}
+            vlan_id_stride = (cfg.get('parallel') or {}).get('vlan_id_stride', 1000)
+        # 配置值为每个 worker 区间的上限，worker 多时按数量均分，保证最后一个区间不超出范围
+        self.vlan_id_stride = min(vlan_id_stride, (self.VLAN_ID_MAX - self.VLAN_ID_MIN + 1) // self.worker_count)
+        if self.vlan_id_stride < 1:
+            raise ValueError(f"并行数 {self.worker_count} 超过可分配的VLAN ID数量")
+
+    @property
+    def is_primary(self) -> bool:
+        return self.index == 0
+
+    @property
+    def is_serial(self) -> bool:
+        return self.worker_count <= 1
+
+    def vlan_id_range(self):
+        """本 worker 可使用的 VLAN ID 区间 (起, 止)"""
+        low = self.VLAN_ID_MIN + self.index * self.vlan_id_stride
+        return low, min(low + self.vlan_id_stride - 1, self.VLAN_ID_MAX)
+
+    # ------------------------------------------------------------------
+    # VLAN
+    # ------------------------------------------------------------------
+    def vlan_id(self, vlan_id):
+        """映射 VLAN ID 到本 worker 的区间，超出合法范围的（校验用例数据）保持原样
+
+        区间内偏移为 (原ID - 1) % 区间大小，原ID不超过区间大小时各 worker 间只差整数倍区间。
+        """
+        text = str(vlan_id)
+        if self.is_serial or not text.isdigit():
+            return vlan_id
+        value = int(text)
+        if not self.VLAN_ID_MIN <= value <= self.VLAN_ID_MAX:
+            return vlan_id
+        low = self.vlan_id_range()[0]
+        mapped = low + (value - self.VLAN_ID_MIN) % self.vlan_id_stride
+        return str(mapped) if isinstance(vlan_id, str) else mapped
+
+    def ip_text(self, text: str) -> str:
+        """把 192.168.x.y 测试网段移到 10.<序号>.x.y（仍在私网范围内）"""
+        match = _TEST_SUBNET.fullmatch(text)
+        if self.is_primary or not match:
+            return text
+        if any(int(octet) > 255 for octet in match.group(1).split(".")[1:]):
+            return text
+        return f"10.{self.index}{match.group(1)}"
+
+    def vlan_text(self, text: str) -> str:
+        """映射文本中的 vlanNNN 名称和 192.168. 网段"""
+        if self.is_serial or not isinstance(text, str):
+            return text
+        text = re.sub(r'vlan(\d+)(?!\d)', lambda m: f"vlan{self.vlan_id(m.group(1))}", text)
+        return self.ip_text(text)
+
+    def map_vlan_data(self, data: dict) -> dict:
+        """返回映射后的 VLAN 测试数据副本"""
+        if self.is_serial or not data:
+            return data
+        data = copy.deepcopy(data)
+        for section in _VLAN_DATA_SECTIONS:
+            if section in data:
+                data[section] = self._map_vlan_node(data[section])
+        return data
+
+    def _map_vlan_node(self, node, key=None):
+        if isinstance(node, dict):
+            return {k: self._map_vlan_node(v, k) for k, v in node.items()}
+        if isinstance(node, list):
+            if key == 'expected_vlans':
+                return [self.vlan_id(v) for v in node]
+            return [self._map_vlan_node(v) for v in node]
+        if key in _VLAN_ID_KEYS:
+            return self.vlan_id(node)
+        return self.vlan_text(node)
+
+    # ------------------------------------------------------------------
+    # 终端分组
+    # ------------------------------------------------------------------
+    def group_name(self, name: str) -> str:
+        """给分组名加 worker 后缀，并保持原名称的字符类型
+
+        空名称、超长名称和含特殊字符的名称属于校验用例，不会写入路由器，保持原样。
+        """
+        if self.is_primary or not name or not re.fullmatch(r'\w+', name):
+            return name
+        if name.isdigit():
+            suffix = str(self.index)
+        elif name.isascii() and name.isalpha():
+            suffix = chr(ord('a') + (self.index - 1) % 26)
+        elif name.isascii():
+            suffix = f"W{self.index}"
+        else:
+            suffix = "".join(_CN_DIGITS[int(d)] for d in str(self.index))
+        if len(name) + len(suffix) > self.GROUP_NAME_MAX:
+            return name
+        return name + suffix
+
+    def map_group_data(self, data: dict) -> dict:
+        """返回分组名称映射后的终端分组测试数据副本"""
+        if self.is_primary or not data:
+            return data
+        data = copy.deepcopy(data)
+        for item in data.get('groups', []):
+            for key in _GROUP_NAME_KEYS:
+                if key in item:
+                    item[key] = self.group_name(item[key])
+        return data